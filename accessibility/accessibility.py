@@ -1,59 +1,22 @@
 """
 Accessibility utilities and middleware for SmartLearnNeuro.
 """
-from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from .resolver import resolve_settings
+
 
 class AccessibilityMiddleware(MiddlewareMixin):
     """
     Middleware to handle accessibility settings for users.
+
+    Settings come from the unified resolver (cached per user, with session and
+    query-string overrides applied), so this adds no queries to a request.
     """
     def process_request(self, request):
-        """Process the request and apply accessibility settings."""
-        # Initialize default accessibility settings
-        accessibility_settings = {
-            'high_contrast': False,
-            'dyslexia_font': False,
-            'font_size': 'medium',  # small, medium, large, xlarge
-            'color_blind': 'none',  # none, protanopia, deuteranopia, tritanopia
-            'keyboard_nav': False,
-            'screen_reader': False,
-            'animations': True,
-            'reduced_motion': False,
-        }
-        
-        # Get user's saved settings if authenticated
-        if hasattr(request, 'user') and request.user.is_authenticated:
-            try:
-                user_settings = request.user.accessibility_settings
-                if user_settings:
-                    accessibility_settings.update(user_settings)
-            except AttributeError:
-                # User model doesn't have accessibility_settings attribute
-                pass
-        
-        # Check for session overrides
-        for key in accessibility_settings.keys():
-            if key in request.session:
-                accessibility_settings[key] = request.session[key]
-        
-        # Check for URL parameters to override settings
-        for key in accessibility_settings.keys():
-            if key in request.GET:
-                value = request.GET.get(key)
-                if value.lower() in ('true', '1', 'on'):
-                    accessibility_settings[key] = True
-                    request.session[key] = True
-                elif value.lower() in ('false', '0', 'off'):
-                    accessibility_settings[key] = False
-                    request.session[key] = False
-                else:
-                    accessibility_settings[key] = value
-                    request.session[key] = value
-        
-        # Add to request
-        request.accessibility_settings = accessibility_settings
-        
+        """Attach the resolved accessibility settings to the request."""
+        request.accessibility_settings = SimpleLazyObject(lambda: resolve_settings(request))
         return None
     
     def process_template_response(self, request, response):
@@ -1,23 +1,12 @@
-from django.conf import settings
 from django.utils.functional import SimpleLazyObject
-from .models import AccessibilitySettings, DyslexiaSettings, ADHDSettings
+
+from .resolver import resolve_settings
 
 
 def get_accessibility_settings(request):
+    """Resolved settings of the request, computed once (see accessibility.resolver)."""
     if not hasattr(request, '_cached_accessibility_settings'):
-        if request.user.is_authenticated:
-            request._cached_accessibility_settings = {
-                'general': request.user.accessibility_settings,
-                'dyslexia': request.user.dyslexia_settings,
-                'adhd': request.user.adhd_settings,
-            }
-        else:
-            # Default settings for anonymous users
-            request._cached_accessibility_settings = {
-                'general': AccessibilitySettings(),
-                'dyslexia': DyslexiaSettings(),
-                'adhd': ADHDSettings(),
-            }
+        request._cached_accessibility_settings = resolve_settings(request)
     return request._cached_accessibility_settings
 
 
@@ -26,7 +15,8 @@ class AccessibilityMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
-        # Add accessibility settings to the request
+        # Add accessibility settings to the request; resolved from the
+        # per-user cache only when something reads them
         request.accessibility = SimpleLazyObject(lambda: get_accessibility_settings(request))
         
         # Process the request
@@ -41,20 +31,11 @@ class AccessibilityMiddleware:
             response.context_data['accessibility'] = request.accessibility
             
             # For backward compatibility, add commonly used settings to the root context
-            if request.user.is_authenticated:
-                response.context_data.update({
-                    'font_size': request.accessibility['dyslexia'].font_size,
-                    'font_family': request.accessibility['dyslexia'].font_family,
-                    'high_contrast': request.accessibility['general'].is_high_contrast,
-                    'dark_mode': request.accessibility['general'].is_dark_mode,
-                })
-            else:
-                # Default values for unauthenticated users
-                response.context_data.update({
-                    'font_size': 16,
-                    'font_family': 'Arial',
-                    'high_contrast': False,
-                    'dark_mode': False,
-                })
+            response.context_data.update({
+                'font_size': request.accessibility['font_size'],
+                'font_family': request.accessibility['font_family'],
+                'high_contrast': request.accessibility['high_contrast'],
+                'dark_mode': request.accessibility['dark_mode'],
+            })
         
-        return response
\ No newline at end of file
+        return response
@@ -0,0 +1,343 @@
+"""
+Unified accessibility settings resolver.
+
+A user's preferences live in three rows (AccessibilitySettings,
+DyslexiaSettings, ADHDSettings). ``get_user_settings`` loads them with a
+single joined query, serializes them to a plain dict and caches it per user;
+the signals in ``accessibility.signals`` drop the entry whenever a row is
+saved. ``resolve_settings`` layers the session and query-string overrides on
+top for the current request, so templates and the settings API never touch
+the database on a cache hit.
+
+``update_user_settings`` applies a batched diff from the settings panel.
+Writes are debounced: the first change in a window is saved at once, later
+ones are coalesced in the cache and saved together by
+``accessibility.tasks.flush_pending_settings``. Merges into and flushes of
+the pending diff hold a per-user cache lock, so no change is lost between
+processes.
+"""
+import hashlib
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import transaction
+from django.forms.models import model_to_dict
+
+from .models import AccessibilitySettings, DyslexiaSettings, ADHDSettings
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Changes arriving within this many seconds of a write are coalesced
+SETTINGS_WRITE_DEBOUNCE = 2
+
+# Longest a settings lock is held; a crashed holder's lock expires after it
+SETTINGS_LOCK_TIMEOUT = 10
+
+# Sections of the resolved settings: (key, reverse one-to-one accessor, model)
+SETTINGS_SECTIONS = (
+    ('general', 'accessibilitysettings', AccessibilitySettings),
+    ('dyslexia', 'dyslexiasettings', DyslexiaSettings),
+    ('adhd', 'adhdsettings', ADHDSettings),
+)
+
+# Preferences kept only in the session (no model field), with their defaults
+SESSION_ONLY_DEFAULTS = {
+    'text_size': '1',
+    'enable_toolbar': True,
+    'color_blind': 'none',
+}
+
+_default_settings = None
+
+
+def settings_cache_key(user_id):
+    return f'accessibility_settings:{user_id}'
+
+
+def _pending_key(user_id):
+    return f'accessibility_settings_pending:{user_id}'
+
+
+def _debounce_key(user_id):
+    return f'accessibility_settings_written:{user_id}'
+
+
+def _lock_key(user_id):
+    return f'accessibility_settings_lock:{user_id}'
+
+
+@contextmanager
+def settings_lock(user_id):
+    """
+    Hold the per-user lock guarding the pending diff and the cached settings.
+
+    Waiting gives up after ``SETTINGS_LOCK_TIMEOUT``, by which time any
+    holder's lock has expired; if the lock still cannot be taken (a cache
+    that rejects or never expires it), the caller proceeds without it rather
+    than hanging the request.
+    """
+    key = _lock_key(user_id)
+    deadline = time.monotonic() + SETTINGS_LOCK_TIMEOUT
+    acquired = cache.add(key, True, SETTINGS_LOCK_TIMEOUT)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.01)
+        acquired = cache.add(key, True, SETTINGS_LOCK_TIMEOUT)
+    if not acquired:
+        logger.warning("Settings lock for user %s not acquired in %ss; proceeding without it",
+                       user_id, SETTINGS_LOCK_TIMEOUT)
+    try:
+        yield
+    finally:
+        if acquired:
+            cache.delete(key)
+
+
+def serialize_settings(general, dyslexia, adhd):
+    """
+    Merge the three settings rows into one JSON-serializable dict.
+
+    The result has a ``general``/``dyslexia``/``adhd`` section per row, the
+    flat keys the templates, the quick-access panel and the settings API use,
+    and a ``version`` fingerprint clients can cache against.
+    """
+    sections = {
+        'general': model_to_dict(general, exclude=['id', 'user']),
+        'dyslexia': model_to_dict(dyslexia, exclude=['id', 'user']),
+        'adhd': model_to_dict(adhd, exclude=['id', 'user']),
+    }
+    dys = sections['dyslexia']
+    flat = {
+        'high_contrast': dys['color_theme'] == 'high_contrast',
+        'dark_mode': dys['color_theme'] == 'dark',
+        'dyslexia_font': dys['font_family'] == 'open_dyslexic',
+        'keyboard_nav': sections['general']['enable_keyboard_navigation'],
+        'screen_reader': sections['general']['is_screen_reader_active'],
+        'animations': not sections['adhd']['reduce_animations'],
+        'reduced_motion': sections['adhd']['reduce_animations'],
+    }
+    for field in ('font_family', 'font_size', 'line_spacing', 'letter_spacing', 'word_spacing',
+                  'tts_speed', 'enable_text_to_speech', 'enable_spelling_assistance',
+                  'enable_grammar_assistance', 'simplified_language'):
+        flat[field] = dys[field]
+    for field in ('enable_focus_mode', 'enable_white_noise', 'enable_break_reminders',
+                  'show_visual_timers', 'show_progress_bars', 'enable_task_chunking',
+                  'reduce_animations'):
+        flat[field] = sections['adhd'][field]
+    settings = {**SESSION_ONLY_DEFAULTS, **flat, **sections}
+    payload = json.dumps(settings, sort_keys=True, default=str).encode('utf-8')
+    settings['version'] = hashlib.sha1(payload).hexdigest()[:12]
+    return settings
+
+
+def default_settings():
+    """Settings for anonymous users: the model defaults, built without a query."""
+    global _default_settings
+    if _default_settings is None:
+        _default_settings = serialize_settings(AccessibilitySettings(), DyslexiaSettings(), ADHDSettings())
+    return _default_settings
+
+
+def load_settings_rows(user_id):
+    """A user's three settings rows, read in one query (created if missing)."""
+    user = (get_user_model().objects
+            .select_related(*(accessor for _, accessor, _ in SETTINGS_SECTIONS))
+            .get(pk=user_id))
+    rows = []
+    for _, accessor, model in SETTINGS_SECTIONS:
+        try:
+            rows.append(getattr(user, accessor))
+        except model.DoesNotExist:
+            # Users created before the accessibility signals were connected
+            rows.append(model.objects.get_or_create(user=user)[0])
+    return rows
+
+
+def load_user_settings(user):
+    """Read a user's settings from the database and serialize them."""
+    return serialize_settings(*load_settings_rows(user.pk))
+
+
+def get_user_settings(user):
+    """Serialized settings of ``user``, from the cache when possible."""
+    if user is None or not user.is_authenticated:
+        return default_settings()
+    key = settings_cache_key(user.pk)
+    settings = cache.get(key)
+    if settings is None:
+        settings = load_user_settings(user)
+        cache.set(key, settings, SETTINGS_CACHE_TIMEOUT)
+    return settings
+
+
+def invalidate_user_settings(user_id):
+    """Drop the cached settings of a user; the next request reloads them."""
+    cache.delete(settings_cache_key(user_id))
+
+
+def _parse_override(value):
+    if value.lower() in ('true', '1', 'on'):
+        return True
+    if value.lower() in ('false', '0', 'off'):
+        return False
+    return value
+
+
+def resolve_settings(request):
+    """
+    Settings for this request: the user's cached settings with session
+    overrides applied, and query-string overrides applied and remembered in
+    the session (e.g. ``?high_contrast=on``).
+    """
+    # Overrides only replace flat keys, so the sections can stay shared
+    settings = dict(get_user_settings(getattr(request, 'user', None)))
+    session = getattr(request, 'session', None)
+    overridable = [key for key, value in settings.items()
+                   if key != 'version' and not isinstance(value, dict)]
+
+    for key in overridable:
+        if session is not None and key in session:
+            settings[key] = session[key]
+        if key in request.GET:
+            settings[key] = _parse_override(request.GET[key])
+            if session is not None:
+                session[key] = settings[key]
+    return settings
+
+
+def clean_settings_diff(diff):
+    """
+    Validate a ``{section: {field: value}}`` diff against the settings models.
+
+    Returns:
+        The diff with each value converted by its model field
+
+    Raises:
+        ValidationError: keyed by ``section.field`` for every rejected entry
+    """
+    if not isinstance(diff, dict) or not diff:
+        raise ValidationError('Expected an object of settings sections.')
+
+    models = {key: model for key, _, model in SETTINGS_SECTIONS}
+    cleaned = {}
+    errors = {}
+    for section, changes in diff.items():
+        model = models.get(section)
+        if model is None or not isinstance(changes, dict):
+            errors[section] = ['Unknown settings section.']
+            continue
+        for name, value in changes.items():
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                field = None
+            if field is None or not field.editable or name in ('id', 'user'):
+                errors[f'{section}.{name}'] = ['Unknown setting.']
+                continue
+            try:
+                cleaned.setdefault(section, {})[name] = field.clean(value, None)
+            except ValidationError as e:
+                errors[f'{section}.{name}'] = e.messages
+    if errors:
+        raise ValidationError(errors)
+    return cleaned
+
+
+def _apply_diff(settings, diff):
+    """Serialized ``settings`` with ``diff`` applied, without touching the database."""
+    rows = [model(**{**settings[key], **diff.get(key, {})}) for key, _, model in SETTINGS_SECTIONS]
+    return serialize_settings(*rows)
+
+
+def write_settings_diff(user_id, diff):
+    """
+    Save ``diff`` in one transaction, writing only the columns that changed.
+
+    Returns:
+        The new serialized settings, which also replace the cached entry
+    """
+    with transaction.atomic():
+        rows = load_settings_rows(user_id)
+        for (key, _, _), row in zip(SETTINGS_SECTIONS, rows):
+            changes = diff.get(key, {})
+            changed = [name for name, value in changes.items() if getattr(row, name) != value]
+            if not changed:
+                continue
+            for name in changed:
+                setattr(row, name, changes[name])
+            auto_now = [f.name for f in row._meta.concrete_fields if getattr(f, 'auto_now', False)]
+            row.save(update_fields=changed + auto_now)
+
+    settings = serialize_settings(*rows)
+    cache.set(settings_cache_key(user_id), settings, SETTINGS_CACHE_TIMEOUT)
+    return settings
+
+
+def update_user_settings(user, diff):
+    """
+    Apply a cleaned settings diff for ``user``.
+
+    The first change in a ``SETTINGS_WRITE_DEBOUNCE`` window is written at
+    once, together with any changes still pending; changes arriving within
+    the window are merged into a pending diff that a single delayed task
+    writes. The cached settings reflect every change immediately either way.
+
+    Returns:
+        The new serialized settings
+    """
+    pending_key = _pending_key(user.pk)
+    with settings_lock(user.pk):
+        pending = cache.get(pending_key) or {}
+        schedule_flush = not pending
+        for section, changes in diff.items():
+            pending.setdefault(section, {}).update(changes)
+
+        # Written under the lock: a delayed flush of older changes cannot land after it
+        if cache.add(_debounce_key(user.pk), True, SETTINGS_WRITE_DEBOUNCE):
+            cache.delete(pending_key)
+            return write_settings_diff(user.pk, pending)
+
+        cache.set(pending_key, pending, SETTINGS_CACHE_TIMEOUT)
+        settings = _apply_diff(get_user_settings(user), diff)
+        cache.set(settings_cache_key(user.pk), settings, SETTINGS_CACHE_TIMEOUT)
+
+    if schedule_flush:
+        from .tasks import flush_pending_settings
+        flush_pending_settings.apply_async((user.pk,), countdown=SETTINGS_WRITE_DEBOUNCE)
+    return settings
+
+
+def flush_pending_settings_diff(user_id):
+    """Write the changes coalesced for ``user_id``, if any."""
+    with settings_lock(user_id):
+        pending = cache.get(_pending_key(user_id))
+        cache.delete(_pending_key(user_id))
+        if pending:
+            write_settings_diff(user_id, pending)
+
+
+def clear_session_overrides(session, previous, settings, diff):
+    """
+    Drop the session overrides of the flat keys a saved diff changed, so the
+    user's explicit choice is not masked by an earlier ``?key=`` override.
+
+    Args:
+        session: The request's session (may be None)
+        previous: Serialized settings before the diff
+        settings: Serialized settings after it
+        diff: The cleaned diff
+    """
+    if session is None:
+        return
+    changed = {name for changes in diff.values() for name in changes}
+    for key, value in settings.items():
+        if key == 'version' or isinstance(value, dict):
+            continue
+        if key in changed or previous.get(key) != value:
+            session.pop(key, None)
@@ -1,7 +1,7 @@
 """
 Signals for the accessibility app.
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.conf import settings
 from .models import (
@@ -10,6 +10,7 @@ from .models import (
     ADHDSettings,
     RewardSystem
 )
+from .resolver import invalidate_user_settings
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -75,16 +76,14 @@ def create_user_accessibility_settings(sender, instance, created, **kwargs):
         RewardSystem.objects.create(user=instance)
 
 
-@receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def save_user_accessibility_settings(sender, instance, **kwargs):
+@receiver(post_save, sender=AccessibilitySettings)
+@receiver(post_save, sender=DyslexiaSettings)
+@receiver(post_save, sender=ADHDSettings)
+@receiver(post_delete, sender=AccessibilitySettings)
+@receiver(post_delete, sender=DyslexiaSettings)
+@receiver(post_delete, sender=ADHDSettings)
+def invalidate_cached_settings(sender, instance, **kwargs):
     """
-    Save the user's accessibility settings.
+    Drop the user's cached resolved settings when any settings row changes.
     """
-    if hasattr(instance, 'accessibilitysettings'):
-        instance.accessibilitysettings.save()
-    if hasattr(instance, 'dyslexiasettings'):
-        instance.dyslexiasettings.save()
-    if hasattr(instance, 'adhdsettings'):
-        instance.adhdsettings.save()
-    if hasattr(instance, 'rewardsystem'):
-        instance.rewardsystem.save()
+    invalidate_user_settings(instance.user_id)
@@ -0,0 +1,201 @@
+"""
+Compiled accessibility stylesheets.
+
+Instead of inlining each user's font, spacing and colour choices into every
+page, the style-relevant settings are reduced to a profile whose hash names a
+generated stylesheet. Pages only link to it; the file is immutable, so
+browsers and CDNs cache it indefinitely and users sharing a profile share it.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from .accessibility import get_accessible_color, get_contrast_ratio
+
+# WCAG AA contrast for body text
+MIN_CONTRAST_RATIO = 4.5
+
+FONT_STACKS = {
+    'default': 'system-ui, -apple-system, "Segoe UI", Roboto, Arial, sans-serif',
+    'open_dyslexic': '"OpenDyslexic", "Comic Sans MS", sans-serif',
+    'comic_sans': '"Comic Sans MS", "Comic Sans", cursive, sans-serif',
+    'arial': 'Arial, Helvetica, sans-serif',
+    'verdana': 'Verdana, Geneva, sans-serif',
+    'tahoma': 'Tahoma, Verdana, sans-serif',
+}
+
+# Text and background colour of each colour theme
+THEME_COLORS = {
+    'default': ('#212529', '#FFFFFF'),
+    'high_contrast': ('#000000', '#FFFFFF'),
+    'dark': ('#E9ECEF', '#121212'),
+    'light': ('#212529', '#F8F9FA'),
+    'sepia': ('#5B4636', '#F4ECD8'),
+    'blue_light_filter': ('#3B3024', '#FFF4E0'),
+}
+
+COLOR_BLIND_FILTERS = ('protanopia', 'deuteranopia', 'tritanopia')
+
+HEX_COLOR_RE = re.compile(r'^#[0-9A-Fa-f]{6}$')
+
+# Digest -> (URL, body classes) of the stylesheets this process has written
+_written = {}
+
+
+def _number(value, default, low, high):
+    try:
+        return min(high, max(low, round(float(value), 3)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _color(value, default):
+    return value.upper() if isinstance(value, str) and HEX_COLOR_RE.match(value) else default
+
+
+def style_profile(settings):
+    """
+    Reduce resolved settings (see accessibility.resolver) to the values that
+    affect styling, normalized so that equivalent settings share a profile.
+
+    Values may come from session or query-string overrides, so every one is
+    checked against a whitelist or range before it can reach the CSS.
+    """
+    dyslexia = settings.get('dyslexia', {})
+    font_family = settings.get('font_family')
+    theme = dyslexia.get('color_theme')
+    if settings.get('high_contrast'):
+        theme = 'high_contrast'
+    elif settings.get('dark_mode'):
+        theme = 'dark'
+    if theme not in THEME_COLORS:
+        theme = 'default'
+
+    text_color, background_color = THEME_COLORS[theme]
+    if dyslexia.get('use_custom_colors'):
+        background_color = _color(dyslexia.get('background_color'), background_color)
+        text_color = _color(dyslexia.get('text_color'), text_color)
+        if get_contrast_ratio(text_color, background_color) < MIN_CONTRAST_RATIO:
+            text_color = get_accessible_color(background_color, '#FFFFFF', '#000000', MIN_CONTRAST_RATIO)
+
+    color_blind = settings.get('color_blind')
+    return {
+        'font_family': font_family if font_family in FONT_STACKS else 'default',
+        'font_size': _number(settings.get('font_size'), 16.0, 10, 48),
+        'line_spacing': _number(settings.get('line_spacing'), 1.5, 1.0, 3.0),
+        'letter_spacing': _number(settings.get('letter_spacing'), 0.12, 0.0, 1.0),
+        'word_spacing': _number(settings.get('word_spacing'), 0.16, 0.0, 1.0),
+        'theme': theme,
+        'text_color': text_color,
+        'background_color': background_color,
+        'reduced_motion': bool(settings.get('reduced_motion')),
+        'color_blind': color_blind if color_blind in COLOR_BLIND_FILTERS else 'none',
+    }
+
+
+def profile_digest(profile):
+    """Short, stable hash naming a style profile."""
+    payload = json.dumps(profile, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+
+def body_classes(profile):
+    """Classes the body gets for rules that live in the static accessibility.css."""
+    classes = []
+    if profile['theme'] == 'high_contrast':
+        classes.append('high-contrast')
+    if profile['font_family'] == 'open_dyslexic':
+        classes.append('dyslexia-font')
+    if profile['reduced_motion']:
+        classes.append('reduced-motion')
+    if profile['color_blind'] != 'none':
+        classes.append(f"color-blind-{profile['color_blind']}")
+    return ' '.join(classes)
+
+
+def render_css(profile):
+    """The stylesheet of a style profile."""
+    css = [
+        ':root {',
+        f"    --font-size: {profile['font_size']}px;",
+        f"    --font-family: {FONT_STACKS[profile['font_family']]};",
+        f"    --line-height: {profile['line_spacing']};",
+        f"    --letter-spacing: {profile['letter_spacing']}em;",
+        f"    --word-spacing: {profile['word_spacing']}em;",
+        f"    --body-color: {profile['text_color']};",
+        f"    --body-bg: {profile['background_color']};",
+        '}',
+        'body {',
+        '    font-size: var(--font-size);',
+        '    font-family: var(--font-family);',
+        '    line-height: var(--line-height);',
+        '    letter-spacing: var(--letter-spacing);',
+        '    word-spacing: var(--word-spacing);',
+        '    color: var(--body-color);',
+        '    background-color: var(--body-bg);',
+        '}',
+    ]
+    if profile['reduced_motion']:
+        css += [
+            '*, *::before, *::after {',
+            '    animation: none !important;',
+            '    transition: none !important;',
+            '    scroll-behavior: auto !important;',
+            '}',
+        ]
+    return '\n'.join(css) + '\n'
+
+
+def stylesheet_dir():
+    return Path(getattr(django_settings, 'ACCESSIBILITY_CSS_ROOT', None)
+                or Path(django_settings.MEDIA_ROOT) / 'accessibility_css')
+
+
+def _profile_cache_key(digest):
+    return f'accessibility_css_profile:{digest}'
+
+
+def write_stylesheet(digest, profile):
+    """Write the stylesheet of ``profile`` unless it exists; returns its path."""
+    path = stylesheet_dir() / f'{digest}.css'
+    # Lets any server process regenerate the file (e.g. on a fresh host)
+    cache.set(_profile_cache_key(digest), profile, None)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.part')
+        with os.fdopen(fd, 'w') as f:
+            f.write(render_css(profile))
+        os.replace(tmp, path)
+    return path
+
+
+def get_stylesheet_path(digest):
+    """Path of the stylesheet named ``digest``, or None for an unknown profile."""
+    path = stylesheet_dir() / f'{digest}.css'
+    if path.exists():
+        return path
+    profile = cache.get(_profile_cache_key(digest))
+    if profile is None:
+        return None
+    return write_stylesheet(digest, profile)
+
+
+def stylesheet_for(settings):
+    """
+    Profile digest, stylesheet URL and body classes for resolved settings.
+
+    The file is written the first time this process sees the profile.
+    """
+    profile = style_profile(settings)
+    digest = profile_digest(profile)
+    if digest not in _written:
+        write_stylesheet(digest, profile)
+        _written[digest] = (reverse('accessibility:stylesheet', args=[digest]), body_classes(profile))
+    return (digest, *_written[digest])
@@ -0,0 +1,25 @@
+"""
+Celery tasks for the accessibility app.
+"""
+import logging
+
+from celery import shared_task
+
+from .resolver import flush_pending_settings_diff
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="flush_pending_accessibility_settings")
+def flush_pending_settings(user_id: int) -> None:
+    """
+    Write the settings changes coalesced during a debounce window.
+    
+    Args:
+        user_id: The ID of the user whose settings changed.
+    """
+    try:
+        flush_pending_settings_diff(user_id)
+    except Exception as e:
+        logger.error(f"Error in flush_pending_settings: {str(e)}", exc_info=True)
+        raise
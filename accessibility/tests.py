@@ -1,6 +1,31 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from types import ModuleType
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from .models import AccessibilitySettings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import include, path, resolve, reverse
+
+from .accessibility import get_contrast_ratio
+from .models import AccessibilitySettings, ADHDSettings, DyslexiaSettings
+from .resolver import (
+    SETTINGS_WRITE_DEBOUNCE, default_settings, flush_pending_settings_diff, get_user_settings,
+    resolve_settings,
+)
+from .stylesheets import profile_digest, style_profile, write_stylesheet
+from .views import BatchUpdateSettingsView, GetSettingsView, StylesheetView
+
+
+def app_urlconf():
+    """A URLconf mounting the app the way the project does, for tests that go through reverse()."""
+    urlconf = ModuleType('app_urlconf')
+    urlconf.urlpatterns = [path('accessibility/', include('accessibility.urls'))]
+    return urlconf
+
 
 class AccessibilitySettingsTests(TestCase):
     def setUp(self):
@@ -9,4 +34,202 @@ class AccessibilitySettingsTests(TestCase):
     def test_create_accessibility_settings(self):
         settings = AccessibilitySettings.objects.create(user=self.user, use_dyslexia_font=True)
         self.assertTrue(settings.use_dyslexia_font)
-        self.assertEqual(str(settings), f"Settings for {self.user.username}")
\ No newline at end of file
+        self.assertEqual(str(settings), f"Settings for {self.user.username}")
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SettingsResolverTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='reader', email='reader@example.com', password='testpass'
+        )
+        self.factory = RequestFactory()
+
+    def request(self, path='/'):
+        request = self.factory.get(path)
+        request.user = self.user
+        request.session = {}
+        return request
+
+    def test_settings_are_loaded_in_one_query_then_cached(self):
+        with self.assertNumQueries(1):
+            settings = get_user_settings(self.user)
+        self.assertEqual(settings['dyslexia']['font_size'], 16)
+        self.assertFalse(settings['high_contrast'])
+
+        with self.assertNumQueries(0):
+            get_user_settings(self.user)
+
+    def test_saving_a_settings_row_invalidates_the_cache(self):
+        get_user_settings(self.user)
+        dyslexia = DyslexiaSettings.objects.get(user=self.user)
+        dyslexia.color_theme = 'high_contrast'
+        dyslexia.save()
+
+        self.assertTrue(get_user_settings(self.user)['high_contrast'])
+
+    def test_session_and_query_overrides(self):
+        request = self.request('/?dark_mode=on')
+        request.session['font_size'] = 20
+
+        settings = resolve_settings(request)
+        self.assertTrue(settings['dark_mode'])
+        self.assertEqual(settings['font_size'], 20)
+        self.assertTrue(request.session['dark_mode'])
+        # The cached settings are not modified by overrides
+        self.assertFalse(get_user_settings(self.user)['dark_mode'])
+
+    def test_get_settings_view_reads_from_cache(self):
+        get_user_settings(self.user)
+        with self.assertNumQueries(0):
+            response = GetSettingsView.as_view()(self.request())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['settings']['font_family'], 'default')
+
+    def test_anonymous_users_get_defaults_without_queries(self):
+        request = self.factory.get('/')
+        request.user = AnonymousUser()
+        with self.assertNumQueries(0):
+            settings = resolve_settings(request)
+        self.assertEqual(settings['line_spacing'], 1.5)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BatchUpdateSettingsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='slider', email='slider@example.com', password='testpass'
+        )
+        self.factory = RequestFactory()
+
+    def patch(self, diff):
+        request = self.factory.patch('/', json.dumps(diff), content_type='application/json')
+        request.user = self.user
+        return BatchUpdateSettingsView.as_view()(request)
+
+    def test_diff_is_saved_across_models(self):
+        response = self.patch({
+            'dyslexia': {'font_size': 20, 'line_spacing': '1.8'},
+            'adhd': {'enable_focus_mode': True},
+        })
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content)
+        self.assertEqual(body['settings']['font_size'], 20)
+        self.assertEqual(body['version'], get_user_settings(self.user)['version'])
+
+        dyslexia = DyslexiaSettings.objects.get(user=self.user)
+        self.assertEqual((dyslexia.font_size, dyslexia.line_spacing), (20, 1.8))
+        self.assertTrue(ADHDSettings.objects.get(user=self.user).enable_focus_mode)
+
+    def test_invalid_values_are_rejected(self):
+        response = self.patch({'dyslexia': {'font_family': 'papyrus', 'nope': 1}, 'other': {}})
+        self.assertEqual(response.status_code, 400)
+        errors = json.loads(response.content)['errors']
+        self.assertEqual(set(errors), {'dyslexia.font_family', 'dyslexia.nope', 'other'})
+
+    def test_rapid_changes_are_coalesced(self):
+        self.patch({'dyslexia': {'font_size': 18}})
+        with mock.patch('accessibility.tasks.flush_pending_settings.apply_async') as schedule:
+            with self.assertNumQueries(0):
+                self.patch({'dyslexia': {'font_size': 19}})
+                response = self.patch({'dyslexia': {'font_size': 22}})
+        schedule.assert_called_once_with((self.user.pk,), countdown=SETTINGS_WRITE_DEBOUNCE)
+
+        # Readers see the latest value before it is written
+        self.assertEqual(json.loads(response.content)['settings']['font_size'], 22)
+        self.assertEqual(DyslexiaSettings.objects.get(user=self.user).font_size, 18)
+
+        flush_pending_settings_diff(self.user.pk)
+        self.assertEqual(DyslexiaSettings.objects.get(user=self.user).font_size, 22)
+        self.assertEqual(get_user_settings(self.user)['font_size'], 22)
+
+    def test_write_after_the_window_includes_pending_changes(self):
+        self.patch({'dyslexia': {'font_size': 18}})
+        with mock.patch('accessibility.tasks.flush_pending_settings.apply_async'):
+            self.patch({'adhd': {'enable_focus_mode': True}})
+        cache.delete(f'accessibility_settings_written:{self.user.pk}')  # The window has passed
+
+        self.patch({'dyslexia': {'font_size': 24}})
+        self.assertTrue(ADHDSettings.objects.get(user=self.user).enable_focus_mode)
+        # The delayed flush finds nothing older to write over the new value
+        flush_pending_settings_diff(self.user.pk)
+        self.assertEqual(DyslexiaSettings.objects.get(user=self.user).font_size, 24)
+
+    def test_a_stuck_lock_does_not_hang_the_request(self):
+        lock_key = f'accessibility_settings_lock:{self.user.pk}'
+        cache.set(lock_key, True, 60)
+        with mock.patch('accessibility.resolver.SETTINGS_LOCK_TIMEOUT', 0.05), \
+                self.assertLogs('accessibility.resolver', 'WARNING'):
+            response = self.patch({'dyslexia': {'font_size': 26}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(DyslexiaSettings.objects.get(user=self.user).font_size, 26)
+        # The lock was never ours to release
+        self.assertTrue(cache.get(lock_key))
+
+    def test_saved_settings_replace_session_overrides(self):
+        request = self.factory.patch('/', json.dumps({'dyslexia': {'font_size': 16, 'color_theme': 'dark'}}),
+                                     content_type='application/json')
+        request.user = self.user
+        request.session = {'font_size': 30, 'dark_mode': False, 'enable_focus_mode': True}
+        BatchUpdateSettingsView.as_view()(request)
+        self.assertEqual(request.session, {'enable_focus_mode': True})
+
+    def test_batch_update_is_routed(self):
+        self.client.force_login(self.user)
+        with override_settings(ROOT_URLCONF=app_urlconf()):
+            response = self.client.patch(reverse('accessibility:batch_update_settings'),
+                                         json.dumps({'dyslexia': {'font_size': 21}}),
+                                         content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(DyslexiaSettings.objects.get(user=self.user).font_size, 21)
+
+
+class StylesheetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        self.settings = default_settings()
+
+    def test_equivalent_settings_share_a_stylesheet(self):
+        same = dict(self.settings, font_size='16')
+        bigger = dict(self.settings, font_size=20)
+        self.assertEqual(profile_digest(style_profile(self.settings)), profile_digest(style_profile(same)))
+        self.assertNotEqual(profile_digest(style_profile(self.settings)), profile_digest(style_profile(bigger)))
+
+    def test_overrides_cannot_inject_css(self):
+        profile = style_profile(dict(self.settings, font_family='x;} body{display:none', font_size='1e9'))
+        self.assertEqual(profile['font_family'], 'default')
+        self.assertEqual(profile['font_size'], 48)
+
+    def test_low_contrast_custom_colors_are_corrected(self):
+        dyslexia = dict(self.settings['dyslexia'], use_custom_colors=True,
+                        text_color='#EEEEEE', background_color='#FFFFFF')
+        profile = style_profile(dict(self.settings, dyslexia=dyslexia))
+        self.assertEqual(profile['background_color'], '#FFFFFF')
+        self.assertGreaterEqual(get_contrast_ratio(profile['text_color'], profile['background_color']), 4.5)
+
+    def test_stylesheet_is_served_immutably(self):
+        profile = style_profile(dict(self.settings, reduced_motion=True))
+        digest = profile_digest(profile)
+        factory = RequestFactory()
+        with override_settings(MEDIA_ROOT=self.media):
+            write_stylesheet(digest, profile)
+            response = StylesheetView.as_view()(factory.get('/'), digest=digest)
+            body = b''.join(response.streaming_content).decode()
+            not_modified = StylesheetView.as_view()(factory.get('/', HTTP_IF_NONE_MATCH=f'"{digest}"'),
+                                                    digest=digest)
+
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertIn('animation: none !important;', body)
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_stylesheet_url_resolves(self):
+        digest = profile_digest(style_profile(self.settings))
+        with override_settings(ROOT_URLCONF=app_urlconf()):
+            url = reverse('accessibility:stylesheet', args=[digest])
+            match = resolve(url)
+        self.assertEqual(url, f'/accessibility/css/{digest}.css')
+        self.assertIs(match.func.view_class, StylesheetView)
+        self.assertEqual(match.kwargs, {'digest': digest})
@@ -1,5 +1,5 @@
 """URL configuration for the accessibility app."""
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.views.generic import TemplateView
 from rest_framework.routers import DefaultRouter
 from . import views
@@ -122,6 +122,12 @@ urlpatterns = [
     # Settings
     path('settings/', views.AccessibilitySettingsView.as_view(), name='accessibility_settings'),
     
+    # Batch update several settings at once (AJAX, PATCH)
+    path('settings/batch/', views.BatchUpdateSettingsView.as_view(), name='batch_update_settings'),
+    
+    # Compiled per-profile stylesheets (immutable, named by content hash)
+    re_path(r'^css/(?P<digest>[0-9a-f]{16})\.css$', views.StylesheetView.as_view(), name='stylesheet'),
+    
     # Help and Documentation
     path('help/', include([
         path('', views.HelpCenterView.as_view(), name='help_center'),
@@ -7,14 +7,15 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse, HttpResponse
+from django.http import FileResponse, Http404, JsonResponse, HttpResponse
+from django.utils.http import quote_etag
 from django.utils.translation import gettext as _
 from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.http import require_POST
 from django.views.generic import View
 from django.utils.decorators import method_decorator
-from django.core.exceptions import PermissionDenied
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.conf import settings
 from .forms import AccessibilitySettingsForm
 from .models import (
@@ -23,6 +24,11 @@ from .models import (
     ADHDSettings,
     RewardSystem
 )
+from core.streaming import etag_matches, not_modified_response
+from .resolver import (
+    clean_settings_diff, clear_session_overrides, get_user_settings, resolve_settings, update_user_settings,
+)
+from .stylesheets import get_stylesheet_path
 
 class AccessibilitySettingsView(View):
     """View for managing accessibility settings."""
@@ -462,6 +468,54 @@ class UpdateSettingView(View):
             raise
 
 
+@method_decorator(login_required, name='dispatch')
+@method_decorator(require_http_methods(["PATCH"]), name='dispatch')
+class BatchUpdateSettingsView(View):
+    """
+    API endpoint applying several setting changes in one request.
+    
+    The body is a JSON diff grouped by model, e.g.
+    ``{"dyslexia": {"font_size": 18, "line_spacing": 1.8}, "adhd": {"enable_focus_mode": true}}``.
+    The response carries the new settings and their ``version``.
+    """
+    
+    def patch(self, request, *args, **kwargs):
+        """Handle PATCH request with a settings diff."""
+        try:
+            diff = clean_settings_diff(json.loads(request.body))
+        except json.JSONDecodeError:
+            return JsonResponse(
+                {'success': False, 'message': 'Invalid JSON data'}, 
+                status=400
+            )
+        except ValidationError as e:
+            errors = e.message_dict if hasattr(e, 'error_dict') else {'__all__': e.messages}
+            return JsonResponse(
+                {'success': False, 'message': 'Invalid settings', 'errors': errors}, 
+                status=400
+            )
+        
+        try:
+            previous = get_user_settings(request.user)
+            settings = update_user_settings(request.user, diff)
+            clear_session_overrides(getattr(request, 'session', None), previous, settings, diff)
+        except Exception as e:
+            import logging
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error updating settings: {str(e)}")
+            
+            return JsonResponse({
+                'success': False,
+                'message': f'Failed to update settings: {str(e)}'
+            }, status=500)
+        
+        return JsonResponse({
+            'success': True,
+            'version': settings['version'],
+            'settings': settings
+        })
+
+
 @method_decorator(login_required, name='dispatch')
 class GetSettingsView(View):
     """View to get all current settings."""
@@ -469,34 +523,8 @@ class GetSettingsView(View):
     def get(self, request, *args, **kwargs):
         """Handle GET request to retrieve all settings."""
         try:
-            # Get settings from session
-            settings = {
-                'high_contrast': request.session.get('high_contrast', False),
-                'dark_mode': request.session.get('dark_mode', False),
-                'text_size': request.session.get('text_size', '1'),
-                'dyslexia_font': request.session.get('dyslexia_font', False),
-                'keyboard_nav': request.session.get('keyboard_nav', True),
-                'screen_reader': request.session.get('screen_reader', False),
-                'animations': request.session.get('animations', True),
-                'reduced_motion': request.session.get('reduced_motion', False),
-                'enable_toolbar': request.session.get('enable_toolbar', True),
-                'color_blind': request.session.get('color_blind', 'none'),
-                'font_family': request.session.get('font_family', 'default'),
-                'line_spacing': float(request.session.get('line_spacing', 1.5)),
-                'letter_spacing': float(request.session.get('letter_spacing', 0.12)),
-                'word_spacing': float(request.session.get('word_spacing', 0.16)),
-                'tts_speed': float(request.session.get('tts_speed', 1.0)),
-            }
-            
-            # If no settings in session, try to get from database
-            if not any(settings.values()):
-                settings = self._get_settings_from_database(request.user, settings)
-                
-                # Save to session for future use
-                for key, value in settings.items():
-                    request.session[key] = value
-                
-                request.session.modified = True
+            # Cached per user by the resolver, with session overrides applied
+            settings = resolve_settings(request)
             
             return JsonResponse({
                 'success': True,
@@ -512,57 +540,6 @@ class GetSettingsView(View):
                 'success': False,
                 'message': f'Failed to retrieve settings: {str(e)}'
             }, status=500)
-    
-    def _get_settings_from_database(self, user, default_settings):
-        """Get settings from the database."""
-        settings = default_settings.copy()
-        
-        try:
-            # Get from AccessibilitySettings
-            if hasattr(user, 'accessibilitysettings'):
-                acc_settings = user.accessibilitysettings
-                settings.update({
-                    'high_contrast': acc_settings.high_contrast,
-                    'dark_mode': getattr(acc_settings, 'dark_mode', False),
-                    'keyboard_nav': acc_settings.keyboard_nav,
-                    'screen_reader': acc_settings.screen_reader,
-                    'animations': acc_settings.animations,
-                    'reduced_motion': acc_settings.reduced_motion,
-                })
-            
-            # Get from DyslexiaSettings
-            if hasattr(user, 'dyslexiasettings'):
-                dys_settings = user.dyslexiasettings
-                settings.update({
-                    'dyslexia_font': dys_settings.dyslexia_font,
-                    'font_family': dys_settings.font_family,
-                    'font_size': dys_settings.font_size,
-                    'line_spacing': float(dys_settings.line_spacing),
-                    'letter_spacing': float(dys_settings.letter_spacing),
-                    'word_spacing': float(dys_settings.word_spacing),
-                    'tts_speed': float(getattr(dys_settings, 'tts_speed', 1.0)),
-                })
-            
-            # Get from ADHDSettings if they exist
-            if hasattr(user, 'adhdsettings'):
-                adhd_settings = user.adhdsettings
-                settings.update({
-                    'enable_focus_mode': adhd_settings.enable_focus_mode,
-                    'enable_white_noise': adhd_settings.enable_white_noise,
-                    'enable_break_reminders': adhd_settings.enable_break_reminders,
-                    'show_visual_timers': adhd_settings.show_visual_timers,
-                    'show_progress_bars': adhd_settings.show_progress_bars,
-                    'enable_task_chunking': adhd_settings.enable_task_chunking,
-                    'reduce_animations': adhd_settings.reduce_animations,
-                })
-            
-            return settings
-            
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error getting settings from database: {str(e)}")
-            return default_settings
 
 
 @method_decorator(login_required, name='get')
@@ -572,103 +549,25 @@ class QuickAccessPanelView(View):
     
     def get(self, request, *args, **kwargs):
         """Handle GET request."""
-        # Initialize context with default settings
-        context = {
-            'settings': {
-                # General settings
-                'high_contrast': request.session.get('high_contrast', False),
-                'dark_mode': request.session.get('dark_mode', False),
-                'dyslexia_font': request.session.get('dyslexia_font', False),
-                'text_size': request.session.get('text_size', '1'),
-                'enable_toolbar': request.session.get('enable_toolbar', True),
-                'keyboard_nav': request.session.get('keyboard_nav', True),
-                'screen_reader': request.session.get('screen_reader', False),
-                'animations': request.session.get('animations', True),
-                'reduced_motion': request.session.get('reduced_motion', False),
-                'color_blind': request.session.get('color_blind', 'none'),
-                
-                # Font and spacing
-                'font_family': request.session.get('font_family', 'default'),
-                'line_spacing': float(request.session.get('line_spacing', 1.5)),
-                'letter_spacing': float(request.session.get('letter_spacing', 0.12)),
-                'word_spacing': float(request.session.get('word_spacing', 0.16)),
-                'tts_speed': float(request.session.get('tts_speed', 1.0)),
-                
-                # Dyslexia settings
-                'enable_text_to_speech': request.session.get('enable_text_to_speech', False),
-                'enable_spelling_assistance': request.session.get('enable_spelling_assistance', False),
-                'enable_grammar_assistance': request.session.get('enable_grammar_assistance', False),
-                'simplified_language': request.session.get('simplified_language', False),
-                
-                # ADHD settings
-                'enable_focus_mode': request.session.get('enable_focus_mode', False),
-                'enable_white_noise': request.session.get('enable_white_noise', False),
-                'enable_break_reminders': request.session.get('enable_break_reminders', False),
-                'show_visual_timers': request.session.get('show_visual_timers', True),
-                'show_progress_bars': request.session.get('show_progress_bars', True),
-                'enable_task_chunking': request.session.get('enable_task_chunking', True),
-                'reduce_animations': request.session.get('reduce_animations', False),
-            }
-        }
-        
-        # If no settings in session, try to get from database
-        if not any(context['settings'].values()):
-            context['settings'].update(self._get_settings_from_database(request.user))
-            
-            # Save to session for future use
-            for key, value in context['settings'].items():
-                request.session[key] = value
-            request.session.modified = True
-            
+        context = {'settings': resolve_settings(request)}
         return render(request, self.template_name, context)
+
+
+class StylesheetView(View):
+    """Serves a compiled accessibility stylesheet (see accessibility.stylesheets)."""
     
-    def _get_settings_from_database(self, user):
-        """Get settings from database models."""
-        settings = {}
-        
-        # Get from AccessibilitySettings
-        if hasattr(user, 'accessibilitysettings'):
-            acc_settings = user.accessibilitysettings
-            settings.update({
-                'high_contrast': acc_settings.high_contrast,
-                'dark_mode': getattr(acc_settings, 'dark_mode', False),
-                'keyboard_nav': acc_settings.keyboard_nav,
-                'screen_reader': acc_settings.screen_reader,
-                'animations': acc_settings.animations,
-                'reduced_motion': acc_settings.reduced_motion,
-            })
+    def get(self, request, digest, *args, **kwargs):
+        """Handle GET request; the content never changes for a digest."""
+        path = get_stylesheet_path(digest)
+        if path is None:
+            raise Http404("Unknown stylesheet")
+        if etag_matches(request, digest):
+            return not_modified_response(digest)
         
-        # Get from DyslexiaSettings
-        if hasattr(user, 'dyslexiasettings'):
-            dys_settings = user.dyslexiasettings
-            settings.update({
-                'dyslexia_font': dys_settings.dyslexia_font,
-                'font_family': dys_settings.font_family,
-                'font_size': dys_settings.font_size,
-                'line_spacing': float(dys_settings.line_spacing),
-                'letter_spacing': float(dys_settings.letter_spacing),
-                'word_spacing': float(dys_settings.word_spacing),
-                'tts_speed': float(getattr(dys_settings, 'tts_speed', 1.0)),
-                'enable_text_to_speech': getattr(dys_settings, 'enable_text_to_speech', False),
-                'enable_spelling_assistance': getattr(dys_settings, 'enable_spelling_assistance', False),
-                'enable_grammar_assistance': getattr(dys_settings, 'enable_grammar_assistance', False),
-                'simplified_language': getattr(dys_settings, 'simplified_language', False),
-            })
-        
-        # Get from ADHDSettings if they exist
-        if hasattr(user, 'adhdsettings'):
-            adhd_settings = user.adhdsettings
-            settings.update({
-                'enable_focus_mode': adhd_settings.enable_focus_mode,
-                'enable_white_noise': adhd_settings.enable_white_noise,
-                'enable_break_reminders': adhd_settings.enable_break_reminders,
-                'show_visual_timers': adhd_settings.show_visual_timers,
-                'show_progress_bars': adhd_settings.show_progress_bars,
-                'enable_task_chunking': adhd_settings.enable_task_chunking,
-                'reduce_animations': adhd_settings.reduce_animations,
-            })
-            
-        return settings
+        response = FileResponse(open(path, 'rb'), content_type='text/css')
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        response['ETag'] = quote_etag(digest)
+        return response
 
 
 class AccessibilityStatementView(View):
@@ -7,14 +7,15 @@ personalized learning experience for students with different learning needs.
 import logging
 from typing import Dict, List, Optional, Tuple
 import numpy as np
+from django.db.models import F
 from django.utils import timezone
 from datetime import timedelta
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
 
 from users.models import CustomUser
 from lessons.models import Lesson, Topic, LessonProgress
 from assessments.models import Assessment, AssessmentAttempt, Question, UserResponse
+from .recommendation.clustering import cluster_recommendations
+from .summarization.lessons import lesson_previews
 
 logger = logging.getLogger(__name__)
 
@@ -64,16 +65,21 @@ class AdaptiveLearningEngine:
                     if len(recommended) >= limit:
                         return recommended
         
-        # 2. If not enough recommendations, suggest lessons from related topics
+        # 2. If not enough recommendations, suggest what similar learners engaged with
         if len(recommended) < limit:
-            related_lessons = (
+            excluded = {l.id for l in completed_lessons} | {l.id for l in recommended}
+            recommended.extend(cluster_recommendations(self.user, limit - len(recommended), exclude=excluded))
+        
+        # 3. Before the first clustering run, fall back to the most completed lessons
+        if len(recommended) < limit:
+            popular_lessons = (
                 Lesson.objects
                 .filter(is_published=True)
-                .exclude(id__in=[l.id for l in completed_lessons])
-                .order_by('?')  # Random order for variety
+                .exclude(id__in=[l.id for l in completed_lessons] + [l.id for l in recommended])
+                .order_by(F('stats__completions').desc(nulls_last=True), 'id')
             )
             
-            for lesson in related_lessons:
+            for lesson in popular_lessons:
                 if self._is_appropriate_difficulty(lesson):
                     recommended.append(lesson)
                     if len(recommended) >= limit:
@@ -91,9 +97,13 @@ class AdaptiveLearningEngine:
             if lesson.topic:
                 completed_topics.add(lesson.topic)
         
-        # If no completed lessons, return some default topics
+        # If no completed lessons, start from the topics popular in the user's cluster
         if not completed_topics:
-            return list(Topic.objects.filter(is_active=True).order_by('?')[:3])
+            topics = []
+            for lesson in cluster_recommendations(self.user, limit=10):
+                if lesson.topic.is_active and lesson.topic not in topics:
+                    topics.append(lesson.topic)
+            return topics[:3] or list(Topic.objects.filter(is_active=True)[:3])
         
         # Otherwise, find related topics
         related_topics = set()
@@ -280,6 +290,7 @@ class AdaptiveLearningEngine:
         # Add personalized recommendations
         recommended_lessons = self.get_recommended_lessons(limit=3)
         if recommended_lessons:
+            previews = lesson_previews(recommended_lessons)
             learning_path.append({
                 'type': 'recommendation',
                 'title': 'Recommended for You',
@@ -288,7 +299,7 @@ class AdaptiveLearningEngine:
                     {
                         'id': lesson.id,
                         'title': lesson.title,
-                        'description': lesson.description[:100] + '...' if lesson.description else '',
+                        'description': previews[lesson.id],
                         'difficulty': lesson.difficulty,
                         'duration': lesson.duration or 10,
                         'content_type': lesson.content_type
@@ -17,9 +17,16 @@ class SentimentAnalysisSerializer(serializers.Serializer):
     """Serializer for sentiment analysis request."""
     text = serializers.CharField(required=True, max_length=10000)
 
+class SummarizationSerializer(serializers.Serializer):
+    """Serializer for extractive summarization request."""
+    text = serializers.CharField(required=True, max_length=50000)
+    max_sentences = serializers.IntegerField(default=3, min_value=1, max_value=10)
+    method = serializers.ChoiceField(choices=['textrank', 'centroid'], default='textrank')
+
 class EngagementAnalysisSerializer(serializers.Serializer):
     """Serializer for engagement analysis request."""
     video_frame = serializers.ImageField(required=False)
+    session_id = serializers.CharField(required=False, max_length=64)
     interaction_data = serializers.DictField(
         required=False,
         child=serializers.FloatField(),
@@ -2,21 +2,27 @@
 API Views for AI Services
 """
 import logging
-import base64
+import cv2
 import numpy as np
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
 from django.core.cache import cache
 
 from .orchestrator import ai_orchestrator
-from .serializers import (
+from .models import LearningAnalytics, LearningSession
+from .tts_service import audio_response, VoiceSettings
+from .api_serializers import (
     TextSimilaritySerializer,
     KeywordExtractionSerializer,
     SentimentAnalysisSerializer,
+    SummarizationSerializer,
     EngagementAnalysisSerializer
 )
 
@@ -99,6 +105,27 @@ class SentimentAnalysisView(BaseAIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class SummarizationView(BaseAIView):
+    """API endpoint for extractive text summarization."""
+    
+    def post(self, request):
+        """Summarize the given text."""
+        serializer = SummarizationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        
+        try:
+            summary = ai_orchestrator.summarize(data['text'], data['max_sentences'], data['method'])
+            return Response({"summary": summary, "method": data['method']})
+        except Exception as e:
+            logger.error(f"Error summarizing text: {e}")
+            return Response(
+                {"error": "Failed to summarize text"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 class EngagementAnalysisView(BaseAIView):
     """API endpoint for analyzing user engagement."""
     parser_classes = (MultiPartParser, FormParser, JSONParser)
@@ -111,6 +138,14 @@ class EngagementAnalysisView(BaseAIView):
         
         video_frame = None
         interaction_data = serializer.validated_data.get('interaction_data')
+        session_id = serializer.validated_data.get('session_id')
+        
+        # Transitions are broadcast to the session's group: only its owner may post frames for it
+        if session_id and not self._owns_session(request.user, session_id):
+            return Response(
+                {"error": "Learning session not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
         
         # Process video frame if provided
         if 'video_frame' in request.FILES:
@@ -130,8 +165,12 @@ class EngagementAnalysisView(BaseAIView):
         try:
             result = ai_orchestrator.analyze_engagement(
                 video_frame=video_frame,
-                interaction_data=interaction_data
+                interaction_data=interaction_data,
+                session_id=session_id,
+                user_id=request.user.pk
             )
+            if session_id and result.get('state_changed'):
+                self._publish_transition(request.user, session_id, result)
             return Response(result)
         except Exception as e:
             logger.error(f"Error analyzing engagement: {e}")
@@ -139,6 +178,31 @@ class EngagementAnalysisView(BaseAIView):
                 {"error": "Failed to analyze engagement"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    @staticmethod
+    def _owns_session(user, session_id):
+        try:
+            return LearningSession.objects.filter(id=session_id, user=user).exists()
+        except ValidationError:  # Not a UUID
+            return False
+    
+    def _publish_transition(self, user, session_id, result):
+        """Push a high/low engagement transition to the session group and record it."""
+        data = {
+            'session_id': session_id,
+            'state': result['engagement_state'],
+            'engagement_score': result['engagement_score'],
+        }
+        
+        channel_layer = get_channel_layer()
+        if channel_layer is not None:
+            async_to_sync(channel_layer.group_send)(
+                f'session_{session_id}',
+                {'type': 'engagement.state', 'data': data}
+            )
+        
+        # Persist only transitions, not every frame
+        LearningAnalytics.update_analytics(user, engagement_score=result['engagement_score'])
 
 class AdaptiveLearningView(BaseAIView):
     """API endpoint for adaptive learning features."""
@@ -159,9 +223,15 @@ class AdaptiveLearningView(BaseAIView):
 class TextToSpeechView(BaseAIView):
     """API endpoint for text-to-speech conversion."""
     
+    def get(self, request):
+        """Stream speech for ``?text=`` (usable directly as an ``<audio>`` source)."""
+        return self._speak(request, request.query_params.get('text', ''))
+    
     def post(self, request):
         """Convert text to speech."""
-        text = request.data.get('text', '')
+        return self._speak(request, request.data.get('text', ''))
+    
+    def _speak(self, request, text):
         if not text:
             return Response(
                 {"error": "Text is required"},
@@ -169,13 +239,8 @@ class TextToSpeechView(BaseAIView):
             )
         
         try:
-            # Generate speech (placeholder - implement actual TTS)
-            audio_data = b""  # Replace with actual TTS generation
-            
-            return Response({
-                "audio": base64.b64encode(audio_data).decode('utf-8'),
-                "format": "audio/mp3"
-            })
+            # Raw audio, streamed while it is generated and seekable once cached
+            return audio_response(request, text, VoiceSettings.for_user(request.user))
         except Exception as e:
             logger.error(f"Error in text-to-speech conversion: {e}")
             return Response(
@@ -0,0 +1,112 @@
+"""
+Dynamic micro-batching for SmartLearn Neuro
+Models like the sentence encoder cost nearly the same for a batch of 32
+inputs as for one, but requests arrive one input at a time. A
+``MicroBatcher`` queues inputs from any number of request threads; a
+worker thread takes the first waiting input, collects more for at most
+``max_wait_ms`` (or until ``max_batch_size``), runs the batch function
+once and resolves each caller's future with its row of the output. While
+a batch is being encoded new inputs keep queueing, so batches grow with
+load and an idle server adds no more than ``max_wait_ms`` of latency.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Sequence
+
+from core.instrumentation import timed
+from core.metrics import BATCH_QUEUE_SECONDS, BATCH_SIZE, BATCHED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Batch single-input calls to ``batch_fn``.
+
+    Args:
+        batch_fn: Function of a list of (hashable) inputs returning one output per input
+        name: Label of the batcher's metrics (``smartlearn_inference_*``)
+        max_batch_size: Most inputs passed to ``batch_fn`` at once
+        max_wait_ms: Longest the first input of a batch waits for company
+    """
+
+    def __init__(self, batch_fn: Callable[[List], Sequence], name: str,
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.batch_fn = batch_fn
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+
+    def _ensure_worker(self):
+        # Threads do not survive fork (gunicorn --preload, Celery prefork): start one per process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.SimpleQueue()
+            threading.Thread(target=self._run, args=(self._queue,), name=f'{self.name}-batcher',
+                             daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, item) -> Future:
+        """Queue one input; the future resolves to its output."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item, timeout: Optional[float] = None):
+        """Output for one input, computed in a batch with concurrent callers."""
+        return self.submit(item).result(timeout)
+
+    def _collect(self, requests: queue.SimpleQueue) -> list:
+        batch = [requests.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(requests.get(timeout=remaining) if remaining > 0 else requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, requests: queue.SimpleQueue):
+        while True:
+            batch = self._collect(requests)
+            # One bad batch must not end the thread: every later caller would wait on it
+            try:
+                self._serve(batch)
+            except Exception as e:
+                logger.error(f"Error in {self.name} batch of {len(batch)}: {e}", exc_info=True)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _serve(self, batch: list):
+        # Drop requests whose callers cancelled; the rest can no longer be cancelled
+        batch = [request for request in batch if request[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        for _, _, queued in batch:
+            BATCH_QUEUE_SECONDS.labels(batcher=self.name).observe(started - queued)
+        BATCH_SIZE.labels(batcher=self.name).observe(len(batch))
+        BATCHED_REQUESTS.labels(batcher=self.name).inc(len(batch))
+
+        # Identical inputs in a batch (popular queries) are computed once
+        unique = list(dict.fromkeys(item for item, _, _ in batch))
+        with timed(f'{self.name}_batch'):
+            outputs = list(self.batch_fn(unique))
+        if len(outputs) != len(unique):
+            raise ValueError(f"{self.name} batch function returned {len(outputs)} outputs for {len(unique)} inputs")
+        outputs = dict(zip(unique, outputs))
+        for item, future, _ in batch:
+            future.set_result(outputs[item])
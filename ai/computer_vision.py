@@ -2,14 +2,107 @@
 Computer Vision Utilities for SmartLearn Neuro
 """
 import cv2
+import time
 import numpy as np
+from collections import OrderedDict, deque
 from typing import Tuple, Dict, Optional, List
 import logging
 import mediapipe as mp
 from dataclasses import dataclass
 
+from core.instrumentation import timed
+
+from .config import ENGAGEMENT
+
 logger = logging.getLogger(__name__)
 
+# MediaPipe Face Mesh indices used for gesture features.
+# Each eye uses the six-point EAR layout (p1..p6): corners p1/p4, upper lid p2/p3, lower lid p6/p5.
+EYE_INDICES = np.array([
+    [33, 160, 158, 133, 153, 144],   # Left eye
+    [362, 385, 387, 263, 373, 380],  # Right eye
+])
+# Point pairs (within an eye) for the two vertical and one horizontal EAR distances
+EAR_PAIRS = np.array([[1, 5], [2, 4], [0, 3]])
+# Inner upper lip, inner lower lip, left mouth corner, right mouth corner
+MOUTH_INDICES = np.array([13, 14, 78, 308])
+NOSE_TIP_INDEX = 1
+
+# Index ranges exposed in ``FaceDetectionResult.landmarks``
+LANDMARK_REGIONS = {
+    'face_oval': (0, 17),
+    'left_eyebrow': (17, 22),
+    'right_eyebrow': (22, 27),
+    'nose_bridge': (27, 31),
+    'nose_tip': (31, 36),
+    'left_eye': (36, 42),
+    'right_eye': (42, 48),
+    'lips_outer': (48, 60),
+    'lips_inner': (60, 68),
+}
+
+
+def landmarks_to_array(landmarks) -> np.ndarray:
+    """
+    Convert MediaPipe landmarks into an ``(N, 3)`` float array.
+
+    This is the only place per-landmark attribute access happens; every
+    feature below works on the array with index arrays.
+
+    Args:
+        landmarks: Sequence of landmarks exposing ``x``, ``y`` and ``z``
+            (e.g. ``face_landmarks.landmark``)
+
+    Returns:
+        Array of shape ``(N, 3)`` (468 points, 478 with iris refinement)
+    """
+    return np.array([(p.x, p.y, p.z) for p in landmarks], dtype=np.float32)
+
+
+def compute_face_features(points: np.ndarray) -> Dict[str, float]:
+    """
+    Compute gesture features from a face mesh landmark array.
+
+    Args:
+        points: Landmark array of shape ``(N, 3)`` in normalized image coordinates
+
+    Returns:
+        Dictionary with eye aspect ratios, mouth opening and head pose
+    """
+    eps = 1e-6
+    eyes = points[EYE_INDICES, :2]  # (2, 6, 2)
+
+    # Both eyes' EAR distances in one shot: (2, 3)
+    dists = np.linalg.norm(eyes[:, EAR_PAIRS[:, 0]] - eyes[:, EAR_PAIRS[:, 1]], axis=-1)
+    ear = (dists[:, 0] + dists[:, 1]) / (2.0 * dists[:, 2] + eps)
+
+    eye_centers = eyes.mean(axis=1)  # (2, 2)
+    eye_mid = eye_centers.mean(axis=0)
+    eye_delta = eye_centers[1] - eye_centers[0]
+    inter_ocular = np.linalg.norm(eye_delta) + eps
+
+    mouth = points[MOUTH_INDICES, :2]
+    mouth_gap, mouth_width = np.linalg.norm(mouth[[0, 2]] - mouth[[1, 3]], axis=-1)
+    mouth_mid = mouth[2:].mean(axis=0)
+
+    # Head pose from the nose tip relative to the eye line and mouth
+    nose = points[NOSE_TIP_INDEX, :2]
+    yaw = (nose[0] - eye_mid[0]) / inter_ocular
+    pitch = (nose[1] - eye_mid[1]) / (mouth_mid[1] - eye_mid[1] + eps) - 0.5
+    roll = np.arctan2(eye_delta[1], eye_delta[0])
+
+    return {
+        'left_ear': float(ear[0]),
+        'right_ear': float(ear[1]),
+        'ear': float(ear.mean()),
+        'mouth_opening': float(mouth_gap / (mouth_width + eps)),
+        'yaw': float(yaw),
+        'pitch': float(pitch),
+        'roll': float(roll),
+        'gaze_offset': float(np.hypot(yaw, pitch)),
+    }
+
+
 @dataclass
 class FaceDetectionResult:
     """Container for face detection results."""
@@ -17,6 +110,8 @@ class FaceDetectionResult:
     face_count: int = 0
     face_locations: List[Tuple[int, int, int, int]] = None  # (top, right, bottom, left)
     landmarks: Dict[str, List[Tuple[float, float]]] = None
+    points: Optional[np.ndarray] = None  # (N, 3) landmark array of the first face
+    features: Dict[str, float] = None
     error: Optional[str] = None
 
 class FaceDetector:
@@ -50,7 +145,8 @@ class FaceDetector:
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             
             # Detect faces
-            results = self.face_detection.process(image_rgb)
+            with timed('vision'):
+                results = self.face_detection.process(image_rgb)
             
             if not results.detections:
                 return FaceDetectionResult(success=True, face_count=0)
@@ -92,55 +188,29 @@ class FaceDetector:
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             
             # Process the image and detect face landmarks
-            results = self.face_mesh.process(image_rgb)
+            with timed('vision'):
+                results = self.face_mesh.process(image_rgb)
             
             if not results.multi_face_landmarks:
                 return FaceDetectionResult(success=True, face_count=0)
             
-            # Extract landmarks
+            # Convert each face once, then slice the array per region
             landmarks = {}
+            points = None
             for face_landmarks in results.multi_face_landmarks:
-                landmarks['face_oval'] = [
-                    (landmark.x, landmark.y)
-                    for landmark in face_landmarks.landmark[0:17]  # Face oval points
-                ]
-                landmarks['left_eyebrow'] = [
-                    (landmark.x, landmark.y)
-                    for landmark in face_landmarks.landmark[17:22]  # Left eyebrow
-                ]
-                landmarks['right_eyebrow'] = [
-                    (landmark.x, landmark.y)
-                    for landmark in face_landmarks.landmark[22:27]  # Right eyebrow
-                ]
-                landmarks['nose_bridge'] = [
-                    (landmark.x, landmark.y)
-                    for landmark in face_landmarks.landmark[27:31]  # Nose bridge
-                ]
-                landmarks['nose_tip'] = [
-                    (landmark.x, landmark.y)
-                    for landmark in face_landmarks.landmark[31:36]  # Nose tip
-                ]
-                landmarks['left_eye'] = [
-                    (landmark.x, landmark.y)
-                    for landmark in face_landmarks.landmark[36:42]  # Left eye
-                ]
-                landmarks['right_eye'] = [
-                    (landmark.x, landmark.y)
-                    for landmark in face_landmarks.landmark[42:48]  # Right eye
-                ]
-                landmarks['lips_outer'] = [
-                    (landmark.x, landmark.y)
-                    for landmark in face_landmarks.landmark[48:60]  # Outer lips
-                ]
-                landmarks['lips_inner'] = [
-                    (landmark.x, landmark.y)
-                    for landmark in face_landmarks.landmark[60:68]  # Inner lips
-                ]
+                face_points = landmarks_to_array(face_landmarks.landmark)
+                if points is None:
+                    points = face_points
+                xy = face_points[:, :2]
+                for region, (start, end) in LANDMARK_REGIONS.items():
+                    landmarks[region] = list(map(tuple, xy[start:end].tolist()))
             
             return FaceDetectionResult(
                 success=True,
                 face_count=len(results.multi_face_landmarks),
-                landmarks=landmarks
+                landmarks=landmarks,
+                points=points,
+                features=compute_face_features(points)
             )
             
         except Exception as e:
@@ -150,49 +220,135 @@ class FaceDetector:
                 error=str(e)
             )
 
+class EngagementTracker:
+    """
+    Time-aware engagement state for a single learning session.
+    
+    Per-frame observations are averaged over a ring buffer and blended into a
+    running score whose weight decays by ``decay_rate`` per elapsed second, so
+    the score is independent of the frame rate. The score is mapped to a
+    ``high``/``low`` state with hysteresis and only transitions are reported.
+    """
+    
+    def __init__(self, decay_rate: float = None, window_size: int = None,
+                 high_threshold: float = None, low_threshold: float = None):
+        """Initialize the tracker, defaulting to the ``ENGAGEMENT`` settings."""
+        self.decay_rate = ENGAGEMENT['decay_rate'] if decay_rate is None else decay_rate
+        self.high_threshold = (ENGAGEMENT['high_engagement_threshold']
+                               if high_threshold is None else high_threshold)
+        self.low_threshold = (ENGAGEMENT['low_engagement_threshold']
+                              if low_threshold is None else low_threshold)
+        self.window = deque(maxlen=window_size or ENGAGEMENT['window_size'])
+        self.score = 0.5  # Neutral score
+        self.state = 'neutral'
+        self.last_update = None
+    
+    def update(self, observation: float, timestamp: Optional[float] = None) -> Optional[str]:
+        """
+        Add a per-frame engagement observation.
+        
+        Args:
+            observation: Engagement estimate for the frame (0-1)
+            timestamp: Observation time in seconds (defaults to ``time.monotonic()``)
+            
+        Returns:
+            The new state (``'high'`` or ``'low'``) on a transition, otherwise None
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        self.window.append(observation)
+        smoothed = sum(self.window) / len(self.window)
+        
+        if self.last_update is None:
+            self.score = smoothed
+        else:
+            retained = self.decay_rate ** max(0.0, now - self.last_update)
+            self.score = retained * self.score + (1.0 - retained) * smoothed
+        self.last_update = now
+        
+        previous = self.state
+        if self.score >= self.high_threshold:
+            self.state = 'high'
+        elif self.score <= self.low_threshold:
+            self.state = 'low'
+        
+        return self.state if self.state != previous else None
+
+
 class EngagementAnalyzer:
     """Analyze user engagement from video frames."""
     
     def __init__(self):
         """Initialize the engagement analyzer."""
         self.face_detector = FaceDetector()
-        self.engagement_score = 0.5  # Neutral score
-        self.decay_rate = 0.95  # Score decay rate per second
-        self.last_update = 0
+        self.max_tracked_sessions = ENGAGEMENT['max_tracked_sessions']
+        self._trackers: "OrderedDict[Tuple[Optional[int], str], EngagementTracker]" = OrderedDict()
+    
+    @staticmethod
+    def _tracker_key(session_id: Optional[str], user_id: Optional[int]) -> Tuple[Optional[int], str]:
+        # Keyed by user too, so a session id alone never reaches another learner's state
+        return user_id, str(session_id) if session_id is not None else 'default'
     
-    def analyze_frame(self, frame: np.ndarray) -> Dict:
+    def get_tracker(self, session_id: Optional[str] = None, user_id: Optional[int] = None) -> EngagementTracker:
+        """Get (or create) the engagement tracker for a user's session."""
+        key = self._tracker_key(session_id, user_id)
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            tracker = self._trackers[key] = EngagementTracker()
+            # Forget the least recently seen sessions
+            while len(self._trackers) > self.max_tracked_sessions:
+                self._trackers.popitem(last=False)
+        else:
+            self._trackers.move_to_end(key)
+        return tracker
+    
+    def reset(self, session_id: Optional[str] = None, user_id: Optional[int] = None):
+        """Drop the tracked state for a finished session."""
+        self._trackers.pop(self._tracker_key(session_id, user_id), None)
+    
+    def analyze_frame(self, frame: np.ndarray, session_id: Optional[str] = None,
+                      timestamp: Optional[float] = None, user_id: Optional[int] = None) -> Dict:
         """
         Analyze a video frame for engagement.
         
         Args:
             frame: Input video frame in BGR format
+            session_id: Learning session the frame belongs to
+            timestamp: Capture time in seconds (defaults to ``time.monotonic()``)
+            user_id: Learner the session belongs to
             
         Returns:
-            Dictionary containing engagement metrics
+            Dictionary containing engagement metrics. ``state_changed`` is True
+            only on the frame where the session moved between high and low.
         """
         try:
+            tracker = self.get_tracker(session_id, user_id)
+            
             # Detect faces
             face_result = self.face_detector.detect_faces(frame)
             
             if not face_result.success or face_result.face_count == 0:
+                # No face counts as looking away
+                transition = tracker.update(0.0, timestamp)
                 return {
                     'success': False,
                     'error': 'No faces detected',
-                    'engagement_score': 0.0
+                    'engagement_score': float(tracker.score),
+                    'engagement_state': tracker.state,
+                    'state_changed': transition is not None
                 }
             
             # Get face landmarks
             landmark_result = self.face_detector.detect_face_landmarks(frame)
             
-            # Calculate engagement score (simplified example)
+            # Calculate the per-frame engagement and update the running score
             engagement = self._calculate_engagement(face_result, landmark_result)
-            
-            # Update running score
-            self.engagement_score = 0.7 * engagement + 0.3 * self.engagement_score
+            transition = tracker.update(engagement, timestamp)
             
             return {
                 'success': True,
-                'engagement_score': float(self.engagement_score),
+                'engagement_score': float(tracker.score),
+                'engagement_state': tracker.state,
+                'state_changed': transition is not None,
                 'face_detected': True,
                 'face_count': face_result.face_count,
                 'landmarks_detected': landmark_result.success
@@ -207,13 +363,14 @@ class EngagementAnalyzer:
             }
     
     def _calculate_engagement(self, face_result, landmark_result) -> float:
-        """Calculate engagement score based on face and landmark data."""
+        """Calculate the per-frame engagement from face and landmark data."""
         # Base score on face detection
-        score = 0.5 if face_result.face_count > 0 else 0.0
+        score = 0.3 if face_result.face_count > 0 else 0.0
         
-        # Adjust based on landmarks if available
-        if landmark_result.success and landmark_result.landmarks:
-            # Add more sophisticated analysis here
-            score += 0.2
+        # Facing the screen with eyes open raises the score
+        features = landmark_result.features if landmark_result.success else None
+        if features:
+            score += 0.5 * max(0.0, 1.0 - features['gaze_offset'] / 0.35)
+            score += 0.2 * min(1.0, features['ear'] / 0.25)
         
         return min(max(score, 0.0), 1.0)
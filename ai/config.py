@@ -1,4 +1,4 @@
-""
+"""
 AI Configuration Settings
 """
 import os
@@ -21,7 +21,13 @@ NLP = {
     'spacy_model': 'en_core_web_sm',
     'sentence_model': 'all-MiniLM-L6-v2',
     'max_seq_length': 128,
-    'batch_size': 32
+    'batch_size': 32,
+    'pipe_batch_size': 256,  # Texts per spaCy nlp.pipe batch
+    'n_process': 1,  # spaCy worker processes for bulk jobs
+    # Concurrent embedding requests are encoded together (ai.batching)
+    'embedding_batch_size': 64,
+    'embedding_max_wait_ms': 5,  # Latency budget for collecting a batch
+    'embedding_timeout': 10  # Seconds a request waits for its batch before giving up
 }
 
 # Computer Vision Settings
@@ -48,7 +54,21 @@ RECOMMENDATION = {
     'max_recommendations': 5,
     'diversity_weight': 0.3,
     'popularity_weight': 0.2,
-    'relevance_weight': 0.5
+    'relevance_weight': 0.5,
+    # Implicit ALS (ai.recommendation.collaborative)
+    'cf_factors': 32,
+    'cf_regularization': 0.1,
+    'cf_iterations': 15,
+    'cf_alpha': 40,  # Confidence per unit of progress strength
+    # Co-completion similarity (ai.recommendation.similarity)
+    'similar_neighbors': 20,  # Neighbors kept per lesson
+    'similar_recent_lessons': 5,  # Recent lessons whose neighbors are blended
+    'similar_recency_decay': 0.7,
+    'similar_chunk_users': 5000,  # Learners folded per chunk of the batch job
+    # Learner clusters (ai.recommendation.clustering)
+    'learner_clusters': 8,
+    'cluster_batch_size': 1024,  # Mini-batch k-means batch size
+    'cluster_recommendations': 20  # Lessons ranked per cluster x difficulty level
 }
 
 # Engagement Analysis Settings
@@ -56,10 +76,36 @@ ENGAGEMENT = {
     'attention_span': 20,  # minutes
     'high_engagement_threshold': 0.7,
     'low_engagement_threshold': 0.3,
-    'decay_rate': 0.95,
+    'decay_rate': 0.95,  # Fraction of the running score kept per elapsed second
+    'window_size': 15,  # Frames averaged before blending into the running score
+    'max_tracked_sessions': 1000,
     'update_interval': 60  # seconds
 }
 
+# Model Inference Settings (ai.inference)
+INFERENCE = {
+    'onnx_opset': 13,
+    'intra_op_threads': 1  # ONNX Runtime threads per session; single rows gain nothing from more
+}
+
+# Text-to-Speech Settings
+TTS = {
+    'engine': 'gtts',  # Overridable with settings.AI_TTS_ENGINE (e.g. 'offline' in tests)
+    'cache_dir': 'tts_cache',  # Relative to MEDIA_ROOT
+    'max_cache_bytes': 512 * 1024 * 1024,
+    'async_min_chars': 2000,  # Longer texts are synthesized in a Celery task
+    'words_per_minute': {'normal': 150, 'slow': 125},
+    'narration_timeout': 60 * 60  # Seconds before a still-pending narration is marked failed
+}
+
+# Translation Settings
+TRANSLATION = {
+    'backend': 'google',  # Overridable with settings.AI_TRANSLATION_BACKEND (e.g. 'offline' in tests)
+    'source_lang': 'en',
+    'languages': ['es', 'fr'],  # Published lessons are pre-translated into these (settings.AI_TRANSLATION_LANGUAGES)
+    'batch_size': 50  # Segments per backend request
+}
+
 # Caching
 CACHING = {
     'enabled': True,
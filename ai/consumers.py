@@ -8,6 +8,8 @@ from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
 
+from core.metrics import WEBSOCKET_CONNECTIONS
+
 from .models import LearningSession
 from .tasks import update_learning_analytics_task, process_adaptive_assessment
 
@@ -15,7 +17,27 @@ User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
-class AnalyticsConsumer(AsyncWebsocketConsumer):
+class ConnectionMetricsMixin:
+    """
+    Track accepted connections in the ``smartlearn_websocket_connections`` gauge.
+    """
+    
+    _connection_counted = False
+    
+    async def accept(self, *args, **kwargs):
+        await super().accept(*args, **kwargs)
+        if not self._connection_counted:
+            WEBSOCKET_CONNECTIONS.labels(consumer=type(self).__name__).inc()
+            self._connection_counted = True
+    
+    async def websocket_disconnect(self, message):
+        if self._connection_counted:
+            WEBSOCKET_CONNECTIONS.labels(consumer=type(self).__name__).dec()
+            self._connection_counted = False
+        await super().websocket_disconnect(message)
+
+
+class AnalyticsConsumer(ConnectionMetricsMixin, AsyncWebsocketConsumer):
     """
     WebSocket consumer for real-time learning analytics.
     """
@@ -93,7 +115,7 @@ class AnalyticsConsumer(AsyncWebsocketConsumer):
             }))
 
 
-class LearningSessionConsumer(AsyncWebsocketConsumer):
+class LearningSessionConsumer(ConnectionMetricsMixin, AsyncWebsocketConsumer):
     """
     WebSocket consumer for adaptive learning sessions.
     """
@@ -155,6 +177,13 @@ class LearningSessionConsumer(AsyncWebsocketConsumer):
             'data': event['data']
         }))
     
+    async def engagement_state(self, event):
+        """Send an engagement state transition (high/low) to the client."""
+        await self.send(text_data=json.dumps({
+            'type': 'engagement.state',
+            'data': event['data']
+        }))
+    
     async def send_session_update(self):
         """Fetch and send updated session data."""
         try:
@@ -223,7 +252,7 @@ class LearningSessionConsumer(AsyncWebsocketConsumer):
             return False
 
 
-class AssessmentConsumer(AsyncWebsocketConsumer):
+class AssessmentConsumer(ConnectionMetricsMixin, AsyncWebsocketConsumer):
     """
     WebSocket consumer for real-time assessment monitoring.
     """
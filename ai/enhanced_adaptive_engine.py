@@ -7,29 +7,27 @@ from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import json
 
-import tensorflow as tf
-from tensorflow.keras.models import load_model
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import pandas as pd
-import spacy
 
 from django.conf import settings
 from django.utils import timezone
 from users.models import CustomUser
 from lessons.models import Lesson, Topic, LessonProgress
 from assessments.models import Assessment, AssessmentAttempt, Question
+from .inference import load_inference_model
 
 logger = logging.getLogger(__name__)
 
+# Input order of the engagement model
+ENGAGEMENT_FEATURES = ('face_detected', 'face_count', 'clicks', 'scrolls', 'active_time', 'idle_time')
+
 class EnhancedAdaptiveEngine:
     """Enhanced adaptive learning engine with advanced ML capabilities."""
     
     def __init__(self, user: CustomUser):
         self.user = user
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
-        self.nlp = spacy.load('en_core_web_sm')
-        self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
         self._load_models()
     
     def _load_models(self):
@@ -47,10 +45,7 @@ class EnhancedAdaptiveEngine:
         """Load the recommendation model."""
         try:
             # Try to load a pre-trained model if it exists
-            model_path = getattr(settings, 'RECOMMENDATION_MODEL_PATH', None)
-            if model_path:
-                return load_model(model_path)
-            return None
+            return load_inference_model(getattr(settings, 'RECOMMENDATION_MODEL_PATH', None))
         except Exception as e:
             self.logger.warning(f"Could not load recommendation model: {e}")
             return None
@@ -59,10 +54,7 @@ class EnhancedAdaptiveEngine:
         """Load the engagement prediction model."""
         try:
             # Try to load a pre-trained model if it exists
-            model_path = getattr(settings, 'ENGAGEMENT_MODEL_PATH', None)
-            if model_path:
-                return load_model(model_path)
-            return None
+            return load_inference_model(getattr(settings, 'ENGAGEMENT_MODEL_PATH', None))
         except Exception as e:
             self.logger.warning(f"Could not load engagement model: {e}")
             return None
@@ -108,7 +100,8 @@ class EnhancedAdaptiveEngine:
             
             if self.engagement_model:
                 # Use ML model for prediction
-                engagement_score = self.engagement_model.predict([features])[0][0]
+                vector = [features.get(name, 0) for name in ENGAGEMENT_FEATURES]
+                engagement_score = self.engagement_model.predict([vector])[0][0]
             else:
                 # Fallback to rule-based scoring
                 engagement_score = self._calculate_engagement_score(features)
@@ -227,8 +220,19 @@ class EnhancedAdaptiveEngine:
         }
     
     def _get_fallback_recommendations(self, limit):
-        """Get fallback recommendations if ML models fail."""
-        return list(Lesson.objects.order_by('?')[:limit].values('id', 'title', 'topic__name'))
+        """Get fallback recommendations if ML models fail: lessons popular in the user's cluster."""
+        from django.db.models import F
+        from .recommendation.clustering import cluster_recommendations
+
+        lessons = cluster_recommendations(self.user, limit)
+        if not lessons:
+            lessons = (
+                Lesson.objects
+                .filter(is_published=True)
+                .select_related('topic')
+                .order_by(F('stats__completions').desc(nulls_last=True), 'id')[:limit]
+            )
+        return [{'id': lesson.id, 'title': lesson.title, 'topic__name': lesson.topic.title} for lesson in lessons]
     
     def _get_engagement_level(self, score):
         """Convert engagement score to level."""
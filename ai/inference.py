@@ -0,0 +1,123 @@
+"""
+CPU inference for the Keras models of SmartLearn Neuro
+The ``.h5`` models are exported once to ONNX (``manage.py export_models``)
+and served with ONNX Runtime, which runs a single feature row in
+microseconds and loads without importing TensorFlow. Where no export exists
+yet, the Keras model is loaded as before, called directly instead of through
+``predict`` (which sets up a data pipeline per call).
+
+Both wrappers take a 2-D batch of float features and return a 2-D array,
+like ``keras.Model.predict``.
+"""
+import logging
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from core.metrics import MODEL_LOAD_SECONDS
+from .config import INFERENCE
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+
+def onnx_path_for(keras_path: PathLike) -> Path:
+    """Where the ONNX export of a Keras model lives: next to it, ``.onnx`` suffix."""
+    return Path(keras_path).with_suffix('.onnx')
+
+
+def export_keras_model(keras_path: PathLike, onnx_path: Optional[PathLike] = None,
+                       opset: Optional[int] = None) -> Path:
+    """
+    Convert a saved Keras model to ONNX (requires tensorflow and tf2onnx).
+
+    The batch dimension is left dynamic; the file is written atomically so
+    serving processes never load a partial export.
+
+    Returns:
+        Path of the ONNX model
+    """
+    import tensorflow as tf
+    import tf2onnx
+
+    onnx_path = Path(onnx_path or onnx_path_for(keras_path))
+    model = tf.keras.models.load_model(keras_path, compile=False)
+    signature = [tf.TensorSpec((None, *model.input_shape[1:]), tf.float32, name='features')]
+
+    fd, tmp = tempfile.mkstemp(dir=onnx_path.parent, suffix='.part')
+    os.close(fd)
+    try:
+        tf2onnx.convert.from_keras(model, input_signature=signature,
+                                   opset=opset or INFERENCE['onnx_opset'], output_path=tmp)
+        os.replace(tmp, onnx_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    logger.info(f"Exported {keras_path} to {onnx_path}")
+    return onnx_path
+
+
+class OnnxModel:
+    """ONNX Runtime session over an exported model."""
+    runtime = 'onnx'
+
+    def __init__(self, path: PathLike, threads: Optional[int] = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        # Requests score one row at a time: extra threads only add handoff latency
+        options.intra_op_num_threads = threads or INFERENCE['intra_op_threads']
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(path), options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, features) -> np.ndarray:
+        batch = np.atleast_2d(np.asarray(features, dtype=np.float32))
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class KerasModel:
+    """Fallback for models that have not been exported yet."""
+    runtime = 'keras'
+
+    def __init__(self, path: PathLike):
+        import tensorflow as tf
+
+        self.model = tf.keras.models.load_model(path, compile=False)
+
+    def predict(self, features) -> np.ndarray:
+        batch = np.atleast_2d(np.asarray(features, dtype=np.float32))
+        return self.model(batch, training=False).numpy()
+
+
+@lru_cache(maxsize=8)
+def _load(path: str, runtime: str, mtime_ns: int):
+    with MODEL_LOAD_SECONDS.labels(model=f'{Path(path).stem}_{runtime}').time():
+        return OnnxModel(path) if runtime == 'onnx' else KerasModel(path)
+
+
+def load_inference_model(keras_path: Optional[PathLike]):
+    """
+    The model saved at ``keras_path`` for inference, or None if there is none.
+
+    Prefers an ONNX export at least as new as the Keras file. Loaded models
+    are shared per process and reloaded when their file changes.
+    """
+    if not keras_path:
+        return None
+    keras_path, onnx_path = Path(keras_path), onnx_path_for(keras_path)
+    keras_mtime = keras_path.stat().st_mtime_ns if keras_path.exists() else None
+    onnx_mtime = onnx_path.stat().st_mtime_ns if onnx_path.exists() else None
+
+    if onnx_mtime is not None and (keras_mtime is None or onnx_mtime >= keras_mtime):
+        return _load(str(onnx_path), 'onnx', onnx_mtime)
+    if keras_mtime is not None:
+        logger.warning(f"Serving {keras_path} with TensorFlow; run `manage.py export_models` to export it")
+        return _load(str(keras_path), 'keras', keras_mtime)
+    return None
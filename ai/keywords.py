@@ -0,0 +1,266 @@
+"""
+Corpus TF-IDF keyword model for SmartLearn Neuro
+Term counts of every lesson and active knowledge base article are kept as a
+sparse matrix with their vocabulary, so IDF reflects the whole corpus and
+keyword extraction only transforms the input text. ``refit_keyword_model``
+re-analyzes just the documents that changed since the last fit.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from chatbot.models import ChatbotKnowledgeBase
+from core.fragments import bump_content_version
+from lessons.models import Lesson
+
+logger = logging.getLogger(__name__)
+
+# Same tokenization as the per-request TfidfVectorizer it replaces
+analyze = CountVectorizer(stop_words='english').build_analyzer()
+
+# Keywords stored on a lesson (Lesson.keywords holds at most 255 characters)
+LESSON_KEYWORDS = 8
+
+
+def model_dir() -> Path:
+    return Path(settings.AI_MODELS_DIR) / 'keywords'
+
+
+def _document_texts(keys: Iterable[str]) -> Dict[str, str]:
+    """Text of the corpus documents ``keys`` (``'lesson:<id>'`` / ``'kb:<id>'``)."""
+    ids = {'lesson': [], 'kb': []}
+    for key in keys:
+        kind, pk = key.split(':')
+        ids[kind].append(int(pk))
+
+    texts = {}
+    for pk, title, description, content in (Lesson.objects.filter(id__in=ids['lesson'])
+                                            .values_list('id', 'title', 'description', 'content')):
+        texts[f'lesson:{pk}'] = '\n'.join((title, description, content))
+    for pk, title, content in (ChatbotKnowledgeBase.objects.filter(id__in=ids['kb'])
+                               .values_list('id', 'title', 'content')):
+        texts[f'kb:{pk}'] = '\n'.join((title, content))
+    return texts
+
+
+def corpus_fingerprints() -> Dict[str, str]:
+    """Key -> last modification of every document the model is fitted on."""
+    fingerprints = {
+        f'lesson:{pk}': updated_at.isoformat()
+        for pk, updated_at in Lesson.objects.values_list('id', 'updated_at')
+    }
+    fingerprints.update(
+        (f'kb:{pk}', updated_at.isoformat())
+        for pk, updated_at in ChatbotKnowledgeBase.objects.filter(is_active=True).values_list('id', 'updated_at')
+    )
+    return fingerprints
+
+
+class KeywordModel:
+    """
+    Fitted corpus: a ``documents x terms`` count matrix, its vocabulary and
+    the fingerprint each document was analyzed at. Read-only once built, so
+    one instance is safely shared by every request thread.
+    """
+
+    def __init__(self, vocabulary: List[str] = None, documents: List[Tuple[str, str]] = None,
+                 counts: sparse.csr_matrix = None, version: str = ''):
+        self.vocabulary = vocabulary or []
+        self.documents = documents or []  # (key, fingerprint) per matrix row
+        self.counts = counts if counts is not None else sparse.csr_matrix((0, 0), dtype=np.int32)
+        self.version = version
+        self.index = {term: i for i, term in enumerate(self.vocabulary)}
+        self.rows = {key: i for i, (key, _) in enumerate(self.documents)}
+
+        # Smoothed IDF as in sklearn's TfidfTransformer; a term the corpus has
+        # never seen gets the IDF of a zero document frequency
+        n_docs = len(self.documents)
+        document_frequency = np.bincount(self.counts.indices, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + n_docs) / (1 + document_frequency)) + 1
+        self.unseen_idf = np.log(1 + n_docs) + 1
+
+    def __len__(self):
+        return len(self.documents)
+
+    @staticmethod
+    def _top(terms: List[str], weights: np.ndarray, top_n: int) -> List[Dict[str, float]]:
+        norm = np.linalg.norm(weights)
+        if not norm:
+            return []
+        top = np.argsort(-weights, kind='stable')[:top_n]
+        return [{'keyword': terms[i], 'score': float(weights[i] / norm)} for i in top if weights[i] > 0]
+
+    def extract(self, text: str, top_n: int = 10) -> List[Dict[str, float]]:
+        """Top ``top_n`` terms of ``text`` by L2-normalized TF-IDF against the corpus."""
+        counts = Counter(analyze(text))
+        terms = list(counts)
+        weights = np.array([
+            counts[term] * (self.idf[self.index[term]] if term in self.index else self.unseen_idf)
+            for term in terms
+        ], dtype=float)
+        return self._top(terms, weights, top_n)
+
+    def document_keywords(self, key: str, top_n: int = 10) -> List[Dict[str, float]]:
+        """Keywords of a corpus document, read from the matrix without re-analyzing it."""
+        row = self.rows.get(key)
+        if row is None:
+            return []
+        start, end = self.counts.indptr[row], self.counts.indptr[row + 1]
+        columns = self.counts.indices[start:end]
+        weights = self.counts.data[start:end] * self.idf[columns]
+        return self._top([self.vocabulary[i] for i in columns], weights, top_n)
+
+    def save(self, directory: Optional[Path] = None):
+        """
+        Persist the model. The matrix file is named by version and the small
+        metadata file naming it is replaced last, so readers never see a
+        half-written model.
+        """
+        directory = Path(directory or model_dir())
+        directory.mkdir(parents=True, exist_ok=True)
+        previous = directory / 'model.json'
+        old_matrix = json.loads(previous.read_text())['matrix'] if previous.exists() else None
+
+        matrix = f'counts-{self.version}.npz'
+        sparse.save_npz(directory / matrix, self.counts)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.part')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({
+                'version': self.version,
+                'matrix': matrix,
+                'vocabulary': self.vocabulary,
+                'documents': self.documents,
+            }, f)
+        os.replace(tmp, previous)
+        if old_matrix and old_matrix != matrix:
+            (directory / old_matrix).unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, directory: Optional[Path] = None) -> 'KeywordModel':
+        """The persisted model, or an empty one if none has been fitted yet."""
+        directory = Path(directory or model_dir())
+        try:
+            meta = json.loads((directory / 'model.json').read_text())
+        except FileNotFoundError:
+            return cls()
+        return cls(
+            vocabulary=meta['vocabulary'],
+            documents=[tuple(doc) for doc in meta['documents']],
+            counts=sparse.load_npz(directory / meta['matrix']).tocsr(),
+            version=meta['version'],
+        )
+
+
+def refit_keyword_model(model: Optional[KeywordModel] = None) -> KeywordModel:
+    """
+    Bring ``model`` (default: the persisted one) up to date with the corpus.
+
+    Rows of unchanged documents are reused; only new or modified documents
+    are read and analyzed. Deleted documents are dropped, and terms no
+    document uses any more are pruned from the vocabulary.
+    """
+    model = model if model is not None else KeywordModel.load()
+    current = corpus_fingerprints()
+
+    kept = [row for row, (key, fingerprint) in enumerate(model.documents) if current.get(key) == fingerprint]
+    kept_keys = {model.documents[row][0] for row in kept}
+    changed = [key for key in current if key not in kept_keys]
+
+    vocabulary = list(model.vocabulary)
+    index = dict(model.index)
+    data, indices, indptr = [], [], [0]
+    texts = _document_texts(changed)
+    for key in changed:
+        for term, count in Counter(analyze(texts.get(key, ''))).items():
+            if term not in index:
+                index[term] = len(vocabulary)
+                vocabulary.append(term)
+            indices.append(index[term])
+            data.append(count)
+        indptr.append(len(indices))
+
+    n_terms = len(vocabulary)
+    old = model.counts[kept] if kept else sparse.csr_matrix((0, n_terms), dtype=np.int32)
+    old = sparse.csr_matrix((old.data, old.indices, old.indptr), shape=(len(kept), n_terms))
+    new = sparse.csr_matrix((np.array(data, dtype=np.int32), indices, indptr), shape=(len(changed), n_terms))
+    counts = sparse.vstack([old, new], format='csr', dtype=np.int32)
+
+    used = np.flatnonzero(np.bincount(counts.indices, minlength=n_terms))
+    if len(used) < n_terms:
+        counts = counts[:, used]
+        vocabulary = [vocabulary[i] for i in used]
+
+    documents = [model.documents[row] for row in kept] + [(key, current[key]) for key in changed]
+    logger.info(f"Keyword model refit: {len(changed)} documents analyzed, {len(kept)} reused, "
+                f"{len(vocabulary)} terms")
+    return KeywordModel(vocabulary, documents, counts, version=uuid.uuid4().hex[:12])
+
+
+_model = None
+_model_mtime = None
+_model_lock = threading.Lock()
+
+
+def get_keyword_model() -> KeywordModel:
+    """
+    The persisted model, loaded once per process and reloaded when a refit
+    (typically in a Celery worker) replaces it.
+    """
+    global _model, _model_mtime
+    try:
+        mtime = (model_dir() / 'model.json').stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if _model is None or mtime != _model_mtime:
+        with _model_lock:
+            if _model is None or mtime != _model_mtime:
+                _model = KeywordModel.load()
+                _model_mtime = mtime
+    return _model
+
+
+def populate_lesson_keywords(model: KeywordModel, overwrite: bool = False, batch_size: int = 500) -> int:
+    """
+    Fill ``Lesson.keywords`` from the corpus model.
+
+    Args:
+        model: Fitted model (see ``refit_keyword_model``)
+        overwrite: Also replace keywords that are already set
+        batch_size: Lessons written per UPDATE
+
+    Returns:
+        Number of lessons updated
+    """
+    lessons = Lesson.objects.only('id', 'keywords')
+    if not overwrite:
+        lessons = lessons.filter(keywords='')
+
+    max_length = Lesson._meta.get_field('keywords').max_length
+    changed = []
+    for lesson in lessons:
+        keywords = ''
+        for entry in model.document_keywords(f'lesson:{lesson.pk}', LESSON_KEYWORDS):
+            candidate = f"{keywords}, {entry['keyword']}" if keywords else entry['keyword']
+            if len(candidate) > max_length:
+                break
+            keywords = candidate
+        if keywords and keywords != lesson.keywords:
+            lesson.keywords = keywords
+            changed.append(lesson)
+
+    updated = Lesson.objects.bulk_update(changed, ['keywords'], batch_size=batch_size) if changed else 0
+    if updated:
+        # bulk_update bypasses the signals that invalidate cached lesson fragments
+        bump_content_version('lessons')
+    return updated
@@ -0,0 +1,34 @@
+"""
+Export the Keras models to ONNX for ai.inference.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ai import config
+from ai.inference import export_keras_model
+
+
+class Command(BaseCommand):
+    help = "Export the Keras recommendation and engagement models (or the given .h5 files) to ONNX."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help="Keras model files (default: the configured models)")
+        parser.add_argument('--opset', type=int, default=None, help="ONNX opset version")
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or [
+            getattr(settings, 'RECOMMENDATION_MODEL_PATH', config.RECOMMENDATION_MODEL_PATH),
+            getattr(settings, 'ENGAGEMENT_MODEL_PATH', config.ENGAGEMENT_MODEL_PATH),
+        ]
+        exported = 0
+        for path in paths:
+            try:
+                onnx_path = export_keras_model(path, opset=options['opset'])
+            except ImportError as e:
+                raise CommandError(f"Exporting needs tensorflow and tf2onnx: {e}")
+            except OSError as e:
+                self.stderr.write(f"Skipping {path}: {e}")
+                continue
+            exported += 1
+            self.stdout.write(f"Exported {path} -> {onnx_path}")
+        self.stdout.write(self.style.SUCCESS(f"Exported {exported} model(s)"))
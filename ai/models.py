@@ -525,3 +525,18 @@ class AdaptiveLearningProfile(models.Model):
     
     def __str__(self):
         return f"Profile for {self.user.name}"
+
+class TranslationCache(models.Model):
+    """Persistent translation memory: one row per (source text, target language)"""
+    text_hash = models.CharField(max_length=64, help_text="SHA-256 of the source language and text")
+    target_lang = models.CharField(max_length=10)
+    source_text = models.TextField()
+    translated_text = models.TextField()
+    backend = models.CharField(max_length=20)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ('text_hash', 'target_lang')
+    
+    def __str__(self):
+        return f"{self.target_lang}: {self.source_text[:50]}"
@@ -0,0 +1,169 @@
+"""
+Lesson Narration for SmartLearn Neuro
+Builds per-condition narration manifests for published lessons so the lesson
+page plays pre-rendered audio chunk by chunk instead of synthesizing on request.
+"""
+import hashlib
+import logging
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from lessons.models import Lesson, LessonNarration
+from .config import TTS
+from .tts_service import tts_service, VoiceSettings, estimate_duration
+
+logger = logging.getLogger(__name__)
+
+# Learning conditions with their own chunk size and voice (see Lesson.get_chunks
+# and VoiceSettings.for_user); every other learner uses the NORMAL narration.
+NARRATION_CONDITIONS = ('NORMAL', 'ADHD', 'DYSLEXIA')
+
+
+def narration_condition(user) -> str:
+    """Map a user onto the narration variant that matches their chunking."""
+    condition = getattr(user, 'learning_condition', None)
+    return condition if condition in NARRATION_CONDITIONS else 'NORMAL'
+
+
+def _profile(condition: str) -> SimpleNamespace:
+    """Stand-in user carrying only what chunking and voice selection read."""
+    return SimpleNamespace(learning_condition=condition)
+
+
+def content_hash(lesson: Lesson) -> str:
+    """Fingerprint of the narrated content; a change invalidates the manifest."""
+    return lesson.content_hash or hashlib.sha256(lesson.content.encode('utf-8')).hexdigest()
+
+
+def narration_chunks(lesson: Lesson, condition: str) -> Tuple[VoiceSettings, List[str]]:
+    """Voice and chunk texts narrated for ``condition``."""
+    profile = _profile(condition)
+    return VoiceSettings.for_user(profile), lesson.get_chunks(profile)
+
+
+def build_lesson_narration(lesson: Lesson, force: bool = False) -> List[Tuple[str, dict]]:
+    """
+    Create or refresh the narration manifests of a lesson.
+
+    Audio is content-addressed, so each chunk's key (and file) is known before
+    it is rendered; the manifest is written up front and the audio follows.
+
+    Args:
+        lesson: Lesson to narrate
+        force: Rebuild manifests even if the content is unchanged
+
+    Returns:
+        List of ``(text, voice_dict)`` chunks that still need rendering
+    """
+    digest = content_hash(lesson)
+    pending = []
+
+    for condition in NARRATION_CONDITIONS:
+        narration, created = LessonNarration.objects.get_or_create(
+            lesson=lesson,
+            learning_condition=condition,
+            defaults={'content_hash': digest}
+        )
+        if not created and not force and narration.content_hash == digest and narration.status == 'ready':
+            continue
+
+        voice, texts = narration_chunks(lesson, condition)
+        manifest = []
+        missing = []
+        for index, text in enumerate(texts):
+            key = tts_service.cache_key(text, voice)
+            path = tts_service.path_for(key)
+            manifest.append({
+                'index': index,
+                'key': key,
+                'file': Path(path).relative_to(settings.MEDIA_ROOT).as_posix(),
+                'duration': round(estimate_duration(text, voice), 2),
+                'content_type': tts_service.engine.content_type,
+            })
+            if not path.exists():
+                missing.append((text, voice.to_dict()))
+
+        narration.content_hash = digest
+        narration.voice = voice.to_dict()
+        narration.chunks = manifest
+        narration.status = 'pending' if missing else 'ready'
+        narration.save()
+        pending.extend(missing)
+
+    logger.info(f"Narration manifests for lesson {lesson.pk}: {len(pending)} chunks to render")
+    return pending
+
+
+def mark_narration_ready(lesson_id: int) -> int:
+    """Flag the lesson's manifests whose audio files all exist as ready."""
+    ready = 0
+    for narration in LessonNarration.objects.filter(lesson_id=lesson_id, status='pending'):
+        media_root = Path(settings.MEDIA_ROOT)
+        if all((media_root / chunk['file']).exists() for chunk in narration.chunks):
+            narration.status = 'ready'
+            narration.save(update_fields=['status', 'updated_at'])
+            ready += 1
+    return ready
+
+
+def mark_narration_failed(lesson_id: int) -> int:
+    """
+    Flag the lesson's pending manifests as failed after a chunk failed to render.
+
+    Manifests whose audio all exists are still marked ready. A failed
+    manifest is rebuilt, and its missing chunks re-queued, on the next save.
+    """
+    mark_narration_ready(lesson_id)
+    failed = LessonNarration.objects.filter(lesson_id=lesson_id, status='pending').update(
+        status='failed', updated_at=timezone.now())
+    if failed:
+        logger.warning(f"Narration of lesson {lesson_id} failed for {failed} learning conditions")
+    return failed
+
+
+def sweep_pending_narrations(max_age: Optional[timedelta] = None) -> int:
+    """
+    Settle manifests pending for longer than ``max_age``, whose chord never
+    reported back (lost worker, expired result), as ready or failed.
+
+    Returns:
+        Number of manifests marked failed
+    """
+    if max_age is None:
+        max_age = timedelta(seconds=TTS['narration_timeout'])
+    lesson_ids = set(LessonNarration.objects.filter(
+        status='pending', updated_at__lt=timezone.now() - max_age
+    ).values_list('lesson_id', flat=True))
+    return sum(mark_narration_failed(lesson_id) for lesson_id in lesson_ids)
+
+
+def get_narration(lesson: Lesson, user) -> Optional[LessonNarration]:
+    """Narration manifest matching the user's learning condition, if built."""
+    return LessonNarration.objects.filter(
+        lesson=lesson,
+        learning_condition=narration_condition(user)
+    ).first()
+
+
+def chunk_audio_path(lesson: Lesson, narration: LessonNarration, index: int) -> Optional[str]:
+    """
+    Path of a narration chunk's audio, rendering it now if it is missing
+    (not yet rendered by the background job, or evicted from the cache).
+    """
+    chunk = narration.get_chunk(index)
+    if chunk is None:
+        return None
+
+    path = Path(settings.MEDIA_ROOT) / chunk['file']
+    if path.exists():
+        return str(path)
+
+    voice, texts = narration_chunks(lesson, narration.learning_condition)
+    if index >= len(texts):
+        return None
+    return tts_service.synthesize(texts[index], voice).path
@@ -6,12 +6,20 @@ import logging
 from typing import List, Dict, Optional, Tuple
 import numpy as np
 from sentence_transformers import SentenceTransformer
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from core.instrumentation import timed
+from .batching import MicroBatcher
+from .config import NLP
+from .keywords import get_keyword_model
+from .text_pipelines import pipe, tokenizer_pipeline
+
 logger = logging.getLogger(__name__)
 
+# Word lists of the lexicon-based sentiment score
+POSITIVE_WORDS = frozenset(['good', 'great', 'excellent', 'awesome', 'amazing'])
+NEGATIVE_WORDS = frozenset(['bad', 'poor', 'terrible', 'awful', 'worst'])
+
 class NLPService:
     """Service for handling NLP tasks."""
     
@@ -23,14 +31,15 @@ class NLPService:
     def _load_models(self):
         """Load NLP models."""
         try:
-            # Load spaCy model
-            self.nlp = spacy.load('en_core_web_sm')
+            # Sentiment only counts words, so a tokenizer is all it needs
+            self.nlp = tokenizer_pipeline()
             
             # Load sentence transformer model
             self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
-            
-            # Initialize TF-IDF vectorizer
-            self.tfidf_vectorizer = TfidfVectorizer(stop_words='english')
+            self.embedder = MicroBatcher(
+                self._encode_batch, name='embedding',
+                max_batch_size=NLP['embedding_batch_size'], max_wait_ms=NLP['embedding_max_wait_ms'],
+            )
             
             self.logger.info("NLP models loaded successfully")
             
@@ -38,10 +47,15 @@ class NLPService:
             self.logger.error(f"Error loading NLP models: {e}")
             raise
     
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return self.sentence_model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+    
     def get_text_embedding(self, text: str) -> np.ndarray:
         """
         Get embedding for a given text.
         
+        Concurrent calls are encoded in one batch (see ``ai.batching``).
+        
         Args:
             text: Input text
             
@@ -49,7 +63,8 @@ class NLPService:
             Numpy array containing the text embedding
         """
         try:
-            return self.sentence_model.encode(text, convert_to_numpy=True)
+            with timed('embedding'):
+                return self.embedder(text, timeout=NLP['embedding_timeout'])
         except Exception as e:
             self.logger.error(f"Error generating text embedding: {e}")
             return np.zeros(384)  # Default dimension for all-MiniLM-L6-v2
@@ -66,9 +81,10 @@ class NLPService:
             Similarity score between 0 and 1
         """
         try:
-            # Get embeddings for both texts
-            embedding1 = self.get_text_embedding(text1)
-            embedding2 = self.get_text_embedding(text2)
+            # Get embeddings for both texts (queued together, so usually one batch)
+            with timed('embedding'):
+                futures = [self.embedder.submit(text1), self.embedder.submit(text2)]
+                embedding1, embedding2 = (future.result(NLP['embedding_timeout']) for future in futures)
             
             # Calculate cosine similarity
             similarity = cosine_similarity(
@@ -86,6 +102,9 @@ class NLPService:
         """
         Extract keywords from text using TF-IDF.
         
+        IDF comes from the corpus model fitted over lessons and knowledge base
+        articles (see ``ai.keywords``); the text is only transformed.
+        
         Args:
             text: Input text
             top_n: Number of keywords to return
@@ -94,28 +113,31 @@ class NLPService:
             List of dictionaries with keywords and their scores
         """
         try:
-            # Fit the vectorizer
-            tfidf_matrix = self.tfidf_vectorizer.fit_transform([text])
-            
-            # Get feature names (words)
-            feature_names = self.tfidf_vectorizer.get_feature_names_out()
-            
-            # Get TF-IDF scores
-            scores = tfidf_matrix.toarray().flatten()
-            
-            # Sort by score
-            sorted_indices = np.argsort(scores)[::-1][:top_n]
-            
-            # Return top N keywords with scores
-            return [
-                {'keyword': feature_names[i], 'score': float(scores[i])}
-                for i in sorted_indices if scores[i] > 0
-            ]
-            
+            with timed('keywords'):
+                return get_keyword_model().extract(text, top_n)
         except Exception as e:
             self.logger.error(f"Error extracting keywords: {e}")
             return []
     
+    @staticmethod
+    def _sentiment_scores(doc) -> Dict[str, float]:
+        """Lexicon-based sentiment scores of a tokenized text."""
+        pos_count = sum(1 for token in doc if token.lower_ in POSITIVE_WORDS)
+        neg_count = sum(1 for token in doc if token.lower_ in NEGATIVE_WORDS)
+        
+        total_words = len(doc)
+        
+        # Calculate sentiment scores (simplified)
+        positive_score = pos_count / total_words if total_words > 0 else 0
+        negative_score = neg_count / total_words if total_words > 0 else 0
+        
+        return {
+            'positive': positive_score,
+            'negative': negative_score,
+            'neutral': max(0, 1 - (positive_score + negative_score)),
+            'compound': (positive_score - negative_score)
+        }
+    
     def analyze_sentiment(self, text: str) -> Dict[str, float]:
         """
         Analyze sentiment of a given text.
@@ -129,27 +151,7 @@ class NLPService:
         try:
             # This is a simple implementation
             # In production, you might want to use a pre-trained sentiment analysis model
-            doc = self.nlp(text)
-            
-            # Count positive and negative words (simplified example)
-            positive_words = ['good', 'great', 'excellent', 'awesome', 'amazing']
-            negative_words = ['bad', 'poor', 'terrible', 'awful', 'worst']
-            
-            pos_count = sum(1 for token in doc if token.text.lower() in positive_words)
-            neg_count = sum(1 for token in doc if token.text.lower() in negative_words)
-            
-            total_words = len(doc)
-            
-            # Calculate sentiment scores (simplified)
-            positive_score = pos_count / total_words if total_words > 0 else 0
-            negative_score = neg_count / total_words if total_words > 0 else 0
-            
-            return {
-                'positive': positive_score,
-                'negative': negative_score,
-                'neutral': max(0, 1 - (positive_score + negative_score)),
-                'compound': (positive_score - negative_score)
-            }
+            return self._sentiment_scores(self.nlp(text))
             
         except Exception as e:
             self.logger.error(f"Error in sentiment analysis: {e}")
@@ -160,6 +162,19 @@ class NLPService:
                 'compound': 0.0,
                 'error': str(e)
             }
+    
+    def analyze_sentiment_batch(self, texts: List[str], n_process: Optional[int] = None) -> List[Dict[str, float]]:
+        """
+        Analyze the sentiment of many texts, tokenized in batches.
+        
+        Args:
+            texts: Input texts
+            n_process: spaCy worker processes (see ``ai.text_pipelines.pipe``)
+            
+        Returns:
+            Sentiment scores per text, in input order
+        """
+        return [self._sentiment_scores(doc) for doc in pipe(self.nlp, texts, n_process=n_process)]
 
 # Singleton instance
 nlp_service = NLPService()
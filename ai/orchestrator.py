@@ -14,6 +14,8 @@ from .config import (
     NLP, COMPUTER_VISION, ADAPTIVE_LEARNING, RECOMMENDATION, ENGAGEMENT
 )
 from users.models import CustomUser
+from core.instrumentation import timed
+from core.metrics import MODEL_LOAD_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -43,13 +45,16 @@ class AIOrchestrator:
             logger.info("Initializing AI services...")
             
             # Initialize NLP service
-            self.nlp = NLPService()
+            with MODEL_LOAD_SECONDS.labels(model='nlp').time():
+                self.nlp = NLPService()
             
             # Initialize Computer Vision services
-            self.face_detector = FaceDetector(
-                min_detection_confidence=COMPUTER_VISION['face_detection_confidence']
-            )
-            self.engagement_analyzer = EngagementAnalyzer()
+            with MODEL_LOAD_SECONDS.labels(model='face_detection').time():
+                self.face_detector = FaceDetector(
+                    min_detection_confidence=COMPUTER_VISION['face_detection_confidence']
+                )
+            with MODEL_LOAD_SECONDS.labels(model='face_mesh').time():
+                self.engagement_analyzer = EngagementAnalyzer()
             
             logger.info("AI services initialized successfully")
             
@@ -66,20 +71,25 @@ class AIOrchestrator:
             raise
     
     def analyze_engagement(self, video_frame: Optional[np.ndarray] = None, 
-                          interaction_data: Optional[Dict] = None) -> Dict[str, Any]:
+                          interaction_data: Optional[Dict] = None,
+                          session_id: Optional[str] = None,
+                          user_id: Optional[int] = None) -> Dict[str, Any]:
         """
         Analyze user engagement.
         
         Args:
             video_frame: Optional video frame for visual analysis
             interaction_data: Optional interaction metrics
+            session_id: Optional learning session to track engagement over time
+            user_id: Learner the session belongs to
             
         Returns:
             Engagement analysis results
         """
         try:
             if video_frame is not None:
-                return self.engagement_analyzer.analyze_frame(video_frame)
+                return self.engagement_analyzer.analyze_frame(video_frame, session_id=session_id,
+                                                              user_id=user_id)
             return {"success": False, "error": "No video frame provided"}
         except Exception as e:
             logger.error(f"Engagement analysis failed: {e}")
@@ -100,6 +110,13 @@ class AIOrchestrator:
     def analyze_sentiment(self, text: str) -> Dict[str, float]:
         """Analyze sentiment of a given text."""
         return self.nlp.analyze_sentiment(text)
+    
+    def summarize(self, text: str, max_sentences: int = 3, method: str = 'textrank') -> str:
+        """Extractive summary of a given text."""
+        from .summarization.utils import summarize_text
+        
+        with timed('summarization'):
+            return summarize_text(text, max_sentences, method)
 
 # Global instance
 ai_orchestrator = AIOrchestrator()
@@ -0,0 +1,240 @@
+"""
+Learner clustering for SmartLearn Neuro
+Learners are described by a standardized feature vector (learning style,
+difficulty, engagement, pace, learning condition, completion rate) and
+grouped with mini-batch k-means by the nightly ``cluster_learners`` task.
+The task also ranks lessons for every cluster x difficulty level by how much
+the cluster's learners engaged with them, so users with little or no history
+are served a precomputed list for their cluster instead of a random one.
+New users are assigned to the nearest cluster centre on the fly.
+"""
+import logging
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+from lessons.models import DIFFICULTY_LEVELS, Lesson, LessonProgress
+from users.models import LEARNING_CONDITIONS, CustomUser
+from ..config import RECOMMENDATION
+from ..utils import CONTENT_TYPE_STYLES
+from .storage import MappedModel, load_arrays, published_lessons, save_arrays
+
+logger = logging.getLogger(__name__)
+
+STYLES = ('visual', 'auditory', 'reading_writing', 'kinesthetic')
+DIFFICULTIES = tuple(level for level, _ in DIFFICULTY_LEVELS)
+PACES = ('slow', 'medium', 'fast')
+CONDITIONS = tuple(condition for condition, _ in LEARNING_CONDITIONS)
+
+FEATURES = (*STYLES, 'difficulty', 'engagement', 'pace', *CONDITIONS, 'completion_rate')
+
+
+def model_dir() -> Path:
+    return Path(settings.AI_MODELS_DIR) / 'clusters'
+
+
+def _level(value: str, levels: Tuple[str, ...]) -> int:
+    value = (value or '').lower()
+    return levels.index(value) if value in levels else 0
+
+
+def learner_features(user_ids: Optional[List[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Raw (unscaled) feature matrix of learners, in two queries.
+
+    Learning style scores weigh lesson content types by the learner's
+    activity, as ``LearningStyleAnalyzer`` does; learners without activity
+    fall back to their stated media preferences.
+
+    Args:
+        user_ids: Learners to describe (default: every learner)
+
+    Returns:
+        ``(user_ids, features)``; row ``i`` (columns as in ``FEATURES``)
+        belongs to ``user_ids[i]``, sorted by id
+    """
+    users = CustomUser.objects.order_by('id')
+    progress = LessonProgress.objects.all()
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+        progress = progress.filter(user_id__in=user_ids)
+    users = list(users.values_list(
+        'id', 'difficulty_level', 'engagement_level', 'learning_pace', 'learning_condition',
+        'prefers_video', 'prefers_audio', 'prefers_text',
+    ))
+    ids = np.array([user[0] for user in users], dtype=np.int64)
+    index = {user_id: row for row, user_id in enumerate(ids.tolist())}
+
+    features = np.zeros((len(ids), len(FEATURES)))
+    enrolled = np.zeros(len(ids))
+    completed = np.zeros(len(ids))
+    activity = (
+        progress.values('user_id', 'lesson__content_type')
+        .annotate(count=Count('id'), time=Sum('time_spent'), completed=Count('id', filter=Q(is_completed=True)))
+        .order_by()
+    )
+    for item in activity:
+        row = index.get(item['user_id'])
+        if row is None:
+            continue
+        weight = item['count'] * 0.4 + (item['time'] or 0) / 3600 * 0.6
+        for style, share in CONTENT_TYPE_STYLES.get(item['lesson__content_type'], {}).items():
+            features[row, STYLES.index(style)] += weight * share
+        enrolled[row] += item['count']
+        completed[row] += item['completed']
+
+    for row, (_, difficulty, engagement, pace, condition, video, audio, text) in enumerate(users):
+        if not features[row, :len(STYLES)].any():
+            features[row, :len(STYLES)] = (video, audio, text, 0)
+        features[row, FEATURES.index('difficulty')] = _level(difficulty, DIFFICULTIES)
+        features[row, FEATURES.index('engagement')] = engagement or 0
+        features[row, FEATURES.index('pace')] = _level(pace, PACES)
+        if condition in CONDITIONS:
+            features[row, FEATURES.index(condition)] = 1
+
+    styles = features[:, :len(STYLES)]
+    totals = styles.sum(axis=1, keepdims=True)
+    features[:, :len(STYLES)] = np.divide(styles, totals, out=np.zeros_like(styles), where=totals > 0)
+    features[:, FEATURES.index('completion_rate')] = np.divide(
+        completed, enrolled, out=np.zeros_like(completed), where=enrolled > 0)
+    return ids, features
+
+
+def rank_lessons(user_ids: np.ndarray, labels: np.ndarray, n_clusters: int, top_n: int) -> np.ndarray:
+    """
+    Published lessons ranked for every cluster x difficulty level.
+
+    A lesson scores the completions plus fractional progress of the
+    cluster's learners on it, with a small share of its score across all
+    clusters so small clusters still get full lists.
+
+    Returns:
+        ``clusters x difficulties x top_n`` lesson ids, best first, -1 padded
+    """
+    lessons = list(Lesson.objects.filter(is_published=True).order_by('id').values_list('id', 'difficulty'))
+    lesson_ids = np.array([lesson_id for lesson_id, _ in lessons], dtype=np.int64)
+    difficulties = np.array([_level(difficulty, DIFFICULTIES) for _, difficulty in lessons], dtype=np.int64)
+
+    scores = np.zeros((n_clusters, len(lesson_ids)))
+    rows = LessonProgress.objects.values_list('user_id', 'lesson_id', 'progress_percentage', 'is_completed')
+    progress = np.array(list(rows.iterator(chunk_size=10000)), dtype=np.float64).reshape(-1, 4)
+    if len(progress) and len(lesson_ids) and len(user_ids):
+        users = progress[:, 0].astype(np.int64)
+        lessons = progress[:, 1].astype(np.int64)
+        user_rows = np.minimum(np.searchsorted(user_ids, users), len(user_ids) - 1)
+        lesson_columns = np.minimum(np.searchsorted(lesson_ids, lessons), len(lesson_ids) - 1)
+        known = (user_ids[user_rows] == users) & (lesson_ids[lesson_columns] == lessons)
+        engagement = progress[:, 3] + progress[:, 2] / 100
+        np.add.at(scores, (labels[user_rows[known]], lesson_columns[known]), engagement[known])
+    scores += 0.1 * scores.sum(axis=0) / max(n_clusters, 1)
+
+    rankings = np.full((n_clusters, len(DIFFICULTIES), top_n), -1, dtype=np.int64)
+    for level in range(len(DIFFICULTIES)):
+        columns = np.flatnonzero(difficulties == level)
+        for cluster in range(n_clusters):
+            # Stable sort: ties keep id order, so unseen lessons are listed oldest first
+            order = columns[np.argsort(-scores[cluster, columns], kind='stable')][:top_n]
+            rankings[cluster, level, :len(order)] = lesson_ids[order]
+    return rankings
+
+
+class ClusterModel:
+    """Cluster centres, the standardization they were fit in, assignments and rankings."""
+    ARRAYS = ('user_ids', 'labels', 'centers', 'mean', 'scale', 'rankings')
+
+    def __init__(self, user_ids: np.ndarray, labels: np.ndarray, centers: np.ndarray,
+                 mean: np.ndarray, scale: np.ndarray, rankings: np.ndarray, version: str = ''):
+        self.user_ids = user_ids
+        self.labels = labels
+        self.centers = centers
+        self.mean = mean
+        self.scale = scale
+        self.rankings = rankings
+        self.version = version
+        self.user_index = {int(user_id): row for row, user_id in enumerate(user_ids)}
+
+    def assign(self, features: np.ndarray) -> np.ndarray:
+        """Nearest cluster of each row of raw ``learner_features``."""
+        scaled = (features - self.mean) / self.scale
+        distances = ((scaled[:, None, :] - self.centers[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1)
+
+    def cluster_of(self, user_id: int) -> Optional[int]:
+        """The user's cluster: as assigned by the last run, or nearest for newer users."""
+        row = self.user_index.get(user_id)
+        if row is not None:
+            return int(self.labels[row])
+        ids, features = learner_features([user_id])
+        return int(self.assign(features)[0]) if len(ids) else None
+
+    def ranked_lessons(self, cluster: int, difficulty: str) -> List[int]:
+        return [int(lesson_id) for lesson_id in self.rankings[cluster, _level(difficulty, DIFFICULTIES)]
+                if lesson_id >= 0]
+
+    def save(self, directory: Optional[Path] = None):
+        save_arrays(directory or model_dir(), self.version, {name: getattr(self, name) for name in self.ARRAYS})
+
+    @classmethod
+    def load(cls, directory: Optional[Path] = None) -> Optional['ClusterModel']:
+        """The saved clusters, memory-mapped, or None before the first run."""
+        saved = load_arrays(directory or model_dir(), cls.ARRAYS)
+        if saved is None:
+            return None
+        version, arrays = saved
+        return cls(version=version, **arrays)
+
+
+def cluster_learners(n_clusters: Optional[int] = None, top_n: Optional[int] = None) -> ClusterModel:
+    """Cluster every learner and rank lessons for each cluster and difficulty level."""
+    n_clusters = n_clusters or RECOMMENDATION['learner_clusters']
+    top_n = top_n or RECOMMENDATION['cluster_recommendations']
+    user_ids, features = learner_features()
+    n_clusters = max(1, min(n_clusters, len(user_ids)))
+
+    scaler = StandardScaler().fit(features) if len(user_ids) else None
+    if scaler is None:
+        mean, scale = np.zeros(len(FEATURES)), np.ones(len(FEATURES))
+        labels, centers = np.zeros(0, dtype=np.int64), np.zeros((1, len(FEATURES)))
+    else:
+        mean, scale = scaler.mean_, scaler.scale_
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=RECOMMENDATION['cluster_batch_size'],
+                                 n_init=3, random_state=0)
+        labels = kmeans.fit_predict(scaler.transform(features)).astype(np.int64)
+        centers = kmeans.cluster_centers_
+
+    rankings = rank_lessons(user_ids, labels, n_clusters, top_n)
+    logger.info(f"Clustered {len(user_ids)} learners into {n_clusters} clusters")
+    return ClusterModel(user_ids, labels, centers.astype(np.float32), mean, scale, rankings,
+                        version=uuid.uuid4().hex[:12])
+
+
+_model = MappedModel(model_dir, ClusterModel.load)
+
+
+def get_cluster_model() -> Optional[ClusterModel]:
+    """The saved model, mapped once per process and re-mapped when a run replaces it."""
+    return _model.get()
+
+
+def cluster_recommendations(user: CustomUser, limit: int = 5, exclude: Optional[set] = None) -> List:
+    """
+    Published lessons popular in the user's cluster at their difficulty
+    level, excluding the ones they completed. Empty if there is no model.
+    """
+    model = get_cluster_model()
+    if model is None:
+        return []
+    cluster = model.cluster_of(user.id)
+    if cluster is None:
+        return []
+    exclude = set(exclude or ()) | set(
+        LessonProgress.objects.filter(user_id=user.id, is_completed=True).values_list('lesson_id', flat=True))
+    ranked = [lesson_id for lesson_id in model.ranked_lessons(cluster, user.difficulty_level)
+              if lesson_id not in exclude]
+    return published_lessons(ranked, limit)
@@ -0,0 +1,190 @@
+"""
+Collaborative filtering for SmartLearn Neuro
+Implicit-feedback matrix factorization (ALS, Hu, Koren & Volinsky 2008) over
+a sparse user x lesson matrix built from ``LessonProgress``. The factors are
+trained offline by the ``train_recommender`` task and saved as ``.npy``
+arrays that request processes memory-map, so scoring a user is one
+vector-matrix product over the lesson factors.
+"""
+import logging
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+
+from lessons.models import LessonProgress
+from ..config import RECOMMENDATION
+from .storage import MappedModel, load_arrays, published_lessons, save_arrays
+
+logger = logging.getLogger(__name__)
+
+
+def model_dir() -> Path:
+    return Path(settings.AI_MODELS_DIR) / 'collaborative'
+
+
+def interaction_matrix() -> Tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
+    """
+    Confidence matrix of every user's lesson progress.
+
+    Each progress row contributes ``alpha * r`` where ``r`` grows with the
+    progress made, completion and (logarithmically) time spent; the implicit
+    preference itself is 1 wherever a row exists.
+
+    Returns:
+        ``(matrix, user_ids, lesson_ids)``; row/column ``i`` of the matrix
+        belongs to ``user_ids[i]``/``lesson_ids[i]``
+    """
+    rows = LessonProgress.objects.values_list(
+        'user_id', 'lesson_id', 'progress_percentage', 'is_completed', 'time_spent'
+    )
+    data = np.array(list(rows.iterator(chunk_size=10000)), dtype=np.float64).reshape(-1, 5)
+    user_ids, users = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+    lesson_ids, lessons = np.unique(data[:, 1].astype(np.int64), return_inverse=True)
+
+    strength = data[:, 2] / 100 + data[:, 3] + np.log1p(data[:, 4] / 60)
+    confidence = RECOMMENDATION['cf_alpha'] * strength
+    matrix = sparse.csr_matrix((confidence, (users, lessons)), shape=(len(user_ids), len(lesson_ids)))
+    return matrix, user_ids, lesson_ids
+
+
+def _least_squares(confidence: sparse.csr_matrix, fixed: np.ndarray, regularization: float) -> np.ndarray:
+    """Solve every row's factors given the other side's ``fixed`` factors."""
+    factors = fixed.shape[1]
+    gram = fixed.T @ fixed + regularization * np.eye(factors)
+    solved = np.zeros((confidence.shape[0], factors))
+    for row in range(confidence.shape[0]):
+        start, end = confidence.indptr[row], confidence.indptr[row + 1]
+        if start == end:
+            continue
+        items = fixed[confidence.indices[start:end]]
+        weights = confidence.data[start:end]  # c - 1
+        # (Y^T C Y + lambda I) x = Y^T C p, with C = I + diag(weights) and p = 1 on observed items
+        a = gram + (items.T * weights) @ items
+        b = items.T @ (weights + 1)
+        solved[row] = np.linalg.solve(a, b)
+    return solved
+
+
+def train_als(matrix: sparse.csr_matrix, factors: Optional[int] = None, regularization: Optional[float] = None,
+              iterations: Optional[int] = None, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Factorize a user x item confidence matrix.
+
+    Returns:
+        ``(user_factors, item_factors)`` as float32 arrays
+    """
+    factors = factors or RECOMMENDATION['cf_factors']
+    regularization = regularization if regularization is not None else RECOMMENDATION['cf_regularization']
+    iterations = iterations or RECOMMENDATION['cf_iterations']
+
+    rng = np.random.default_rng(seed)
+    user_factors = rng.normal(scale=0.01, size=(matrix.shape[0], factors))
+    item_factors = rng.normal(scale=0.01, size=(matrix.shape[1], factors))
+    by_item = matrix.T.tocsr()
+    for _ in range(iterations):
+        user_factors = _least_squares(matrix, item_factors, regularization)
+        item_factors = _least_squares(by_item, user_factors, regularization)
+    return user_factors.astype(np.float32), item_factors.astype(np.float32)
+
+
+class CollaborativeModel:
+    """Trained factors with the user and lesson ids of their rows."""
+    ARRAYS = ('user_ids', 'lesson_ids', 'user_factors', 'item_factors')
+
+    def __init__(self, user_ids: np.ndarray, lesson_ids: np.ndarray,
+                 user_factors: np.ndarray, item_factors: np.ndarray, version: str = ''):
+        self.user_ids = user_ids
+        self.lesson_ids = lesson_ids
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.version = version
+        self.user_index = {int(user_id): row for row, user_id in enumerate(user_ids)}
+        self.lesson_index = {int(lesson_id): col for col, lesson_id in enumerate(lesson_ids)}
+
+    def knows(self, user_id: int) -> bool:
+        return user_id in self.user_index
+
+    def recommend(self, user_id: int, k: int = 10, exclude: Optional[set] = None,
+                  candidates: Optional[List[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Top ``k`` lessons for a user the model was trained on.
+
+        Args:
+            user_id: User to score
+            k: Number of lessons to return
+            exclude: Lesson ids never to return (e.g. completed ones)
+            candidates: Only score these lesson ids (default: every lesson)
+
+        Returns:
+            ``(lesson_id, score)`` pairs, best first; empty for unknown users
+        """
+        row = self.user_index.get(user_id)
+        if row is None:
+            return []
+        if candidates is None:
+            columns = np.arange(len(self.lesson_ids))
+            scores = self.item_factors @ self.user_factors[row]
+        else:
+            columns = np.array([self.lesson_index[lesson_id] for lesson_id in candidates
+                                if lesson_id in self.lesson_index], dtype=np.int64)
+            scores = self.item_factors[columns] @ self.user_factors[row]
+        if exclude:
+            scores[np.isin(self.lesson_ids[columns], list(exclude))] = -np.inf
+
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.lesson_ids[columns[i]]), float(scores[i])) for i in top]
+
+    def save(self, directory: Optional[Path] = None):
+        save_arrays(directory or model_dir(), self.version, {name: getattr(self, name) for name in self.ARRAYS})
+
+    @classmethod
+    def load(cls, directory: Optional[Path] = None) -> Optional['CollaborativeModel']:
+        """The saved model with its factors memory-mapped, or None before the first training."""
+        saved = load_arrays(directory or model_dir(), cls.ARRAYS)
+        if saved is None:
+            return None
+        version, arrays = saved
+        return cls(version=version, **arrays)
+
+
+def train_collaborative_model() -> CollaborativeModel:
+    """Build the interaction matrix and factorize it."""
+    matrix, user_ids, lesson_ids = interaction_matrix()
+    user_factors, item_factors = train_als(matrix)
+    logger.info(f"Trained collaborative model on {matrix.nnz} interactions "
+                f"({len(user_ids)} users x {len(lesson_ids)} lessons)")
+    return CollaborativeModel(user_ids, lesson_ids, user_factors, item_factors, version=uuid.uuid4().hex[:12])
+
+
+_model = MappedModel(model_dir, CollaborativeModel.load)
+
+
+def get_collaborative_model() -> Optional[CollaborativeModel]:
+    """
+    The saved model, mapped once per process and re-mapped when a training
+    run (typically in a Celery worker) replaces it.
+    """
+    return _model.get()
+
+
+def collaborative_recommendations(user_id: int, limit: int = 5) -> List:
+    """
+    Published lessons the model ranks highest for a user, excluding the ones
+    they completed. Empty if there is no model or it has not seen the user.
+    """
+    model = get_collaborative_model()
+    if model is None or not model.knows(user_id):
+        return []
+    completed = set(LessonProgress.objects.filter(user_id=user_id, is_completed=True)
+                    .values_list('lesson_id', flat=True))
+    # Over-fetch a little so unpublished lessons do not shorten the list
+    ranked = model.recommend(user_id, k=limit * 2, exclude=completed)
+    return published_lessons([lesson_id for lesson_id, _ in ranked], limit)
@@ -1,29 +1,41 @@
-import tensorflow as tf
-import numpy as np
-from django.db.models import Avg
-from lessons.models import LessonProgress, Lesson
+import logging
 
-def recommend_lessons(user_id, lesson_data):
+from lessons.models import LessonProgress
+from lessons.stats import get_lesson_stats
+
+from .collaborative import get_collaborative_model
+
+logger = logging.getLogger(__name__)
+
+# Progress at which a lesson counts as done and is no longer recommended
+COMPLETED_PROGRESS = 80
+
+
+def recommend_lessons(user_id, lesson_data, limit=3):
     """
     Recommend lessons based on user progress and preferences.
-    Uses a simple collaborative filtering approach.
+    Ranks by the offline collaborative filtering model when it knows the
+    user, otherwise by average progress across learners.
     """
     try:
         # Fetch user progress
-        progress = LessonProgress.objects.filter(user_id=user_id).values('lesson_id', 'progress')
-        completed_lessons = {p['lesson_id'] for p in progress if p['progress'] >= 80}
-
-        # Simple scoring: prioritize uncompleted lessons with high average progress
-        scores = []
-        for lesson in lesson_data:
-            lesson_id = lesson['id']
-            if lesson_id not in completed_lessons:
-                avg_progress = LessonProgress.objects.filter(lesson_id=lesson_id).aggregate(avg_progress=Avg('progress'))['avg_progress'] or 0
-                scores.append((lesson, avg_progress))
-        
-        # Sort by score and return top 3
-        scores.sort(key=lambda x: x[1], reverse=True)
-        return [lesson for lesson, _ in scores[:3]]
+        completed_lessons = set(
+            LessonProgress.objects
+            .filter(user_id=user_id, progress_percentage__gte=COMPLETED_PROGRESS)
+            .values_list('lesson_id', flat=True)
+        )
+        candidates = {lesson['id']: lesson for lesson in lesson_data if lesson['id'] not in completed_lessons}
+
+        model = get_collaborative_model()
+        if model is not None and model.knows(user_id):
+            ranked = model.recommend(user_id, k=limit, candidates=list(candidates))
+            if ranked:
+                return [candidates[lesson_id] for lesson_id, _ in ranked]
+
+        # Cold start: prioritize uncompleted lessons with high average progress
+        stats = get_lesson_stats(candidates)
+        ranked = sorted(candidates, key=lambda lesson_id: stats[lesson_id].average_progress, reverse=True)
+        return [candidates[lesson_id] for lesson_id in ranked[:limit]]
     except Exception as e:
-        print(f"Recommendation error: {e}")
-        return []  # Fallback to empty list
\ No newline at end of file
+        logger.error(f"Recommendation error: {e}")
+        return []  # Fallback to empty list
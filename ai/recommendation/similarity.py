@@ -0,0 +1,201 @@
+"""
+Item-item similarity for SmartLearn Neuro
+"Students who completed this also completed": cosine similarity of lesson
+co-completion counts, computed offline by the ``build_lesson_similarity``
+task. Only each lesson's top neighbors are kept, as two dense
+``lessons x neighbors`` arrays that request processes memory-map, so
+recommending from a learner's recent lessons reads a handful of rows.
+"""
+import logging
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+
+from lessons.models import Lesson, LessonProgress
+from ..config import RECOMMENDATION
+from .storage import MappedModel, load_arrays, published_lessons, save_arrays
+
+logger = logging.getLogger(__name__)
+
+
+def model_dir() -> Path:
+    return Path(settings.AI_MODELS_DIR) / 'similarity'
+
+
+def co_completion_counts(lesson_ids: np.ndarray, chunk_users: Optional[int] = None) -> sparse.csr_matrix:
+    """
+    Lesson x lesson counts of learners who completed both lessons.
+
+    Completions are streamed ordered by user and folded in ``chunk_users``
+    learners at a time, so memory is bounded by the chunk and the (sparse)
+    result rather than by the progress table.
+
+    Args:
+        lesson_ids: Sorted lesson ids; row/column ``i`` belongs to ``lesson_ids[i]``
+        chunk_users: Learners per chunk (default: ``RECOMMENDATION['similar_chunk_users']``)
+    """
+    chunk_users = chunk_users or RECOMMENDATION['similar_chunk_users']
+    n_lessons = len(lesson_ids)
+    counts = sparse.csr_matrix((n_lessons, n_lessons), dtype=np.float64)
+
+    def fold(users, lessons):
+        if not n_lessons or not lessons:
+            return counts
+        lessons = np.array(lessons, dtype=np.int64)
+        columns = np.minimum(np.searchsorted(lesson_ids, lessons), n_lessons - 1)
+        # Lessons created after lesson_ids was read are left out
+        known = lesson_ids[columns] == lessons
+        if not known.any():
+            return counts
+        _, rows = np.unique(np.array(users)[known], return_inverse=True)
+        columns = columns[known]
+        completed = sparse.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(rows.max() + 1, n_lessons))
+        return counts + (completed.T @ completed).tocsr()
+
+    completions = (
+        LessonProgress.objects
+        .filter(is_completed=True)
+        .order_by('user_id')
+        .values_list('user_id', 'lesson_id')
+    )
+    users, lessons, seen = [], [], 0
+    last_user = None
+    for user_id, lesson_id in completions.iterator(chunk_size=10000):
+        if user_id != last_user:
+            seen += 1
+            last_user = user_id
+            # Only cut between users, so every learner's completions land in one chunk
+            if seen > chunk_users:
+                counts = fold(users, lessons)
+                users, lessons, seen = [], [], 1
+        users.append(user_id)
+        lessons.append(lesson_id)
+    return fold(users, lessons)
+
+
+def top_neighbors(counts: sparse.csr_matrix, lesson_ids: np.ndarray,
+                  n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Each lesson's ``n_neighbors`` most similar lessons by cosine similarity
+    of their completion sets, ``count(i, j) / sqrt(count(i) * count(j))``.
+
+    Returns:
+        ``(neighbors, scores)``: lesson ids (-1 where a lesson has fewer
+        neighbors) and float32 similarities, best first
+    """
+    totals = counts.diagonal()
+    norms = np.sqrt(np.where(totals > 0, totals, 1))
+    similarity = (sparse.diags(1 / norms) @ counts @ sparse.diags(1 / norms)).tocsr()
+    similarity = (similarity - sparse.diags(similarity.diagonal())).tocsr()
+    similarity.eliminate_zeros()
+
+    neighbors = np.full((len(lesson_ids), n_neighbors), -1, dtype=np.int64)
+    scores = np.zeros((len(lesson_ids), n_neighbors), dtype=np.float32)
+    for row in range(similarity.shape[0]):
+        start, end = similarity.indptr[row], similarity.indptr[row + 1]
+        values, columns = similarity.data[start:end], similarity.indices[start:end]
+        if len(values) > n_neighbors:
+            keep = np.argpartition(-values, n_neighbors - 1)[:n_neighbors]
+            values, columns = values[keep], columns[keep]
+        order = np.argsort(-values)
+        neighbors[row, :len(order)] = lesson_ids[columns[order]]
+        scores[row, :len(order)] = values[order]
+    return neighbors, scores
+
+
+class SimilarityModel:
+    """Top neighbors of each lesson, row ``i`` belonging to ``lesson_ids[i]``."""
+    ARRAYS = ('lesson_ids', 'neighbors', 'scores')
+
+    def __init__(self, lesson_ids: np.ndarray, neighbors: np.ndarray, scores: np.ndarray, version: str = ''):
+        self.lesson_ids = lesson_ids
+        self.neighbors = neighbors
+        self.scores = scores
+        self.version = version
+        self.lesson_index = {int(lesson_id): row for row, lesson_id in enumerate(lesson_ids)}
+
+    def similar(self, lesson_id: int) -> List[Tuple[int, float]]:
+        """``(lesson_id, similarity)`` neighbors of a lesson, best first."""
+        row = self.lesson_index.get(lesson_id)
+        if row is None:
+            return []
+        return [(int(neighbor), float(score))
+                for neighbor, score in zip(self.neighbors[row], self.scores[row]) if neighbor >= 0]
+
+    def recommend(self, recent_lesson_ids: List[int], k: int = 10, exclude: Optional[set] = None,
+                  decay: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Blend the neighbors of a learner's recent lessons.
+
+        Args:
+            recent_lesson_ids: Lessons the learner worked on, most recent first
+            k: Number of lessons to return
+            exclude: Lesson ids never to return (the recent lessons always are)
+            decay: Weight of each lesson relative to the one before it
+
+        Returns:
+            ``(lesson_id, score)`` pairs, best first
+        """
+        decay = decay if decay is not None else RECOMMENDATION['similar_recency_decay']
+        exclude = set(exclude or ()) | set(recent_lesson_ids)
+        blended: Dict[int, float] = {}
+        for position, lesson_id in enumerate(recent_lesson_ids):
+            weight = decay ** position
+            for neighbor, score in self.similar(lesson_id):
+                if neighbor not in exclude:
+                    blended[neighbor] = blended.get(neighbor, 0.0) + weight * score
+        return sorted(blended.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def save(self, directory: Optional[Path] = None):
+        save_arrays(directory or model_dir(), self.version, {name: getattr(self, name) for name in self.ARRAYS})
+
+    @classmethod
+    def load(cls, directory: Optional[Path] = None) -> Optional['SimilarityModel']:
+        """The saved neighbors, memory-mapped, or None before the first build."""
+        saved = load_arrays(directory or model_dir(), cls.ARRAYS)
+        if saved is None:
+            return None
+        version, arrays = saved
+        return cls(version=version, **arrays)
+
+
+def build_similarity_model(n_neighbors: Optional[int] = None, chunk_users: Optional[int] = None) -> SimilarityModel:
+    """Count co-completions over all learners and keep each lesson's top neighbors."""
+    n_neighbors = n_neighbors or RECOMMENDATION['similar_neighbors']
+    lesson_ids = np.array(sorted(Lesson.objects.values_list('id', flat=True)), dtype=np.int64)
+    counts = co_completion_counts(lesson_ids, chunk_users)
+    neighbors, scores = top_neighbors(counts, lesson_ids, n_neighbors)
+    logger.info(f"Built lesson similarity over {len(lesson_ids)} lessons ({counts.nnz} co-completed pairs)")
+    return SimilarityModel(lesson_ids, neighbors, scores, version=uuid.uuid4().hex[:12])
+
+
+_model = MappedModel(model_dir, SimilarityModel.load)
+
+
+def get_similarity_model() -> Optional[SimilarityModel]:
+    """The saved model, mapped once per process and re-mapped when a build replaces it."""
+    return _model.get()
+
+
+def similar_recommendations(user_id: int, limit: int = 5) -> List:
+    """
+    Published lessons that learners who completed the user's recent lessons
+    also completed. Empty if there is no model or the user has no progress.
+    """
+    model = get_similarity_model()
+    if model is None:
+        return []
+    progress = list(
+        LessonProgress.objects.filter(user_id=user_id)
+        .order_by('-last_accessed')
+        .values_list('lesson_id', 'is_completed')
+    )
+    recent = [lesson_id for lesson_id, _ in progress[:RECOMMENDATION['similar_recent_lessons']]]
+    completed = {lesson_id for lesson_id, is_completed in progress if is_completed}
+    # Over-fetch a little so unpublished lessons do not shorten the list
+    ranked = model.recommend(recent, k=limit * 2, exclude=completed)
+    return published_lessons([lesson_id for lesson_id, _ in ranked], limit)
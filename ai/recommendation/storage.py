@@ -0,0 +1,84 @@
+"""
+Storage shared by the offline recommenders.
+
+A trained model is a set of numpy arrays saved as ``.npy`` files in a
+directory named by its version, next to a ``model.json`` pointer naming the
+current version. Request processes memory-map the arrays, so every worker
+on a host shares one copy in the page cache, and re-map them when a training
+run replaces the pointer.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def save_arrays(directory: Path, version: str, arrays: Dict[str, np.ndarray]):
+    """
+    Write ``arrays`` under ``directory/version``, then point ``model.json``
+    at it; the previous version is removed afterwards.
+    """
+    directory = Path(directory)
+    version_dir = directory / version
+    version_dir.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(version_dir / f'{name}.npy', array)
+
+    pointer = directory / 'model.json'
+    previous = json.loads(pointer.read_text())['version'] if pointer.exists() else None
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.part')
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'version': version}, f)
+    os.replace(tmp, pointer)
+    if previous and previous != version:
+        shutil.rmtree(directory / previous, ignore_errors=True)
+
+
+def load_arrays(directory: Path, names: Iterable[str]) -> Optional[Tuple[str, Dict[str, np.ndarray]]]:
+    """``(version, arrays)`` of the current version, memory-mapped; None before the first save."""
+    directory = Path(directory)
+    try:
+        version = json.loads((directory / 'model.json').read_text())['version']
+    except FileNotFoundError:
+        return None
+    return version, {name: np.load(directory / version / f'{name}.npy', mmap_mode='r') for name in names}
+
+
+class MappedModel:
+    """
+    Per-process handle on a saved model: ``load`` runs once, and again
+    whenever the ``model.json`` pointer under ``directory()`` changes.
+    """
+
+    def __init__(self, directory: Callable[[], Path], load: Callable[[], object]):
+        self.directory = directory
+        self.load = load
+        self._model = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        try:
+            mtime = (Path(self.directory()) / 'model.json').stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._model = self.load()
+                    self._mtime = mtime
+        return self._model
+
+
+def published_lessons(lesson_ids: List[int], limit: int) -> List:
+    """The published lessons among ``lesson_ids``, in that order, in one query."""
+    from lessons.models import Lesson
+
+    lessons = Lesson.objects.select_related('topic').in_bulk(lesson_ids)
+    return [lessons[lesson_id] for lesson_id in lesson_ids
+            if lesson_id in lessons and lessons[lesson_id].is_published][:limit]
@@ -3,6 +3,7 @@ Signals for the AI app.
 """
 import logging
 from django.db.models.signals import post_save, pre_save
+from django.db import transaction
 from django.dispatch import receiver
 from django.utils import timezone
 
@@ -10,6 +11,7 @@ from django.apps import apps
 
 # Get models using string references to avoid circular imports
 CustomUser = apps.get_model('users', 'CustomUser')
+Lesson = apps.get_model('lessons', 'Lesson')
 LessonProgress = apps.get_model('lessons', 'LessonProgress')
 AssessmentAttempt = apps.get_model('assessments', 'AssessmentAttempt')
 
@@ -47,6 +49,51 @@ def update_learning_metrics(sender, instance, created, **kwargs):
         logger.error(f"Error updating learning metrics: {str(e)}", exc_info=True)
 
 
+@receiver(post_save, sender=Lesson)
+def queue_lesson_narration(sender, instance, created, **kwargs):
+    """
+    Pre-render narration audio in the background when a lesson is published.
+    The task skips manifests whose content is unchanged.
+    """
+    if not instance.is_published:
+        return
+    
+    from .tasks import prerender_lesson_narration_task
+    
+    lesson_id = instance.pk
+    transaction.on_commit(lambda: prerender_lesson_narration_task.delay(lesson_id))
+
+
+@receiver(post_save, sender=Lesson)
+def queue_lesson_summary(sender, instance, created, **kwargs):
+    """
+    Precompute the extractive summary of a published lesson in the background.
+    The task skips lessons whose content is unchanged.
+    """
+    if not instance.is_published:
+        return
+    
+    from .tasks import summarize_lessons_task
+    
+    lesson_id = instance.pk
+    transaction.on_commit(lambda: summarize_lessons_task.delay([lesson_id]))
+
+
+@receiver(post_save, sender=Lesson)
+def queue_lesson_translation(sender, instance, created, **kwargs):
+    """
+    Pre-translate a published lesson into the configured languages.
+    The task skips translations whose content is unchanged.
+    """
+    if not instance.is_published:
+        return
+    
+    from .tasks import translate_lesson_task
+    
+    lesson_id = instance.pk
+    transaction.on_commit(lambda: translate_lesson_task.delay(lesson_id))
+
+
 @receiver(post_save, sender=AssessmentAttempt)
 def update_assessment_metrics(sender, instance, created, **kwargs):
     """
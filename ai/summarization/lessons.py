@@ -0,0 +1,77 @@
+"""
+Precomputed lesson summaries for SmartLearn Neuro
+Summaries are built in the background when a lesson is saved (see
+ai.signals) and stored in ``LessonSummary``, keyed by the content hash, so
+list and recommendation endpoints read them instead of running NLP inline.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from django.utils.text import Truncator
+
+from core.fragments import bump_content_version
+from lessons.models import Lesson, LessonSummary
+from .utils import SUMMARY_SENTENCES, summarize_texts
+
+logger = logging.getLogger(__name__)
+
+# Characters of the description shown while a lesson has no summary yet
+PREVIEW_FALLBACK_CHARS = 100
+
+
+def build_lesson_summaries(lesson_ids: Optional[List[int]] = None, force: bool = False,
+                           batch_size: int = 100) -> int:
+    """
+    Summarize lessons whose content changed since their summary was built.
+
+    Args:
+        lesson_ids: Lessons to consider (default: all)
+        force: Rebuild summaries even if the content is unchanged
+        batch_size: Lessons summarized per ``nlp.pipe`` batch and write
+
+    Returns:
+        Number of summaries written
+    """
+    lessons = Lesson.objects.only('id', 'content', 'content_hash').order_by('id')
+    summaries = LessonSummary.objects.all()
+    if lesson_ids is not None:
+        lessons = lessons.filter(id__in=lesson_ids)
+        summaries = summaries.filter(lesson_id__in=lesson_ids)
+
+    built = dict(summaries.values_list('lesson_id', 'content_hash'))
+    stale = [lesson for lesson in lessons if force or built.get(lesson.pk) != lesson.content_hash]
+
+    written = 0
+    for start in range(0, len(stale), batch_size):
+        batch = stale[start:start + batch_size]
+        texts = summarize_texts([lesson.content for lesson in batch], SUMMARY_SENTENCES)
+        LessonSummary.objects.bulk_create(
+            [LessonSummary(lesson=lesson, content_hash=lesson.content_hash, text=text)
+             for lesson, text in zip(batch, texts)],
+            update_conflicts=True,
+            unique_fields=['lesson'],
+            update_fields=['content_hash', 'text', 'method', 'updated_at'],
+        )
+        written += len(batch)
+
+    if written:
+        # bulk_create bypasses the signals that invalidate cached lesson fragments
+        bump_content_version('lessons')
+        logger.info(f"Built {written} lesson summaries")
+    return written
+
+
+def lesson_previews(lessons: Iterable[Lesson]) -> Dict[int, str]:
+    """
+    Preview text per lesson id: the stored summary, or the truncated
+    description while the summary is still being built. One query.
+    """
+    lessons = list(lessons)
+    summaries = dict(LessonSummary.objects
+                     .filter(lesson_id__in=[lesson.pk for lesson in lessons])
+                     .values_list('lesson_id', 'text'))
+    return {
+        lesson.pk: summaries.get(lesson.pk)
+        or Truncator(lesson.description or '').chars(PREVIEW_FALLBACK_CHARS)
+        for lesson in lessons
+    }
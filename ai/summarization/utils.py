@@ -1,13 +1,100 @@
-import spacy
-
-try:
-    nlp = spacy.load('en_core_web_sm')
-except OSError:
-    from spacy.cli import download
-    download('en_core_web_sm')
-    nlp = spacy.load('en_core_web_sm')
-
-def summarize_text(text):
-    doc = nlp(text)
-    sentences = [sent.text for sent in doc.sents]
-    return ' '.join(sentences[:2])
\ No newline at end of file
+"""
+Extractive summarization for SmartLearn Neuro
+Sentences are ranked over their TF-IDF vectors, either by TextRank (PageRank
+on the sentence similarity graph) or by closeness to the document centroid,
+and the best ones are returned in their original order.
+"""
+from typing import List, Optional
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Sentences kept by summarize_text
+SUMMARY_SENTENCES = 3
+
+SUMMARY_METHODS = ('textrank', 'centroid')
+
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_MAX_ITERATIONS = 100
+TEXTRANK_TOLERANCE = 1e-6
+
+
+def sentence_vectors(sentences: List[str]) -> Optional[np.ndarray]:
+    """L2-normalized TF-IDF rows of the sentences, or None if no sentence has a content word."""
+    try:
+        return TfidfVectorizer(stop_words='english').fit_transform(sentences).toarray()
+    except ValueError:  # empty vocabulary
+        return None
+
+
+def textrank_scores(vectors: np.ndarray) -> np.ndarray:
+    """PageRank of each sentence on the graph weighted by cosine similarity."""
+    n = len(vectors)
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # A sentence sharing no words with the others links to every sentence
+    transition = np.where(out_weight > 0, similarity / np.where(out_weight > 0, out_weight, 1), 1 / n)
+
+    scores = np.full(n, 1 / n)
+    for _ in range(TEXTRANK_MAX_ITERATIONS):
+        updated = (1 - TEXTRANK_DAMPING) / n + TEXTRANK_DAMPING * transition.T @ scores
+        converged = np.abs(updated - scores).sum() < TEXTRANK_TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def centroid_scores(vectors: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each sentence to the centroid of all of them."""
+    centroid = vectors.mean(axis=0)
+    norm = np.linalg.norm(centroid)
+    return vectors @ centroid / norm if norm else np.zeros(len(vectors))
+
+
+def select_sentences(sentences: List[str], max_sentences: int = SUMMARY_SENTENCES,
+                     method: str = 'textrank') -> List[str]:
+    """
+    The ``max_sentences`` most central sentences, in document order.
+
+    Args:
+        sentences: Sentences of one document
+        max_sentences: Sentences to keep
+        method: ``'textrank'`` or ``'centroid'``
+
+    Returns:
+        The selected sentences
+    """
+    if method not in SUMMARY_METHODS:
+        raise ValueError(f"Unknown summarization method: {method}")
+    sentences = [sentence.strip() for sentence in sentences if sentence.strip()]
+    if len(sentences) <= max_sentences:
+        return sentences
+
+    vectors = sentence_vectors(sentences)
+    if vectors is None:
+        return sentences[:max_sentences]
+    scores = textrank_scores(vectors) if method == 'textrank' else centroid_scores(vectors)
+    # Stable sort, so ties keep the earlier sentence
+    best = sorted(np.argsort(-scores, kind='stable')[:max_sentences])
+    return [sentences[i] for i in best]
+
+
+def summarize_text(text: str, n_sentences: int = SUMMARY_SENTENCES, method: str = 'textrank') -> str:
+    """Extractive summary of ``text`` of at most ``n_sentences`` sentences."""
+    from ai.text_pipelines import sentence_pipeline
+
+    doc = sentence_pipeline()(text)
+    return ' '.join(select_sentences([sent.text for sent in doc.sents], n_sentences, method))
+
+
+def summarize_texts(texts: List[str], n_sentences: int = SUMMARY_SENTENCES, method: str = 'textrank',
+                    n_process: Optional[int] = None) -> List[str]:
+    """Summaries of many texts, split into sentences in batches."""
+    from ai.text_pipelines import pipe, sentence_pipeline
+
+    return [
+        ' '.join(select_sentences([sent.text for sent in doc.sents], n_sentences, method))
+        for doc in pipe(sentence_pipeline(), texts, n_process=n_process)
+    ]
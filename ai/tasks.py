@@ -6,12 +6,14 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
 from django.utils import timezone
-from celery import shared_task
+from celery import shared_task, chord
 
 from lessons.models import LessonProgress, Lesson
 from assessments.models import AssessmentAttempt, UserResponse, Question
 from users.models import CustomUser
+from core import metrics  # noqa: F401  (registers the Celery task duration receivers)
 from .utils import LearningStyleAnalyzer, get_learning_analytics, generate_adaptive_lesson_plan
+from .tts_service import tts_service, VoiceSettings
 
 logger = logging.getLogger(__name__)
 
@@ -246,3 +248,252 @@ def process_adaptive_assessment(attempt_id: int) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Error processing adaptive assessment: {str(e)}", exc_info=True)
         return {'status': 'error', 'message': str(e)}
+
+
+@shared_task(name="synthesize_speech")
+def synthesize_speech_task(text: str, voice: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Render long text to speech in the background.
+    
+    Args:
+        text: Text to speak.
+        voice: Voice settings as a dict (see ``VoiceSettings``).
+        
+    Returns:
+        dict: The rendered audio (key, url, duration, ...).
+    """
+    try:
+        audio = tts_service.synthesize(text, VoiceSettings(**(voice or {})))
+        return audio.to_dict()
+    except Exception as e:
+        logger.error(f"Error in synthesize_speech_task: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(name="prerender_tts_phrases")
+def prerender_tts_phrases_task() -> int:
+    """
+    Render the canned feedback phrases for every voice into the audio cache.
+    
+    Returns:
+        int: Number of newly rendered files.
+    """
+    rendered = tts_service.prerender_canned_phrases()
+    evicted = tts_service.evict()
+    logger.info(f"Pre-rendered {rendered} TTS phrases, evicted {evicted} cached files")
+    return rendered
+
+
+@shared_task(name="prerender_lesson_narration")
+def prerender_lesson_narration_task(lesson_id: int, force: bool = False) -> Dict[str, Any]:
+    """
+    Build narration manifests for a published lesson and render missing chunks.
+    
+    Each chunk is rendered by its own ``synthesize_speech`` task; the manifests
+    are flagged ready once all of them have finished, or failed if one of them
+    raised.
+    
+    Args:
+        lesson_id: The ID of the lesson.
+        force: Rebuild the manifests even if the content is unchanged.
+        
+    Returns:
+        dict: Number of chunks queued for rendering.
+    """
+    from .narration import build_lesson_narration
+    
+    try:
+        lesson = Lesson.objects.get(id=lesson_id, is_published=True)
+    except Lesson.DoesNotExist:
+        logger.warning(f"Lesson {lesson_id} does not exist or is not published")
+        return {'lesson_id': lesson_id, 'queued': 0}
+    
+    pending = build_lesson_narration(lesson, force=force)
+    if pending:
+        callback = mark_lesson_narration_ready_task.si(lesson_id)
+        callback.on_error(mark_lesson_narration_failed_task.s(lesson_id))
+        chord(
+            synthesize_speech_task.s(text, voice) for text, voice in pending
+        )(callback)
+    
+    return {'lesson_id': lesson_id, 'queued': len(pending)}
+
+
+@shared_task(name="mark_lesson_narration_ready")
+def mark_lesson_narration_ready_task(lesson_id: int) -> int:
+    """
+    Flag a lesson's narration manifests as ready once their audio exists.
+    
+    Args:
+        lesson_id: The ID of the lesson.
+        
+    Returns:
+        int: Number of manifests marked ready.
+    """
+    from .narration import mark_narration_ready
+    
+    return mark_narration_ready(lesson_id)
+
+
+@shared_task(name="mark_lesson_narration_failed")
+def mark_lesson_narration_failed_task(request, exc, traceback, lesson_id: int) -> int:
+    """
+    Errback of the narration chord: flag the manifests failed so the next
+    save of the lesson re-queues the missing chunks.
+    
+    Args:
+        request: The failed task's request.
+        exc: The exception it raised.
+        traceback: Its traceback.
+        lesson_id: The ID of the lesson.
+        
+    Returns:
+        int: Number of manifests marked failed.
+    """
+    from .narration import mark_narration_failed
+    
+    logger.error(f"Narration chunk for lesson {lesson_id} failed: {exc}")
+    return mark_narration_failed(lesson_id)
+
+
+@shared_task(name="sweep_lesson_narrations")
+def sweep_lesson_narrations_task() -> int:
+    """
+    Settle narration manifests left pending by a chord that never completed.
+    
+    Returns:
+        int: Number of manifests marked failed.
+    """
+    from .narration import sweep_pending_narrations
+    
+    return sweep_pending_narrations()
+
+
+@shared_task(name="refit_keyword_model")
+def refit_keyword_model_task(populate_lessons: bool = True) -> Dict[str, Any]:
+    """
+    Refit the corpus TF-IDF keyword model on the lessons and knowledge base
+    articles changed since the last fit, and fill in missing lesson keywords.
+    
+    Args:
+        populate_lessons: Also set ``Lesson.keywords`` where it is empty.
+        
+    Returns:
+        dict: Corpus size, vocabulary size and lessons updated.
+    """
+    from .keywords import populate_lesson_keywords, refit_keyword_model
+    
+    try:
+        model = refit_keyword_model()
+        model.save()
+        updated = populate_lesson_keywords(model) if populate_lessons else 0
+        return {'documents': len(model), 'terms': len(model.vocabulary), 'lessons_updated': updated}
+    except Exception as e:
+        logger.error(f"Error in refit_keyword_model_task: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(name="summarize_lessons")
+def summarize_lessons_task(lesson_ids: Optional[List[int]] = None, force: bool = False) -> int:
+    """
+    Build the stored extractive summaries of lessons whose content changed.
+    
+    Args:
+        lesson_ids: Lessons to summarize (default: all, e.g. for a backfill).
+        force: Rebuild summaries even if the content is unchanged.
+        
+    Returns:
+        int: Number of summaries written.
+    """
+    from .summarization.lessons import build_lesson_summaries
+    
+    try:
+        return build_lesson_summaries(lesson_ids, force=force)
+    except Exception as e:
+        logger.error(f"Error in summarize_lessons_task: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(name="translate_lesson")
+def translate_lesson_task(lesson_id: int, languages: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+    """
+    Pre-translate a published lesson into the configured languages.
+    
+    Args:
+        lesson_id: The ID of the lesson.
+        languages: Target languages (default: settings.AI_TRANSLATION_LANGUAGES).
+        force: Rebuild translations even if the content is unchanged.
+        
+    Returns:
+        dict: Languages that were (re)translated.
+    """
+    from .translation.lessons import translate_lesson
+    
+    try:
+        lesson = Lesson.objects.get(id=lesson_id, is_published=True)
+    except Lesson.DoesNotExist:
+        logger.warning(f"Lesson {lesson_id} does not exist or is not published")
+        return {'lesson_id': lesson_id, 'translated': []}
+    
+    try:
+        return {'lesson_id': lesson_id, 'translated': translate_lesson(lesson, languages, force=force)}
+    except Exception as e:
+        logger.error(f"Error in translate_lesson_task: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(name="train_recommender")
+def train_recommender_task() -> Dict[str, Any]:
+    """
+    Retrain the collaborative filtering model on all lesson progress.
+    
+    Returns:
+        dict: Users, lessons and model version trained.
+    """
+    from .recommendation.collaborative import train_collaborative_model
+    
+    try:
+        model = train_collaborative_model()
+        model.save()
+        return {'users': len(model.user_ids), 'lessons': len(model.lesson_ids), 'version': model.version}
+    except Exception as e:
+        logger.error(f"Error in train_recommender_task: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(name="build_lesson_similarity")
+def build_lesson_similarity_task() -> Dict[str, Any]:
+    """
+    Rebuild the lesson co-completion neighbors from all lesson progress.
+    
+    Returns:
+        dict: Lessons covered and model version built.
+    """
+    from .recommendation.similarity import build_similarity_model
+    
+    try:
+        model = build_similarity_model()
+        model.save()
+        return {'lessons': len(model.lesson_ids), 'version': model.version}
+    except Exception as e:
+        logger.error(f"Error in build_lesson_similarity_task: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(name="cluster_learners")
+def cluster_learners_task() -> Dict[str, Any]:
+    """
+    Re-cluster learners and rebuild the per-cluster lesson rankings.
+    
+    Returns:
+        dict: Learners and clusters covered and model version built.
+    """
+    from .recommendation.clustering import cluster_learners
+    
+    try:
+        model = cluster_learners()
+        model.save()
+        return {'learners': len(model.user_ids), 'clusters': len(model.centers), 'version': model.version}
+    except Exception as e:
+        logger.error(f"Error in cluster_learners_task: {str(e)}", exc_info=True)
+        raise
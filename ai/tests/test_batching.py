@@ -0,0 +1,71 @@
+"""
+Tests for the micro-batching queue.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from ai.batching import MicroBatcher
+
+
+class TestMicroBatcher(SimpleTestCase):
+    """Tests for batching concurrent single-input calls."""
+
+    def setUp(self):
+        self.batches = []
+        self.release = threading.Event()
+
+    def encode(self, texts):
+        self.batches.append(list(texts))
+        self.release.wait(1)
+        return [len(text) for text in texts]
+
+    def test_concurrent_calls_share_batches(self):
+        batcher = MicroBatcher(self.encode, name='test', max_batch_size=8, max_wait_ms=50)
+        texts = [f'text {"x" * i}' for i in range(20)]
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            results = pool.map(batcher, texts)
+            self.release.set()
+            self.assertEqual(list(results), [len(text) for text in texts])
+
+        self.assertLess(len(self.batches), len(texts))
+        self.assertLessEqual(max(len(batch) for batch in self.batches), 8)
+        self.assertEqual(sorted(text for batch in self.batches for text in batch), sorted(texts))
+
+    def test_duplicate_inputs_are_computed_once(self):
+        batcher = MicroBatcher(self.encode, name='test', max_wait_ms=50)
+        futures = [batcher.submit('same') for _ in range(3)] + [batcher.submit('other')]
+        self.release.set()
+        self.assertEqual([future.result(1) for future in futures], [4, 4, 4, 5])
+        self.assertEqual(self.batches, [['same', 'other']])
+
+    def test_errors_reach_every_caller(self):
+        def fail(texts):
+            raise ValueError('model unavailable')
+
+        batcher = MicroBatcher(fail, name='test', max_wait_ms=20)
+        futures = [batcher.submit('a'), batcher.submit('b')]
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result(1)
+        # The worker keeps serving after a failed batch
+        batcher.batch_fn = self.encode
+        self.release.set()
+        self.assertEqual(batcher('abc', timeout=1), 3)
+
+    def test_worker_survives_a_malformed_batch(self):
+        batcher = MicroBatcher(lambda texts: [], name='test', max_wait_ms=20)
+        with self.assertRaises(ValueError):
+            batcher('a', timeout=1)
+        batcher.batch_fn = self.encode
+        self.release.set()
+        self.assertEqual(batcher('abc', timeout=1), 3)
+
+    def test_cancelled_requests_are_skipped(self):
+        batcher = MicroBatcher(self.encode, name='test', max_wait_ms=50)
+        cancelled, kept = batcher.submit('gone'), batcher.submit('kept')
+        self.assertTrue(cancelled.cancel())
+        self.release.set()
+        self.assertEqual(kept.result(1), 4)
+        self.assertEqual(self.batches, [['kept']])
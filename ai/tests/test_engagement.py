@@ -0,0 +1,87 @@
+"""
+Tests for the time-aware engagement tracker.
+"""
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from ai.computer_vision import EngagementAnalyzer, EngagementTracker
+
+
+def feed(tracker, value, seconds, fps=10, start=0.0):
+    """Feed a constant observation at ``fps`` and collect reported transitions."""
+    transitions = []
+    for frame in range(int(seconds * fps)):
+        state = tracker.update(value, timestamp=start + frame / fps)
+        if state:
+            transitions.append(state)
+    return transitions
+
+
+@pytest.mark.cv
+def test_only_transitions_are_reported():
+    tracker = EngagementTracker(decay_rate=0.9, window_size=5)
+
+    # A minute of steady attention yields one event, not one per frame
+    assert feed(tracker, 0.9, seconds=60) == ['high']
+    assert feed(tracker, 0.1, seconds=60, start=60) == ['low']
+    assert tracker.state == 'low'
+
+
+@pytest.mark.cv
+def test_hysteresis_between_thresholds():
+    tracker = EngagementTracker(decay_rate=0.5, window_size=1)
+    feed(tracker, 0.9, seconds=10)
+
+    # Dropping into the band between thresholds keeps the previous state
+    assert feed(tracker, 0.5, seconds=30, start=10) == []
+    assert tracker.state == 'high'
+
+
+@pytest.mark.cv
+def test_decay_depends_on_elapsed_time_not_frame_rate():
+    slow = EngagementTracker(decay_rate=0.95, window_size=1)
+    fast = EngagementTracker(decay_rate=0.95, window_size=1)
+    slow.update(1.0, timestamp=0.0)
+    fast.update(1.0, timestamp=0.0)
+
+    slow.update(0.0, timestamp=2.0)
+    for frame in range(1, 21):
+        fast.update(0.0, timestamp=frame / 10)
+
+    assert slow.score == pytest.approx(0.95 ** 2)
+    assert fast.score == pytest.approx(0.95 ** 2)
+
+
+@pytest.mark.cv
+def test_trackers_are_separate_per_user():
+    analyzer = EngagementAnalyzer()
+    mine = analyzer.get_tracker('session-1', user_id=1)
+    mine.update(1.0, timestamp=0.0)
+
+    # Another learner reusing the session id starts from scratch
+    assert analyzer.get_tracker('session-1', user_id=2) is not mine
+    assert analyzer.get_tracker('session-1', user_id=1) is mine
+    analyzer.reset('session-1', user_id=1)
+    assert analyzer.get_tracker('session-1', user_id=1) is not mine
+
+
+@pytest.mark.api
+@pytest.mark.django_db
+def test_engagement_requires_own_session(django_user_model):
+    # The view module pulls in the full NLP stack through the orchestrator
+    api_views = pytest.importorskip("ai.api_views")
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from ai.models import LearningSession
+
+    owner = django_user_model.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+    other = django_user_model.objects.create_user(username='other', email='other@example.com', password='testpass123')
+    session = LearningSession.objects.create(user=owner)
+    view = api_views.EngagementAnalysisView.as_view()
+
+    # Frames can only be posted for the user's own learning session
+    for session_id in (str(session.id), 'not-a-uuid'):
+        request = APIRequestFactory().post('/', {'session_id': session_id}, format='json')
+        force_authenticate(request, user=other)
+        assert view(request).status_code == 404
@@ -0,0 +1,89 @@
+"""
+Tests for exported-model inference.
+"""
+import importlib.util
+import os
+import tempfile
+from pathlib import Path
+from unittest import skipUnless
+from unittest.mock import patch
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from ai import inference
+
+EXPORT_AVAILABLE = all(importlib.util.find_spec(name) for name in ('tensorflow', 'tf2onnx', 'onnxruntime'))
+
+
+def keras_model(path):
+    """A small engagement-shaped model saved to ``path``."""
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(6,)),
+        tf.keras.layers.Dense(16, activation='relu'),
+        tf.keras.layers.Dense(1, activation='sigmoid'),
+    ])
+    model.save(path)
+    return model
+
+
+class TestLoadInferenceModel(SimpleTestCase):
+    """Tests for choosing between the ONNX export and the Keras model."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.keras_path = Path(directory.name) / 'engagement_model.h5'
+        self.onnx_path = inference.onnx_path_for(self.keras_path)
+        inference._load.cache_clear()
+        self.addCleanup(inference._load.cache_clear)
+        for name in ('OnnxModel', 'KerasModel'):
+            patcher = patch.object(inference, name, side_effect=lambda path, name=name: (name, path))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def touch(self, path, mtime):
+        path.write_bytes(b'')
+        os.utime(path, (mtime, mtime))
+
+    def test_missing_model(self):
+        self.assertIsNone(inference.load_inference_model(None))
+        self.assertIsNone(inference.load_inference_model(self.keras_path))
+
+    def test_current_export_is_preferred(self):
+        self.touch(self.keras_path, 1000)
+        self.assertEqual(inference.load_inference_model(self.keras_path)[0], 'KerasModel')
+        self.touch(self.onnx_path, 2000)
+        self.assertEqual(inference.load_inference_model(self.keras_path), ('OnnxModel', str(self.onnx_path)))
+
+    def test_stale_export_is_ignored(self):
+        self.touch(self.onnx_path, 1000)
+        self.touch(self.keras_path, 2000)
+        self.assertEqual(inference.load_inference_model(self.keras_path)[0], 'KerasModel')
+
+    def test_models_are_loaded_once(self):
+        self.touch(self.onnx_path, 1000)
+        inference.load_inference_model(self.keras_path)
+        inference.load_inference_model(self.keras_path)
+        self.assertEqual(inference.OnnxModel.call_count, 1)
+
+
+@skipUnless(EXPORT_AVAILABLE, "tensorflow, tf2onnx and onnxruntime are required")
+class TestOnnxExport(SimpleTestCase):
+    """Numeric parity of the ONNX export with the Keras model."""
+
+    def test_export_matches_keras(self):
+        with tempfile.TemporaryDirectory() as directory:
+            keras_path = Path(directory) / 'engagement_model.h5'
+            model = keras_model(keras_path)
+            onnx_path = inference.export_keras_model(keras_path)
+
+            features = np.random.default_rng(0).normal(size=(64, 6)).astype(np.float32)
+            expected = model.predict(features, verbose=0)
+            np.testing.assert_allclose(inference.OnnxModel(onnx_path).predict(features), expected,
+                                       rtol=1e-5, atol=1e-6)
+            np.testing.assert_allclose(inference.OnnxModel(onnx_path).predict(features[0]), expected[:1],
+                                       rtol=1e-5, atol=1e-6)
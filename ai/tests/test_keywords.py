@@ -0,0 +1,74 @@
+"""
+Tests for the corpus TF-IDF keyword model.
+"""
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from ai.keywords import KeywordModel, get_keyword_model, populate_lesson_keywords, refit_keyword_model
+from chatbot.models import ChatbotKnowledgeBase
+from lessons.models import Lesson, Topic
+
+
+class TestKeywordModel(TestCase):
+    """Tests for fitting, refitting and persisting the keyword model."""
+
+    def setUp(self):
+        """Create a small corpus and a temporary model directory."""
+        self.models_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.models_dir, ignore_errors=True)
+        self.settings_override = override_settings(AI_MODELS_DIR=self.models_dir)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        topic = Topic.objects.create(title='Science')
+        self.photosynthesis = Lesson.objects.create(
+            title='Photosynthesis', topic=topic,
+            content='Plants use chlorophyll and sunlight. Chlorophyll absorbs light for energy.')
+        self.fractions = Lesson.objects.create(
+            title='Fractions', topic=topic,
+            content='A fraction has a numerator and a denominator. Energy is not a fraction.')
+        ChatbotKnowledgeBase.objects.create(title='Focus', content='Short breaks restore energy and focus.')
+
+    def test_common_terms_rank_below_rare_ones(self):
+        """IDF comes from the corpus, so a word in every document scores low."""
+        model = refit_keyword_model(KeywordModel())
+        self.assertEqual(len(model), 3)
+
+        keywords = [k['keyword'] for k in model.extract('energy chlorophyll')]
+        self.assertEqual(keywords, ['chlorophyll', 'energy'])
+
+    def test_refit_only_analyzes_changed_documents(self):
+        """Unchanged documents keep their rows; deleted ones are dropped."""
+        model = refit_keyword_model(KeywordModel())
+        self.fractions.content = 'Decimals and percentages.'
+        self.fractions.save()
+        ChatbotKnowledgeBase.objects.all().delete()
+
+        with patch('ai.keywords.analyze', wraps=lambda text: text.lower().split()) as analyze:
+            refit = refit_keyword_model(model)
+
+        self.assertEqual(analyze.call_count, 1)
+        self.assertEqual(len(refit), 2)
+        self.assertIn('decimals', refit.vocabulary)
+        self.assertNotIn('restore', refit.vocabulary)
+
+    def test_saved_model_is_reloaded(self):
+        """The persisted model is what requests read."""
+        refit_keyword_model(KeywordModel()).save()
+        model = get_keyword_model()
+        self.assertEqual(len(model), 3)
+        self.assertEqual(model.extract('chlorophyll')[0]['keyword'], 'chlorophyll')
+
+    def test_populate_lesson_keywords(self):
+        """Empty lesson keywords are filled from the matrix; set ones are kept."""
+        Lesson.objects.filter(pk=self.fractions.pk).update(keywords='maths')
+        model = refit_keyword_model(KeywordModel())
+
+        self.assertEqual(populate_lesson_keywords(model), 1)
+        self.photosynthesis.refresh_from_db()
+        self.fractions.refresh_from_db()
+        self.assertTrue(self.photosynthesis.keywords.startswith('chlorophyll'))
+        self.assertEqual(self.fractions.keywords, 'maths')
@@ -0,0 +1,75 @@
+"""
+Tests for extractive summarization and the stored lesson summaries.
+"""
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase
+
+from ai.summarization.lessons import build_lesson_summaries, lesson_previews
+from ai.summarization.utils import select_sentences
+from lessons.models import Lesson, LessonSummary, Topic
+
+SENTENCES = [
+    'Plants make food from sunlight.',
+    'The weather was nice yesterday.',
+    'Photosynthesis turns sunlight into food in plants.',
+    'Chlorophyll in plants absorbs sunlight.',
+    'My cat sleeps all day.',
+]
+
+
+def first_sentence(texts, n_sentences):
+    """Stand-in for the spaCy-backed summarizer: the storage logic is under test."""
+    return [text.split('.')[0] + '.' for text in texts]
+
+
+class TestSelectSentences(SimpleTestCase):
+    """Tests for sentence ranking."""
+
+    def test_textrank_keeps_central_sentences_in_order(self):
+        """Sentences sharing the document's topic win; order is preserved."""
+        summary = select_sentences(SENTENCES, 2)
+        self.assertEqual(len(summary), 2)
+        self.assertNotIn('My cat sleeps all day.', summary)
+        self.assertNotIn('The weather was nice yesterday.', summary)
+        self.assertEqual(summary, sorted(summary, key=SENTENCES.index))
+
+    def test_centroid_method(self):
+        """The centroid method also skips off-topic sentences."""
+        summary = select_sentences(SENTENCES, 3, method='centroid')
+        self.assertNotIn('My cat sleeps all day.', summary)
+
+    def test_short_texts_are_returned_whole(self):
+        """Texts with no more sentences than requested are not ranked."""
+        self.assertEqual(select_sentences(SENTENCES[:2], 3), SENTENCES[:2])
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            select_sentences(SENTENCES, 2, method='abstractive')
+
+
+@patch('ai.summarization.lessons.summarize_texts', side_effect=first_sentence)
+class TestLessonSummaries(TestCase):
+    """Tests for the precomputed summary table."""
+
+    def setUp(self):
+        topic = Topic.objects.create(title='Science')
+        self.lesson = Lesson.objects.create(
+            title='Photosynthesis', topic=topic, description='How plants make food.',
+            content='Plants use sunlight. They make sugar.')
+
+    def test_summaries_are_rebuilt_only_when_content_changes(self, summarize):
+        self.assertEqual(build_lesson_summaries(), 1)
+        self.assertEqual(build_lesson_summaries(), 0)
+        self.assertEqual(Lesson.listing().get(pk=self.lesson.pk).preview, 'Plants use sunlight.')
+
+        self.lesson.content = 'Leaves are green. They hold chlorophyll.'
+        self.lesson.save()
+        self.assertEqual(build_lesson_summaries([self.lesson.pk]), 1)
+        self.assertEqual(LessonSummary.objects.get().text, 'Leaves are green.')
+
+    def test_previews_fall_back_to_the_description(self, summarize):
+        self.assertEqual(lesson_previews([self.lesson]), {self.lesson.pk: 'How plants make food.'})
+        build_lesson_summaries()
+        with self.assertNumQueries(1):
+            self.assertEqual(lesson_previews([self.lesson]), {self.lesson.pk: 'Plants use sunlight.'})
@@ -0,0 +1,86 @@
+"""
+Tests for cached translation and lesson pre-translation.
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from ai.models import TranslationCache
+from ai.translation.adapters import OfflineBackend
+from ai.translation.lessons import get_lesson_translation, translate_lesson
+from ai.translation.service import TranslationService
+from lessons.models import Lesson, Topic
+from lessons.rendering import get_rendered_chunks
+
+
+class TestTranslationService(TestCase):
+    """Tests for the persistent segment cache."""
+
+    def setUp(self):
+        self.backend = OfflineBackend({'es': {'hello': 'hola', 'world': 'mundo'}})
+        self.service = TranslationService(backend=self.backend, batch_size=2)
+
+    def test_segments_are_translated_once(self):
+        """Repeated segments are read from the cache, not the backend."""
+        with patch.object(OfflineBackend, 'translate_batch', wraps=self.backend.translate_batch) as batch:
+            self.assertEqual(self.service.translate('hello world', 'es'), '[es] hola mundo')
+            self.assertEqual(self.service.translate('hello world', 'es'), '[es] hola mundo')
+        self.assertEqual(batch.call_count, 1)
+        self.assertEqual(TranslationCache.objects.count(), 1)
+
+    def test_misses_are_sent_in_batches(self):
+        """Only uncached segments reach the backend, ``batch_size`` at a time."""
+        self.service.translate('one', 'es')
+        texts = ['one', 'two', 'three', 'four', '', 'two']
+        with patch.object(OfflineBackend, 'translate_batch', wraps=self.backend.translate_batch) as batch:
+            result = self.service.translate_many(texts, 'es')
+
+        self.assertEqual(result, ['[es] one', '[es] two', '[es] three', '[es] four', '', '[es] two'])
+        self.assertEqual([len(call.args[0]) for call in batch.call_args_list], [2, 1])
+
+    def test_source_language_is_returned_as_is(self):
+        self.assertEqual(self.service.translate_many(['hello'], 'en'), ['hello'])
+
+
+@override_settings(AI_TRANSLATION_BACKEND='offline')
+class TestLessonTranslation(TestCase):
+    """Tests for stored lesson translations."""
+
+    def setUp(self):
+        topic = Topic.objects.create(title='Science')
+        self.lesson = Lesson.objects.create(
+            title='Plants', topic=topic, content='Plants need light.\n\nLeaves are green.')
+
+    def test_translated_lesson_renders_from_stored_segments(self):
+        self.assertEqual(translate_lesson(self.lesson, ['fr']), ['fr'])
+        self.assertEqual(translate_lesson(self.lesson, ['fr']), [])
+
+        translation = get_lesson_translation(self.lesson, 'fr')
+        self.assertEqual(translation.title, '[fr] Plants')
+        self.assertEqual(translation.segments, ['[fr] Plants need light.', '[fr] Leaves are green.'])
+        chunks = get_rendered_chunks(self.lesson, translation=translation)
+        self.assertIn('[fr] Leaves are green.', chunks[0])
+
+    def test_retranslated_segments_are_not_served_stale(self):
+        translate_lesson(self.lesson, ['fr'])
+        translation = get_lesson_translation(self.lesson, 'fr')
+        get_rendered_chunks(self.lesson, translation=translation)
+        translation.segments = ['Les plantes ont besoin de lumière.', 'Les feuilles sont vertes.']
+        translation.save()
+        chunks = get_rendered_chunks(self.lesson, translation=translation)
+        self.assertIn('Les feuilles sont vertes.', chunks[0])
+
+    def test_translations_get_no_syllable_breaks(self):
+        translate_lesson(self.lesson, ['fr'])
+        translation = get_lesson_translation(self.lesson, 'fr')
+        dyslexic = SimpleNamespace(learning_condition='DYSLEXIA')
+        chunks = get_rendered_chunks(self.lesson, dyslexic, translation=translation)
+        self.assertEqual(chunks, ['<p>[fr] Plants need light.</p>', '<p>[fr] Leaves are green.</p>'])
+
+    def test_stale_translation_is_not_served(self):
+        translate_lesson(self.lesson, ['fr'])
+        self.lesson.content = 'Roots drink water.'
+        self.lesson.save()
+        self.assertIsNone(get_lesson_translation(self.lesson, 'fr'))
+        self.assertEqual(translate_lesson(self.lesson, ['fr']), ['fr'])
@@ -0,0 +1,151 @@
+"""
+Tests for the cached text-to-speech service.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ai.tts_service import OfflineEngine, TextToSpeechService, VoiceSettings, audio_response
+
+
+class TestTextToSpeechService(SimpleTestCase):
+    """Tests for the content-addressed audio cache."""
+
+    def setUp(self):
+        """Set up a service writing into a temporary MEDIA_ROOT."""
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_URL='/media/')
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.service = TextToSpeechService(engine=OfflineEngine())
+
+    def test_repeated_text_is_served_from_cache(self):
+        """Same text and voice render once and then hit the cache."""
+        with patch.object(OfflineEngine, 'synthesize', wraps=self.service.engine.synthesize) as synth:
+            first = self.service.synthesize("Photosynthesis turns light into energy.")
+            second = self.service.synthesize("Photosynthesis  turns light into energy.")
+
+        self.assertEqual(synth.call_count, 1)
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual(first.path, second.path)
+        self.assertTrue(first.url.startswith('/media/tts_cache/'))
+        self.assertTrue(os.path.exists(first.path))
+
+    def test_voice_settings_are_part_of_the_key(self):
+        """Slow and normal voices are cached separately."""
+        normal = self.service.synthesize("Read slowly.", VoiceSettings())
+        slow = self.service.synthesize("Read slowly.", VoiceSettings(slow=True))
+        self.assertNotEqual(normal.key, slow.key)
+        self.assertGreater(slow.duration, normal.duration)
+
+    def test_prerender_canned_phrases(self):
+        """Canned gesture responses are cache hits after pre-rendering."""
+        voice = VoiceSettings(tld='co.uk')
+        rendered = self.service.prerender_canned_phrases([voice])
+        self.assertEqual(rendered, len(TextToSpeechService.CANNED_PHRASES))
+        self.assertTrue(self.service.synthesize_canned('confused', voice).cached)
+
+    def test_evicts_least_recently_used(self):
+        """Eviction removes the oldest files first."""
+        old = self.service.synthesize("An old lesson paragraph.")
+        recent = self.service.synthesize("A recent lesson paragraph.")
+        past = time.time() - 3600
+        os.utime(old.path, (past, past))
+
+        removed = self.service.evict(max_bytes=os.path.getsize(recent.path))
+
+        self.assertEqual(removed, 1)
+        self.assertFalse(os.path.exists(old.path))
+        self.assertTrue(os.path.exists(recent.path))
+
+    def test_long_text_is_rendered_asynchronously(self):
+        """Uncached long texts are handed to a Celery task."""
+        long_text = "word " * 1000
+        with patch('ai.tasks.synthesize_speech_task.delay') as delay:
+            delay.return_value.id = 'task-1'
+            result = self.service.synthesize_async(long_text)
+
+        self.assertEqual(result['status'], 'pending')
+        self.assertEqual(result['task_id'], 'task-1')
+        delay.assert_called_once()
+
+    def test_stream_fills_the_cache(self):
+        """Streamed audio is cached once the engine finishes."""
+        text = "Streaming starts before synthesis ends."
+        streamed = b''.join(self.service.stream(text))
+        cached = self.service.get_cached(text, VoiceSettings())
+        self.assertIsNotNone(cached)
+        with open(cached.path, 'rb') as f:
+            self.assertEqual(f.read(), streamed)
+        self.assertFalse([p for p in os.listdir(self.service.cache_dir) if p.endswith('.part')])
+
+    def test_concurrent_requests_render_once(self):
+        """A stream waits for a concurrent render of the same text and serves its file."""
+        text = "Rendered once for everyone."
+        rendering, release = threading.Event(), threading.Event()
+        synthesize = self.service.engine.synthesize
+
+        def slow_synthesize(*args):
+            rendering.set()
+            release.wait(5)
+            synthesize(*args)
+
+        with patch.object(OfflineEngine, 'synthesize', side_effect=slow_synthesize) as synth, \
+                patch.object(OfflineEngine, 'stream') as stream:
+            worker = threading.Thread(target=self.service.synthesize, args=(text,))
+            worker.start()
+            rendering.wait(5)
+            chunks = []
+            listener = threading.Thread(target=lambda: chunks.extend(self.service.stream(text)))
+            listener.start()
+            time.sleep(0.05)  # The stream is now waiting on the render
+            release.set()
+            worker.join(5)
+            listener.join(5)
+        body = b''.join(chunks)
+
+        self.assertEqual(synth.call_count, 1)
+        stream.assert_not_called()
+        with open(self.service.get_cached(text, VoiceSettings()).path, 'rb') as f:
+            self.assertEqual(f.read(), body)
+        self.assertEqual(self.service._key_locks, {})
+
+    def test_stalled_stream_holds_no_render_lock(self):
+        """A client that stops reading mid-stream does not block renders of the same text."""
+        text = "Nobody is listening."
+        with patch.object(OfflineEngine, 'stream', return_value=iter([b'first', b'second'])):
+            stream = self.service.stream(text)
+            self.assertEqual(next(stream), b'first')
+            self.assertEqual(self.service._key_locks, {})
+            rendered = self.service.synthesize(text)
+            stream.close()
+
+        self.assertTrue(os.path.exists(rendered.path))
+        self.assertEqual([name for name in os.listdir(self.service.cache_dir) if name.endswith('.part')], [])
+
+    def test_audio_response_streams_then_serves_ranges(self):
+        """First request streams; repeats support Range and If-None-Match."""
+        factory = RequestFactory()
+        text = "Seek through this sentence."
+
+        first = audio_response(factory.get('/'), text, service=self.service)
+        self.assertTrue(first.streaming)
+        body = b''.join(first.streaming_content)
+        etag = first['ETag']
+
+        partial = audio_response(factory.get('/', HTTP_RANGE='bytes=0-9'), text, service=self.service)
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(b''.join(partial.streaming_content), body[:10])
+        self.assertEqual(partial['ETag'], etag)
+
+        with patch.object(self.service, 'get_cached') as get_cached:
+            unchanged = audio_response(factory.get('/', HTTP_IF_NONE_MATCH=etag), text, service=self.service)
+        self.assertEqual(unchanged.status_code, 304)
+        get_cached.assert_not_called()
@@ -0,0 +1,72 @@
+"""
+Task-specific spaCy pipelines for SmartLearn Neuro
+Most text features only need tokens or sentence boundaries, so they run a
+pipeline with just that component instead of the full model (tagger, parser,
+NER). Pipelines are loaded once per process; ``pipe`` batches bulk jobs
+through ``nlp.pipe``.
+"""
+import logging
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+import spacy
+from spacy.language import Language
+from spacy.tokens import Doc
+
+from .config import NLP
+
+logger = logging.getLogger(__name__)
+
+# Components of the model that sentence recognition (``senter``) does not use
+SENTENCE_EXCLUDE = ['tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'ner']
+
+
+@lru_cache(maxsize=None)
+def tokenizer_pipeline() -> Language:
+    """Tokenizer only: the English tokenization rules without any model weights."""
+    return spacy.blank('en')
+
+
+@lru_cache(maxsize=None)
+def sentence_pipeline() -> Language:
+    """
+    The model's statistical sentence recognizer and nothing else.
+
+    Falls back to the rule-based sentencizer when the model is not installed.
+    """
+    try:
+        nlp = spacy.load(NLP['spacy_model'], exclude=SENTENCE_EXCLUDE)
+        nlp.enable_pipe('senter')
+    except OSError:
+        logger.warning(f"spaCy model {NLP['spacy_model']} is not installed; using the rule-based sentencizer")
+        nlp = spacy.blank('en')
+        nlp.add_pipe('sentencizer')
+    return nlp
+
+
+@lru_cache(maxsize=None)
+def full_pipeline() -> Language:
+    """The complete model, for the few tasks that need tags, parses or entities."""
+    return spacy.load(NLP['spacy_model'])
+
+
+def pipe(nlp: Language, texts: Iterable[str], batch_size: Optional[int] = None,
+         n_process: Optional[int] = None) -> Iterator[Doc]:
+    """
+    Run ``texts`` through ``nlp`` in batches.
+
+    Args:
+        nlp: One of the pipelines above
+        texts: Texts to process
+        batch_size: Texts per batch (default ``NLP['pipe_batch_size']``)
+        n_process: Worker processes; more than one only pays off for bulk
+            jobs of thousands of texts (default ``NLP['n_process']``)
+
+    Returns:
+        Iterator over the processed docs, in input order
+    """
+    return nlp.pipe(
+        texts,
+        batch_size=batch_size or NLP['pipe_batch_size'],
+        n_process=n_process or NLP['n_process'],
+    )
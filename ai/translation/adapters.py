@@ -1,13 +1,79 @@
-from googletrans import Translator
+"""
+Translation backends for SmartLearn Neuro
+Each backend translates a batch of segments in one call. The cached
+``TranslationService`` (ai.translation.service) picks one by name from
+``BACKENDS``.
+"""
+import logging
+import threading
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationBackend:
+    """Base class for translation backends."""
+    name = 'base'
+
+    def translate_batch(self, texts: List[str], target_lang: str, source_lang: str) -> List[str]:
+        """Translations of ``texts``, in order."""
+        raise NotImplementedError
+
+
+class GoogleBackend(TranslationBackend):
+    """googletrans (requires network access)."""
+    name = 'google'
+
+    def __init__(self):
+        # Translator keeps an HTTP session; one per thread, reused across calls
+        self._local = threading.local()
+
+    @property
+    def translator(self):
+        translator = getattr(self._local, 'translator', None)
+        if translator is None:
+            from googletrans import Translator
+
+            translator = self._local.translator = Translator()
+        return translator
+
+    def translate_batch(self, texts: List[str], target_lang: str, source_lang: str) -> List[str]:
+        results = self.translator.translate(texts, src=source_lang, dest=target_lang)
+        return [result.text for result in results]
+
+
+class OfflineBackend(TranslationBackend):
+    """
+    Deterministic stand-in: words found in ``dictionary`` are replaced, and
+    the result is tagged with the target language. Used in tests and
+    offline development.
+    """
+    name = 'offline'
+
+    def __init__(self, dictionary: Dict[str, Dict[str, str]] = None):
+        self.dictionary = dictionary or {}
+
+    def translate_batch(self, texts: List[str], target_lang: str, source_lang: str) -> List[str]:
+        words = self.dictionary.get(target_lang, {})
+        return [
+            f"[{target_lang}] " + ' '.join(words.get(word.lower(), word) for word in text.split(' '))
+            for text in texts
+        ]
+
+
+BACKENDS = {
+    backend.name: backend for backend in (GoogleBackend, OfflineBackend)
+}
+
 
 def translate_text(text, target_lang='es'):
     """
-    Translate text to the target language using googletrans.
+    Translate text to the target language (cached, see TranslationService).
     """
+    from .service import translation_service
+
     try:
-        translator = Translator()
-        result = translator.translate(text, dest=target_lang)
-        return result.text
+        return translation_service.translate(text, target_lang)
     except Exception as e:
-        print(f"Translation error: {e}")
-        return text  # Fallback to original text
\ No newline at end of file
+        logger.error(f"Translation error: {e}")
+        return text  # Fallback to original text
@@ -0,0 +1,63 @@
+"""
+Lesson translation for SmartLearn Neuro
+Published lessons are translated paragraph by paragraph in the background
+and stored as ``LessonTranslation`` segments, so a translated lesson page
+renders from the database like the original (see lessons.rendering).
+"""
+import logging
+from typing import Iterable, List, Optional
+
+from lessons.models import Lesson, LessonTranslation
+from lessons.rendering import split_paragraphs
+from .service import translation_service, translation_languages
+
+logger = logging.getLogger(__name__)
+
+
+def translate_lesson(lesson: Lesson, languages: Optional[Iterable[str]] = None, force: bool = False) -> List[str]:
+    """
+    Create or refresh the translations of a lesson.
+
+    The title and every paragraph go to the translation service as one list
+    of segments per language; paragraphs shared with other lessons or earlier
+    versions come from the translation cache.
+
+    Args:
+        lesson: Lesson to translate
+        languages: Target languages (default: ``translation_languages()``)
+        force: Rebuild translations even if the content is unchanged
+
+    Returns:
+        Languages that were (re)translated
+    """
+    languages = list(languages or translation_languages())
+    current = dict(LessonTranslation.objects.filter(lesson=lesson, language__in=languages)
+                   .values_list('language', 'content_hash'))
+    segments = [lesson.title, *split_paragraphs(lesson.content)]
+
+    translated = []
+    for language in languages:
+        if not force and current.get(language) == lesson.content_hash:
+            continue
+        title, *paragraphs = translation_service.translate_many(segments, language)
+        LessonTranslation.objects.update_or_create(
+            lesson=lesson,
+            language=language,
+            defaults={'content_hash': lesson.content_hash, 'title': title, 'segments': paragraphs},
+        )
+        translated.append(language)
+
+    if translated:
+        logger.info(f"Translated lesson {lesson.pk} into {', '.join(translated)}")
+    return translated
+
+
+def get_lesson_translation(lesson: Lesson, language: Optional[str]) -> Optional[LessonTranslation]:
+    """Translation of the lesson's current content into ``language``, if built."""
+    if not language:
+        return None
+    return LessonTranslation.objects.filter(
+        lesson=lesson,
+        language=language,
+        content_hash=lesson.content_hash,
+    ).first()
@@ -0,0 +1,96 @@
+"""
+Cached translation for SmartLearn Neuro
+Translations are stored in ``TranslationCache`` keyed by the hash of the
+source text and the target language, so a segment is sent to the backend
+once per language no matter how many lessons or requests contain it. Misses
+are translated in batches of ``TRANSLATION['batch_size']`` segments.
+"""
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from core.instrumentation import record_cache, timed
+from ..config import TRANSLATION
+from ..models import TranslationCache
+from .adapters import BACKENDS, TranslationBackend
+
+logger = logging.getLogger(__name__)
+
+
+def translation_languages() -> List[str]:
+    """Languages published lessons are pre-translated into."""
+    return list(getattr(settings, 'AI_TRANSLATION_LANGUAGES', TRANSLATION['languages']))
+
+
+class TranslationService:
+    """Translation through a pluggable backend with a persistent segment cache."""
+
+    def __init__(self, backend: Optional[TranslationBackend] = None, batch_size: Optional[int] = None):
+        """Initialize the service; the backend resolves lazily from settings."""
+        self._backend = backend
+        self.batch_size = batch_size or TRANSLATION['batch_size']
+
+    @property
+    def backend(self) -> TranslationBackend:
+        if self._backend is None:
+            name = getattr(settings, 'AI_TRANSLATION_BACKEND', TRANSLATION['backend'])
+            self._backend = BACKENDS[name]()
+        return self._backend
+
+    @staticmethod
+    def text_hash(text: str, source_lang: str) -> str:
+        return hashlib.sha256(f"{source_lang}|{text}".encode('utf-8')).hexdigest()
+
+    def translate(self, text: str, target_lang: str, source_lang: Optional[str] = None) -> str:
+        """Translation of a single text."""
+        return self.translate_many([text], target_lang, source_lang)[0]
+
+    def translate_many(self, texts: List[str], target_lang: str, source_lang: Optional[str] = None) -> List[str]:
+        """
+        Translate segments, reading cached ones in one query and sending the
+        rest to the backend in batches.
+
+        Args:
+            texts: Segments to translate (blank ones are returned as is)
+            target_lang: Language code to translate into
+            source_lang: Language of the segments (default ``TRANSLATION['source_lang']``)
+
+        Returns:
+            Translations, in input order
+        """
+        source_lang = source_lang or TRANSLATION['source_lang']
+        if target_lang == source_lang:
+            return list(texts)
+
+        hashes = {text: self.text_hash(text, source_lang) for text in texts if text.strip()}
+        translated: Dict[str, str] = dict(
+            TranslationCache.objects
+            .filter(target_lang=target_lang, text_hash__in=set(hashes.values()))
+            .values_list('text_hash', 'translated_text')
+        )
+        missing = [text for text, digest in hashes.items() if digest not in translated]
+        for text, digest in hashes.items():
+            record_cache('translation', hit=digest in translated)
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            with timed('translation'):
+                results = self.backend.translate_batch(batch, target_lang, source_lang)
+            rows = [
+                TranslationCache(text_hash=hashes[text], target_lang=target_lang, source_text=text,
+                                 translated_text=result, backend=self.backend.name)
+                for text, result in zip(batch, results)
+            ]
+            # Another worker may have translated the same segment meanwhile
+            TranslationCache.objects.bulk_create(rows, ignore_conflicts=True)
+            translated.update((row.text_hash, row.translated_text) for row in rows)
+
+        if missing:
+            logger.debug(f"Translated {len(missing)} segments into {target_lang} with {self.backend.name}")
+        return [translated[hashes[text]] if text in hashes else text for text in texts]
+
+
+# Singleton instance
+translation_service = TranslationService()
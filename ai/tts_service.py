@@ -0,0 +1,423 @@
+"""
+Text-to-Speech Service for SmartLearn Neuro
+Synthesizes narration through a pluggable engine and serves repeated requests
+from a content-addressed audio cache under MEDIA_ROOT.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import wave
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.http import quote_etag
+
+from core.instrumentation import record_cache, timed
+from core.streaming import etag_matches, not_modified_response, ranged_file_response, read_chunks
+
+from .config import TTS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class VoiceSettings:
+    """Voice parameters that change the rendered audio (part of the cache key)."""
+    lang: str = 'en'
+    tld: str = 'com'
+    slow: bool = False
+
+    @classmethod
+    def for_user(cls, user) -> 'VoiceSettings':
+        """Personalized voice: slower speech and a UK accent for dyslexic learners."""
+        condition = getattr(user, 'learning_condition', 'NORMAL')
+        return cls(
+            slow=condition == 'DYSLEXIA',
+            tld='com' if condition == 'NORMAL' else 'co.uk',
+        )
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class AudioResult:
+    """A rendered (or cached) audio file."""
+    key: str
+    path: str
+    url: str
+    content_type: str
+    duration: float
+    cached: bool = False
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class TTSEngine:
+    """Base class for speech synthesis engines."""
+    name = 'base'
+    extension = 'mp3'
+    content_type = 'audio/mpeg'
+
+    def synthesize(self, text: str, voice: VoiceSettings, path: str):
+        """Render ``text`` with ``voice`` into the file at ``path``."""
+        raise NotImplementedError
+
+    def stream(self, text: str, voice: VoiceSettings) -> Iterator[bytes]:
+        """
+        Yield the rendered audio progressively.
+
+        The default renders the whole text first; engines whose format can be
+        concatenated (MP3 frames) override this to yield as each part is ready.
+        """
+        fd, tmp_path = tempfile.mkstemp(suffix=f'.{self.extension}')
+        os.close(fd)
+        try:
+            self.synthesize(text, voice, tmp_path)
+            yield from read_chunks(tmp_path)
+        finally:
+            os.remove(tmp_path)
+
+
+class GTTSEngine(TTSEngine):
+    """Google Text-to-Speech (requires network access)."""
+    name = 'gtts'
+
+    def _tts(self, text: str, voice: VoiceSettings):
+        from gtts import gTTS
+
+        return gTTS(text=text, lang=voice.lang, slow=voice.slow, tld=voice.tld)
+
+    def synthesize(self, text: str, voice: VoiceSettings, path: str):
+        self._tts(text, voice).save(path)
+
+    def stream(self, text: str, voice: VoiceSettings) -> Iterator[bytes]:
+        # gTTS requests the text in ~100 character parts; each part is a
+        # self-contained run of MP3 frames that can be played on arrival.
+        yield from self._tts(text, voice).stream()
+
+
+class OfflineEngine(TTSEngine):
+    """
+    Deterministic stand-in that writes silent WAV audio of the estimated length.
+    Used in tests and offline development.
+    """
+    name = 'offline'
+    extension = 'wav'
+    content_type = 'audio/wav'
+    sample_rate = 8000
+
+    def synthesize(self, text: str, voice: VoiceSettings, path: str):
+        frames = int(estimate_duration(text, voice) * self.sample_rate)
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(1)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(b'\x80' * frames)
+
+
+ENGINES = {
+    GTTSEngine.name: GTTSEngine,
+    OfflineEngine.name: OfflineEngine,
+}
+
+
+def estimate_duration(text: str, voice: VoiceSettings) -> float:
+    """Estimate audio duration in seconds from the word count and speaking rate."""
+    rate = TTS['words_per_minute']['slow' if voice.slow else 'normal']
+    return len(text.split()) / rate * 60
+
+
+class TextToSpeechService:
+    """
+    Shared text-to-speech service with a content-addressed audio cache.
+
+    Audio is stored as ``<sha256(engine, voice, text)>.<ext>`` so every user
+    requesting the same text with the same voice gets the same file. Cache hits
+    refresh the file's mtime and the oldest files are evicted once the cache
+    grows past ``max_cache_bytes``.
+    """
+
+    CANNED_PHRASES = {
+        'confused': "I see you're having trouble. Let me explain that again in a simpler way.",
+        'stuck': "Take a deep breath. I'll break this down into smaller steps for you.",
+        'bored': "Let's try a different approach. I'll make this more engaging for you.",
+        'focused': "Great job! You're doing well. Keep going!",
+        'default': "I'm here to help. What would you like to know?",
+    }
+
+    def __init__(self, engine: Optional[TTSEngine] = None, cache_dir: Optional[str] = None,
+                 max_cache_bytes: Optional[int] = None):
+        """Initialize the service; the engine and cache directory resolve lazily from settings."""
+        self._engine = engine
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_cache_bytes = max_cache_bytes or TTS['max_cache_bytes']
+        self._cache_bytes = None
+        self._lock = threading.Lock()
+        # Per-key render locks and the number of threads holding or waiting on each
+        self._key_locks: Dict[str, List] = {}
+
+    @property
+    def engine(self) -> TTSEngine:
+        if self._engine is None:
+            name = getattr(settings, 'AI_TTS_ENGINE', TTS['engine'])
+            self._engine = ENGINES[name]()
+        return self._engine
+
+    @property
+    def cache_dir(self) -> Path:
+        if self._cache_dir is None:
+            self._cache_dir = Path(settings.MEDIA_ROOT) / TTS['cache_dir']
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        return self._cache_dir
+
+    def cache_key(self, text: str, voice: VoiceSettings) -> str:
+        """Content address of the audio for ``text`` rendered with ``voice``."""
+        normalized = ' '.join(text.split())
+        raw = f"{self.engine.name}|{voice.lang}|{voice.tld}|{int(voice.slow)}|{normalized}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _result(self, key: str, path: Path, text: str, voice: VoiceSettings, cached: bool) -> AudioResult:
+        try:
+            relative = path.relative_to(settings.MEDIA_ROOT).as_posix()
+        except ValueError:
+            relative = f"{TTS['cache_dir']}/{path.name}"
+        return AudioResult(
+            key=key,
+            path=str(path),
+            url=f"{settings.MEDIA_URL}{relative}",
+            content_type=self.engine.content_type,
+            duration=estimate_duration(text, voice),
+            cached=cached,
+        )
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.{self.engine.extension}"
+
+    def get_cached(self, text: str, voice: VoiceSettings) -> Optional[AudioResult]:
+        """Return the cached audio for ``text`` if it has already been rendered."""
+        key = self.cache_key(text, voice)
+        path = self.path_for(key)
+        try:
+            os.utime(path)  # Mark as recently used for LRU eviction
+        except FileNotFoundError:
+            record_cache('tts', hit=False)
+            return None
+        record_cache('tts', hit=True)
+        return self._result(key, path, text, voice, cached=True)
+
+    def synthesize(self, text: str, voice: Optional[VoiceSettings] = None) -> AudioResult:
+        """
+        Render ``text`` to audio, serving it from the cache when possible.
+
+        Args:
+            text: Text to speak
+            voice: Voice settings (defaults to ``VoiceSettings()``)
+
+        Returns:
+            AudioResult pointing at the file under MEDIA_ROOT
+        """
+        voice = voice or VoiceSettings()
+        cached = self.get_cached(text, voice)
+        if cached:
+            return cached
+
+        key = self.cache_key(text, voice)
+        with self._rendering(key):
+            # Another thread may have rendered it while we waited
+            cached = self.get_cached(text, voice)
+            if cached:
+                return cached
+
+            path = self.path_for(key)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.part')
+            os.close(fd)
+            try:
+                with timed('tts'):
+                    self.engine.synthesize(text, voice, tmp_path)
+                os.replace(tmp_path, path)  # Atomic: readers never see partial audio
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        self._track_write(path.stat().st_size)
+        logger.debug(f"Rendered TTS audio {key} with {self.engine.name}")
+        return self._result(key, path, text, voice, cached=False)
+
+    def stream(self, text: str, voice: Optional[VoiceSettings] = None) -> Iterator[bytes]:
+        """
+        Yield audio for ``text`` as it is synthesized, filling the cache on the way.
+
+        The bytes are written to a temporary file alongside the response and
+        moved into the cache once the engine finishes, so the next request is
+        a cache hit that supports Range and ETag. An aborted stream (client
+        disconnect) leaves nothing behind. A render already in progress is
+        waited for and served from the cache; the render lock is not held
+        while yielding, so a slow client never blocks other requests.
+        """
+        voice = voice or VoiceSettings()
+        key = self.cache_key(text, voice)
+        with self._rendering(key):
+            cached = self.get_cached(text, voice)
+        if cached:
+            yield from read_chunks(cached.path)
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.part')
+        completed = False
+        try:
+            with os.fdopen(fd, 'wb') as part, timed('tts'):
+                for data in self.engine.stream(text, voice):
+                    part.write(data)
+                    yield data
+            path = self.path_for(key)
+            os.replace(tmp_path, path)  # Atomic: a concurrent stream's identical file is simply replaced
+            completed = True
+        finally:
+            if not completed and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self._track_write(path.stat().st_size)
+        logger.debug(f"Streamed TTS audio {key} with {self.engine.name}")
+
+    def synthesize_async(self, text: str, voice: Optional[VoiceSettings] = None) -> Dict:
+        """
+        Serve cached or short texts immediately; render long texts in a Celery task.
+
+        Returns:
+            ``{'status': 'ready', 'audio': {...}}`` or ``{'status': 'pending', 'task_id': ...}``
+        """
+        voice = voice or VoiceSettings()
+        cached = self.get_cached(text, voice)
+        if cached is None and len(text) >= TTS['async_min_chars']:
+            from .tasks import synthesize_speech_task
+
+            task = synthesize_speech_task.delay(text, voice.to_dict())
+            return {
+                'status': 'pending',
+                'task_id': task.id,
+                'key': self.cache_key(text, voice),
+            }
+        audio = cached or self.synthesize(text, voice)
+        return {'status': 'ready', 'audio': audio.to_dict()}
+
+    def synthesize_canned(self, phrase: str, voice: Optional[VoiceSettings] = None) -> AudioResult:
+        """Render one of the canned feedback phrases (``CANNED_PHRASES``)."""
+        text = self.CANNED_PHRASES.get(phrase, self.CANNED_PHRASES['default'])
+        return self.synthesize(text, voice)
+
+    def prerender_canned_phrases(self, voices: Optional[Iterable[VoiceSettings]] = None) -> int:
+        """Render every canned phrase for each voice so gesture feedback is a cache hit."""
+        voices = list(voices or [VoiceSettings(), VoiceSettings(tld='co.uk'),
+                                 VoiceSettings(tld='co.uk', slow=True)])
+        rendered = 0
+        for voice in voices:
+            for text in self.CANNED_PHRASES.values():
+                if not self.synthesize(text, voice).cached:
+                    rendered += 1
+        return rendered
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Delete least recently used audio until the cache fits in ``max_bytes``.
+
+        Returns:
+            Number of files removed
+        """
+        max_bytes = self.max_cache_bytes if max_bytes is None else max_bytes
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith('.part'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._cache_bytes = total
+        if removed:
+            logger.info(f"Evicted {removed} TTS audio files from the cache")
+        return removed
+
+    def _track_write(self, size: int):
+        """Account for a new file and evict only when the budget is exceeded."""
+        with self._lock:
+            if self._cache_bytes is not None:
+                self._cache_bytes += size
+            over_budget = self._cache_bytes is None or self._cache_bytes > self.max_cache_bytes
+        if over_budget:
+            self.evict()
+
+    @contextmanager
+    def _rendering(self, key: str):
+        """Hold the render lock of ``key``; it is dropped once no thread needs it."""
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+
+# Singleton instance
+tts_service = TextToSpeechService()
+
+
+def audio_response(request, text: str, voice: Optional[VoiceSettings] = None, service: Optional[TextToSpeechService] = None):
+    """
+    HTTP response delivering the audio for ``text``.
+
+    Cached audio is served from disk with Range support; uncached audio is
+    streamed while it is synthesized. The content address is the ETag either
+    way, so a client holding the audio gets 304 without any synthesis.
+
+    Args:
+        request: The incoming request
+        text: Text to speak
+        voice: Voice settings (defaults to ``VoiceSettings()``)
+        service: Service to render with (defaults to ``tts_service``)
+
+    Returns:
+        FileResponse / partial content for cached audio, otherwise a streaming response
+    """
+    service = service or tts_service
+    voice = voice or VoiceSettings()
+    key = service.cache_key(text, voice)
+    if etag_matches(request, key):
+        return not_modified_response(key)
+
+    cached = service.get_cached(text, voice)
+    if cached:
+        response = ranged_file_response(request, cached.path, cached.content_type, etag=key)
+    else:
+        response = StreamingHttpResponse(service.stream(text, voice), content_type=service.engine.content_type)
+        response['ETag'] = quote_etag(key)
+
+    # Audio is content-addressed: the same URL and voice always yields the same bytes
+    response['Cache-Control'] = 'private, max-age=86400'
+    response['X-Audio-Duration'] = f"{estimate_duration(text, voice):.2f}"
+    return response
@@ -10,19 +10,22 @@ from rest_framework.documentation import include_docs_urls
 from rest_framework.schemas import get_schema_view
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from core.metrics import metrics_view
+
 from . import views
 from .api_views import (
     TextSimilarityView,
     KeywordExtractionView,
     SentimentAnalysisView,
+    SummarizationView,
     EngagementAnalysisView,
     AdaptiveLearningView,
     TextToSpeechView,
-    HealthCheckView,
 )
 
 # Import existing views
 from .views import (
+    HealthCheckView,
     SpeechToTextView,
     FaceDetectionView,
     GestureRecognitionView,
@@ -48,6 +51,7 @@ text_analysis_patterns = [
     path('similarity/', TextSimilarityView.as_view(), name='text_similarity'),
     path('keywords/', KeywordExtractionView.as_view(), name='extract_keywords'),
     path('sentiment/', SentimentAnalysisView.as_view(), name='analyze_sentiment'),
+    path('summarize/', SummarizationView.as_view(), name='summarize_text'),
 ]
 
 # Speech Processing Endpoints
@@ -137,8 +141,13 @@ urlpatterns = [
     # Authentication
     path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
-    # Health Check
+    # Health Checks: liveness is cheap, readiness checks dependencies
     path('health/', HealthCheckView.as_view(), name='health_check'),
+    path('health/live/', views.health_check, name='health_live'),
+    path('health/ready/', HealthCheckView.as_view(), name='health_ready'),
+    
+    # Prometheus metrics
+    path('metrics/', metrics_view, name='metrics'),
     
     # API Endpoints
     path('text/', include((text_analysis_patterns, 'text'), namespace='text')),
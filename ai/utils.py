@@ -11,12 +11,22 @@ from django.utils import timezone
 from django.conf import settings
 
 from lessons.models import Lesson, Topic, LessonProgress
+from lessons.stats import catalog_size
 from assessments.models import Assessment, Question, AssessmentAttempt, UserResponse
 from users.models import CustomUser
 
 logger = logging.getLogger(__name__)
 
 
+# How much time on each lesson content type says about each (VARK) learning style
+CONTENT_TYPE_STYLES = {
+    'video': {'visual': 0.7, 'auditory': 0.3},
+    'audio': {'auditory': 0.9},
+    'text': {'reading_writing': 0.8, 'visual': 0.2},
+    'interactive': {'kinesthetic': 0.8, 'visual': 0.2},
+}
+
+
 class LearningStyleAnalyzer:
     """
     Analyzes a user's learning style based on their interactions with the platform.
@@ -59,17 +69,8 @@ class LearningStyleAnalyzer:
                 # Weight by both count and time spent
                 weight = (count * 0.4) + (total_time / 3600 * 0.6)  # Convert seconds to hours
                 
-                if content_type == 'video':
-                    scores['visual'] += weight * 0.7
-                    scores['auditory'] += weight * 0.3
-                elif content_type == 'audio':
-                    scores['auditory'] += weight * 0.9
-                elif content_type == 'text':
-                    scores['reading_writing'] += weight * 0.8
-                    scores['visual'] += weight * 0.2
-                elif content_type == 'interactive':
-                    scores['kinesthetic'] += weight * 0.8
-                    scores['visual'] += weight * 0.2
+                for style, share in CONTENT_TYPE_STYLES.get(content_type, {}).items():
+                    scores[style] += weight * share
             
             # Normalize scores to sum to 1.0
             total = sum(scores.values())
@@ -106,7 +107,7 @@ def get_learning_analytics(user_id: int) -> Dict[str, Any]:
             is_completed=True
         ).count()
         
-        total_lessons = Lesson.objects.count()
+        total_lessons = catalog_size()
         completion_rate = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
         
         # Get time spent learning
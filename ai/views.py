@@ -1,17 +1,26 @@
 import json
 import logging
 import platform
+import sys
 import psutil
 from datetime import datetime, timedelta
+from django.core.cache import cache
 from django.db import connection
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 
 
+# Models the orchestrator loads; readiness reports which are resident
+AI_MODEL_ATTRIBUTES = ('nlp', 'face_detector', 'engagement_analyzer')
+
+
 class HealthCheckView(APIView):
     """
-    Health check endpoint for monitoring the application status.
+    Readiness check: verifies the database, the cache and the AI models.
+
+    Orchestrators should route traffic on this endpoint and use the cheap
+    ``health_check`` liveness endpoint for restarts.
     """
     permission_classes = []  # No authentication required
     
@@ -19,7 +28,7 @@ class HealthCheckView(APIView):
         """
         Check the health of the application and its dependencies.
         """
-        # Basic system information
+        # Basic system information (non-blocking; no CPU sampling interval)
         system_info = {
             'status': 'operational',
             'timestamp': datetime.utcnow().isoformat(),
@@ -28,7 +37,6 @@ class HealthCheckView(APIView):
                 'os': platform.system(),
                 'os_version': platform.release(),
                 'hostname': platform.node(),
-                'cpu_usage': psutil.cpu_percent(),
                 'memory_usage': psutil.virtual_memory().percent,
                 'disk_usage': psutil.disk_usage('/').percent
             },
@@ -51,23 +59,31 @@ class HealthCheckView(APIView):
             }
             system_info['status'] = 'degraded'
         
-        # Add AI services status
+        # Check the cache with a write/read round-trip
         try:
-            from .orchestrator import ai_orchestrator
-            system_info['services']['ai_orchestrator'] = {
-                'status': 'operational',
-                'services': list(ai_orchestrator.__dict__.keys())
-            }
+            probe = f'health:{platform.node()}'
+            cache.set(probe, 'ok', 10)
+            if cache.get(probe) != 'ok':
+                raise RuntimeError('cache round-trip returned a different value')
+            system_info['services']['cache'] = {'status': 'operational'}
         except Exception as e:
-            system_info['services']['ai_orchestrator'] = {
+            system_info['services']['cache'] = {
                 'status': 'unavailable',
                 'error': str(e)
             }
             system_info['status'] = 'degraded'
         
-        # Determine overall status
-        if system_info['status'] != 'degraded':
-            system_info['status'] = 'operational'
+        # Report which AI models are loaded. The orchestrator loads them on
+        # import, so only inspect it if this process already has.
+        orchestrator_module = sys.modules.get('ai.orchestrator')
+        orchestrator = getattr(orchestrator_module, 'ai_orchestrator', None)
+        system_info['services']['ai_models'] = {
+            'status': 'operational' if orchestrator else 'not_loaded',
+            'models': {
+                name: getattr(orchestrator, name, None) is not None
+                for name in AI_MODEL_ATTRIBUTES
+            }
+        }
         
         return Response(system_info, 
                       status=status.HTTP_200_OK if system_info['status'] == 'operational' 
@@ -76,7 +92,7 @@ class HealthCheckView(APIView):
 
 # Health check function for URL routing
 def health_check(request):
-    """Simple health check endpoint for load balancers and monitoring."""
+    """Liveness check for load balancers: no database, cache or model access."""
     return JsonResponse({
         'status': 'ok',
         'timestamp': datetime.utcnow().isoformat(),
@@ -102,6 +118,8 @@ from django.db.models import Count, Avg, Q, Sum, F, ExpressionWrapper, FloatFiel
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from lessons.stats import catalog_size
+
 # Import models using get_model to avoid circular imports
 from django.apps import apps
 
@@ -115,6 +133,9 @@ from .serializers import (
     TopicSerializer
 )
 from .adaptive_learning_engine import AdaptiveLearningEngine
+from .recommendation.collaborative import collaborative_recommendations
+from .recommendation.similarity import similar_recommendations
+from .tts_service import audio_response, VoiceSettings
 from .tasks import (
     update_learning_analytics_task,
     generate_lesson_plan_task,
@@ -281,7 +302,7 @@ class LearningAnalyticsView(APIView):
                 for progress in completed_lessons
             )
             
-            total_lessons = Lesson.objects.count()
+            total_lessons = catalog_size()
             completed_count = completed_lessons.count()
             completion_rate = (completed_count / total_lessons * 100) if total_lessons > 0 else 0
             
@@ -350,6 +371,10 @@ class LessonRecommendationView(APIView):
         
         Query Parameters:
             limit (int): Maximum number of recommendations to return (default: 5)
+            mode (str): ``adaptive`` (default), ``collaborative`` (offline
+                ALS model) or ``similar`` (lessons learners who completed the
+                user's recent lessons also completed); both fall back to
+                adaptive when they have nothing for the user
             
         Returns:
             Response: JSON response containing recommended lessons
@@ -357,12 +382,20 @@ class LessonRecommendationView(APIView):
         try:
             user = request.user
             limit = int(request.query_params.get('limit', 5))
-            
-            # Initialize the adaptive learning engine
-            engine = AdaptiveLearningEngine(user)
-            
-            # Get recommended lessons
-            recommended_lessons = engine.get_recommended_lessons(limit=limit)
+            mode = request.query_params.get('mode', 'adaptive')
+            
+            recommended_lessons = []
+            if mode == 'collaborative':
+                recommended_lessons = collaborative_recommendations(user.id, limit)
+            elif mode == 'similar':
+                recommended_lessons = similar_recommendations(user.id, limit)
+            if not recommended_lessons:
+                mode = 'adaptive'
+                # Initialize the adaptive learning engine
+                engine = AdaptiveLearningEngine(user)
+                
+                # Get recommended lessons
+                recommended_lessons = engine.get_recommended_lessons(limit=limit)
             
             # Serialize the lessons
             serializer = LessonSerializer(recommended_lessons, many=True)
@@ -386,6 +419,7 @@ class LessonRecommendationView(APIView):
                 'status': 'success',
                 'data': {
                     'recommendations': serializer.data,
+                    'mode': mode,
                     'learning_style': learning_style,
                     'count': len(recommended_lessons),
                     'generated_at': timezone.now().isoformat()
@@ -1121,15 +1155,11 @@ def text_to_speech_view(request):
         try:
             data = json.loads(request.body)
             text = data.get('text')
-            user = request.user
-            
-            # Convert text to speech with personalized settings
-            audio = TextToSpeechConverter.convert(text, user)
+            if not text:
+                return JsonResponse({'error': 'Text is required'}, status=status.HTTP_400_BAD_REQUEST)
             
-            return JsonResponse({
-                'audio_url': audio.url,
-                'duration': audio.duration
-            })
+            # Stream the audio with personalized settings; playback starts with the first chunk
+            return audio_response(request, text, VoiceSettings.for_user(request.user))
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
@@ -5,20 +5,35 @@ from django.apps import apps
 Assessment = apps.get_model('assessments', 'Assessment')
 UserResponse = apps.get_model('assessments', 'UserResponse')
 
+class AssessmentListSerializer(serializers.ModelSerializer):
+    """
+    Lightweight serializer for assessment listings.
+    Serializes summary fields only; never the description or instructions.
+    """
+    created_by = serializers.StringRelatedField()
+
+    class Meta:
+        model = Assessment
+        fields = ('id', 'title', 'slug', 'time_limit', 'passing_score', 'is_active',
+                  'is_adaptive', 'start_date', 'end_date', 'created_by')
+        read_only_fields = fields
+
 class AssessmentSerializer(serializers.ModelSerializer):
     """
     Serializer for the Assessment model.
-    Serializes the id, title, and audio_file fields.
+    Serializes the settings, description and instructions of an assessment.
     """
     class Meta:
         model = Assessment
-        fields = ('id', 'title', 'audio_file')
+        fields = ('id', 'title', 'slug', 'description', 'instructions', 'time_limit',
+                  'passing_score', 'max_attempts', 'is_active', 'is_adaptive',
+                  'start_date', 'end_date')
 
-class ResponseSerializer(serializers.ModelSerializer):
+class UserResponseSerializer(serializers.ModelSerializer):
     """
-    Serializer for the Response model.
-    Serializes the id, user, assessment, and response_text fields.
+    Serializer for the UserResponse model.
+    Serializes the id, user, assessment, question, and text_response fields.
     """
     class Meta:
-        model = Response
-        fields = ('id', 'user', 'assessment', 'response_text')
+        model = UserResponse
+        fields = ('id', 'user', 'assessment', 'question', 'text_response')
@@ -2,7 +2,8 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from rest_framework import viewsets, status
 from django.apps import apps
-from .serializers import AssessmentSerializer, UserResponseSerializer
+from core.pagination import IdCursorPagination
+from .serializers import AssessmentSerializer, AssessmentListSerializer, UserResponseSerializer
 
 # Get models using string references to avoid circular imports
 Assessment = apps.get_model('assessments', 'Assessment')
@@ -46,16 +47,27 @@ class AssessmentViewSet(viewsets.ModelViewSet):
     """
     queryset = Assessment.objects.all()
     serializer_class = AssessmentSerializer
+    pagination_class = IdCursorPagination
+    
+    # Large TEXT columns that the list serializer never reads
+    LIST_DEFERRED_FIELDS = ('description', 'instructions')
     
     def get_queryset(self):
         """
         Optionally filter by active assessments.
         """
         queryset = Assessment.objects.all()
+        if self.action == 'list':
+            queryset = queryset.select_related('created_by').defer(*self.LIST_DEFERRED_FIELDS)
         is_active = self.request.query_params.get('is_active', None)
         if is_active is not None:
             queryset = queryset.filter(is_active=is_active.lower() == 'true')
         return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return AssessmentListSerializer
+        return super().get_serializer_class()
 
 class UserResponseViewSet(viewsets.ModelViewSet):
     """
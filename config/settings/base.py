@@ -12,6 +12,8 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
+from celery.schedules import crontab
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -32,10 +34,12 @@ INSTALLED_APPS = [
     'django_filters',
     
     # Local apps
+    'core',
     'ai',
     'users',
     'lessons',
     'assessments',
+    'accessibility',
 ]
 
 MIDDLEWARE = [
@@ -45,10 +49,29 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.InstrumentationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request timing, query and cache instrumentation (core.middleware.InstrumentationMiddleware).
+# Off unless REQUEST_INSTRUMENTATION=1; a staff user can then profile a request by sending X-Profile: 1.
+REQUEST_INSTRUMENTATION = {
+    'ENABLED': os.environ.get('REQUEST_INSTRUMENTATION') == '1',
+    'LOG_SAMPLE_RATE': float(os.environ.get('REQUEST_INSTRUMENTATION_LOG_SAMPLE_RATE', 0.01)),
+    'SLOW_REQUEST_MS': 1000,
+    'PROFILE_HEADER': 'X-Profile',
+    'PROFILE_SAMPLE_RATE': float(os.environ.get('REQUEST_PROFILE_SAMPLE_RATE', 0.0)),
+    'PROFILE_DIR': os.path.join(BASE_DIR, 'profiles'),
+}
+
+# Bearer token required to scrape /api/ai/metrics/ (core.metrics.metrics_view); unset leaves it open.
+# Run multi-process servers with PROMETHEUS_MULTIPROC_DIR set so every worker is aggregated.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Lifetime of {% fragment_cache %} entries (core.fragments), in seconds; 0 disables fragment caching.
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', 600))
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -62,6 +85,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.accessibility_settings',
             ],
         },
     },
@@ -191,6 +215,35 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    # Incremental: only lessons and articles changed since the last run are re-analyzed
+    'refit-keyword-model': {
+        'task': 'refit_keyword_model',
+        'schedule': 60 * 60,
+    },
+    # Narrations whose render chord never reported back are marked failed
+    'sweep-lesson-narrations': {
+        'task': 'sweep_lesson_narrations',
+        'schedule': 60 * 60,
+    },
+    'train-recommender': {
+        'task': 'train_recommender',
+        'schedule': 60 * 60 * 24,
+    },
+    'build-lesson-similarity': {
+        'task': 'build_lesson_similarity',
+        'schedule': 60 * 60 * 24,
+    },
+    'cluster-learners': {
+        'task': 'cluster_learners',
+        'schedule': crontab(hour=2, minute=30),
+    },
+    # Lesson stats are maintained incrementally; this corrects any drift
+    'reconcile-lesson-stats': {
+        'task': 'reconcile_lesson_stats',
+        'schedule': crontab(hour=3, minute=0),
+    },
+}
 
 # AI Model Paths
 AI_MODELS_DIR = os.path.join(BASE_DIR, 'ai_models')
@@ -233,5 +286,10 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'core.instrumentation': {
+            'handlers': ['console', 'file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
@@ -51,6 +51,12 @@ REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = {
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
 
+# Render speech with the offline engine (no network access)
+AI_TTS_ENGINE = 'offline'
+
+# Translate with the offline stand-in (no network access)
+AI_TRANSLATION_BACKEND = 'offline'
+
 # Disable file storage for tests
 DEFAULT_FILE_STORAGE = 'inmemorystorage.InMemoryStorage'
 
@@ -4,48 +4,28 @@
 def accessibility_settings(request):
     """Add accessibility settings to the template context.
     
+    Per-user styling is not inlined: pages link the compiled stylesheet of
+    the user's style profile (see ``accessibility.stylesheets``). The profile
+    digest also keys ``{% fragment_cache %}`` (see ``core.fragments``).
+    
     Args:
         request: The request object
         
     Returns:
-        dict: Dictionary containing accessibility settings
+        dict: The resolved settings, the profile digest, the stylesheet URL,
+        the body classes and the content versions fragments vary on
     """
-    # Default accessibility settings
-    accessibility = {
-        'high_contrast': False,
-        'dyslexia_font': False,
-        'font_size': 'medium',
-        'color_blind': 'none',
-        'keyboard_nav': False,
-        'screen_reader': False,
-        'animations': True,
-        'reduced_motion': False,
-    }
-    
-    # Update with user's settings if available
-    if hasattr(request, 'accessibility_settings'):
-        accessibility.update(request.accessibility_settings)
-    
-    # Add body classes for accessibility
-    body_classes = []
-    
-    if accessibility.get('high_contrast'):
-        body_classes.append('high-contrast')
-    
-    if accessibility.get('dyslexia_font'):
-        body_classes.append('dyslexia-font')
-    
-    if accessibility.get('reduced_motion'):
-        body_classes.append('reduced-motion')
-    
-    if accessibility.get('color_blind') != 'none':
-        body_classes.append(f'color-blind-{accessibility["color_blind"]}')
-    
-    if accessibility.get('font_size') != 'medium':
-        body_classes.append(f'font-size-{accessibility["font_size"]}')
+    from accessibility.middleware import get_accessibility_settings
+    from accessibility.stylesheets import stylesheet_for
+    from .fragments import ContentVersions
     
-    accessibility['body_classes'] = ' '.join(body_classes)
+    accessibility = get_accessibility_settings(request)
+    profile, stylesheet, body_classes = stylesheet_for(accessibility)
     
     return {
-        'accessibility': accessibility
+        'accessibility': accessibility,
+        'accessibility_profile': profile,
+        'accessibility_stylesheet': stylesheet,
+        'accessibility_body_classes': body_classes,
+        'content_versions': ContentVersions(),
     }
@@ -0,0 +1,54 @@
+"""
+Template fragment caching keyed by accessibility profile.
+
+Personalized pages mostly differ by accessibility profile, not by user, so
+``{% fragment_cache %}`` (core.templatetags.fragments) stores rendered HTML
+under the profile digest of the request (see accessibility.stylesheets) plus
+the values a fragment varies on. Users sharing a profile share the HTML.
+
+Fragments listing content vary on a content version: a per-name counter in
+the cache that the owning app bumps whenever that content changes.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_FRAGMENT_CACHE_TIMEOUT = 60 * 10
+
+
+def fragment_cache_timeout():
+    return getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', DEFAULT_FRAGMENT_CACHE_TIMEOUT)
+
+
+def fragment_cache_key(name, profile, vary_on=()):
+    """Cache key of fragment ``name`` for an accessibility profile."""
+    digest = hashlib.md5(':'.join(str(value) for value in vary_on).encode('utf-8'),
+                         usedforsecurity=False).hexdigest()
+    return f'fragment:{name}:{profile or "default"}:{digest}'
+
+
+def _version_key(name):
+    return f'content_version:{name}'
+
+
+def content_version(name):
+    """Current version of the content ``name`` (e.g. ``'lessons'``)."""
+    # Seeded from the clock, so an evicted counter never repeats an old version
+    return cache.get_or_set(_version_key(name), time.time_ns(), None)
+
+
+def bump_content_version(name):
+    """Invalidate every fragment that varies on the content ``name``."""
+    try:
+        cache.incr(_version_key(name))
+    except ValueError:
+        cache.set(_version_key(name), time.time_ns(), None)
+
+
+class ContentVersions:
+    """Template-friendly access to content versions: ``{{ content_versions.lessons }}``."""
+
+    def __getitem__(self, name):
+        return content_version(name)
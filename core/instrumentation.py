@@ -0,0 +1,137 @@
+"""
+Request-scoped performance instrumentation.
+
+``InstrumentationMiddleware`` (core.middleware) opens a ``RequestMetrics`` for
+each request; code anywhere below it reports into the active one through
+``timed``/``record_cache``. Both also feed the process-wide Prometheus metrics
+(core.metrics), so call sites do not need to know whether request
+instrumentation is enabled.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from .metrics import CACHE_REQUESTS, INFERENCE_SECONDS
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Timings, query and cache counters collected while serving one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings = defaultdict(float)  # name -> seconds
+        self.counts = defaultdict(int)     # name -> calls
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_hits = defaultdict(int)
+        self.cache_misses = defaultdict(int)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def add_timing(self, name, seconds):
+        self.timings[name] += seconds
+        self.counts[name] += 1
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook counting queries and their time."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+    def server_timing(self, total=None):
+        """Value of the ``Server-Timing`` header for these metrics."""
+        total = self.elapsed if total is None else total
+        entries = [
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+        ]
+        for name, seconds in sorted(self.timings.items()):
+            entries.append(f'{name};dur={seconds * 1000:.1f};desc="{self.counts[name]} calls"')
+        if self.cache_hits or self.cache_misses:
+            hits = sum(self.cache_hits.values())
+            misses = sum(self.cache_misses.values())
+            entries.append(f'cache;desc="hits={hits} misses={misses}"')
+        return ', '.join(entries)
+
+    def to_dict(self, total=None):
+        total = self.elapsed if total is None else total
+        return {
+            'total_ms': round(total * 1000, 2),
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'timings_ms': {name: round(seconds * 1000, 2) for name, seconds in self.timings.items()},
+            'calls': dict(self.counts),
+            'cache_hits': dict(self.cache_hits),
+            'cache_misses': dict(self.cache_misses),
+        }
+
+
+def current_metrics():
+    """The metrics of the request being served, or None outside one."""
+    return _current_metrics.get()
+
+
+@contextmanager
+def collect_metrics():
+    """Activate a fresh ``RequestMetrics`` for the enclosed block."""
+    metrics = RequestMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """
+    Time the enclosed block as ``name`` (e.g. ``'vision'``, ``'tts'``).
+
+    The duration is observed in the ``smartlearn_inference_seconds`` histogram
+    and, inside an instrumented request, added to its Server-Timing.
+
+    Usage::
+
+        with timed('embedding'):
+            vector = model.encode(text)
+    """
+    metrics = _current_metrics.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        INFERENCE_SECONDS.labels(kind=name).observe(elapsed)
+        if metrics is not None:
+            metrics.add_timing(name, elapsed)
+
+
+def instrumented(name):
+    """Decorator form of ``timed``."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(name, hit):
+    """Count a hit or miss of the cache ``name`` (process-wide and for the current request)."""
+    CACHE_REQUESTS.labels(cache=name, result='hit' if hit else 'miss').inc()
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits[name] += 1
+        else:
+            metrics.cache_misses[name] += 1
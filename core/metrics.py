@@ -0,0 +1,84 @@
+"""
+Prometheus metrics for SmartLearn Neuro.
+
+Metrics are exposed in the Prometheus text format by ``metrics_view``. With
+several worker processes (gunicorn, Celery) set ``PROMETHEUS_MULTIPROC_DIR``
+to a shared directory so the endpoint aggregates every process.
+"""
+import os
+import time
+
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest,
+)
+from prometheus_client import multiprocess
+
+# Inference runs from ~1 ms (cached embeddings) to several seconds (TTS)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+MODEL_LOAD_SECONDS = Histogram(
+    'smartlearn_model_load_seconds', 'Time to load an AI model', ['model'],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+INFERENCE_SECONDS = Histogram(
+    'smartlearn_inference_seconds', 'AI inference latency', ['kind'], buckets=LATENCY_BUCKETS,
+)
+BATCH_SIZE = Histogram(
+    'smartlearn_inference_batch_size', 'Requests encoded together by a micro-batcher', ['batcher'],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+BATCH_QUEUE_SECONDS = Histogram(
+    'smartlearn_inference_queue_seconds', 'Time a request waited in a micro-batcher queue', ['batcher'],
+    buckets=LATENCY_BUCKETS,
+)
+BATCHED_REQUESTS = Counter(
+    'smartlearn_inference_batched_requests_total', 'Requests served by a micro-batcher (rate() = throughput)',
+    ['batcher'],
+)
+CACHE_REQUESTS = Counter(
+    'smartlearn_cache_requests_total', 'Cache lookups by result', ['cache', 'result'],
+)
+CELERY_TASK_SECONDS = Histogram(
+    'smartlearn_celery_task_seconds', 'Celery task duration', ['task', 'state'], buckets=LATENCY_BUCKETS,
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    'smartlearn_websocket_connections', 'Open WebSocket connections', ['consumer'],
+    multiprocess_mode='livesum',
+)
+
+_task_started = {}
+
+
+@task_prerun.connect
+def _task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        CELERY_TASK_SECONDS.labels(task=task.name, state=state or 'UNKNOWN').observe(
+            time.perf_counter() - started
+        )
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint.
+
+    If ``settings.METRICS_TOKEN`` is set, scrapers must send it as a bearer token.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token and request.META.get('HTTP_AUTHORIZATION') != f'Bearer {token}':
+        return HttpResponseForbidden()
+
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -2,12 +2,21 @@
 Custom middleware for the core app.
 """
 import sys
+import json
+import time
+import random
 import logging
+from contextlib import ExitStack
+from pathlib import Path
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.http import HttpResponseServerError
 from .error_handlers import handle_uncaught_exception
+from .instrumentation import collect_metrics
 
 logger = logging.getLogger(__name__)
+metrics_logger = logging.getLogger('core.instrumentation')
 
 class ExceptionLoggingMiddleware:
     """
@@ -86,3 +95,79 @@ class SecurityHeadersMiddleware:
         # response['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains; preload'
         
         return response
+
+
+class InstrumentationMiddleware:
+    """
+    Opt-in per-request instrumentation.
+
+    Records wall time, DB query count/time, cache hits/misses and AI inference
+    timings (see ``core.instrumentation.timed``) into a ``Server-Timing``
+    header and a sampled structured log line. A request is profiled with
+    pyinstrument when a staff user sends the profile header with a true value
+    (``1``, ``true``, ``yes`` or ``on``), or at random at
+    ``PROFILE_SAMPLE_RATE``; the report is written to ``PROFILE_DIR``.
+
+    Configured by ``settings.REQUEST_INSTRUMENTATION``; disabled entirely
+    (removed from the middleware chain) unless ``ENABLED`` is true.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = getattr(settings, 'REQUEST_INSTRUMENTATION', {})
+        if not self.config.get('ENABLED'):
+            raise MiddlewareNotUsed
+        self.log_sample_rate = self.config.get('LOG_SAMPLE_RATE', 0.01)
+        self.slow_request_ms = self.config.get('SLOW_REQUEST_MS', 1000)
+        self.profile_header = 'HTTP_' + self.config.get('PROFILE_HEADER', 'X-Profile').upper().replace('-', '_')
+        self.profile_sample_rate = self.config.get('PROFILE_SAMPLE_RATE', 0.0)
+        self.profile_dir = Path(self.config.get('PROFILE_DIR') or 'profiles')
+
+    def __call__(self, request):
+        profiler = self._start_profiler(request)
+        with collect_metrics() as metrics, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics.db_wrapper))
+            response = self.get_response(request)
+        total = metrics.elapsed
+
+        response['Server-Timing'] = metrics.server_timing(total)
+        if profiler is not None:
+            response['X-Profile-Id'] = self._save_profile(profiler, request)
+
+        if total * 1000 >= self.slow_request_ms or random.random() < self.log_sample_rate:
+            match = getattr(request, 'resolver_match', None)
+            record = {
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                **metrics.to_dict(total),
+            }
+            metrics_logger.info(json.dumps(record), extra={'metrics': record})
+        return response
+
+    def _profile_requested(self, request) -> bool:
+        # "X-Profile: 0" (or an empty value) must not profile
+        value = request.META.get(self.profile_header, '').strip().lower()
+        user = getattr(request, 'user', None)
+        return value in ('1', 'true', 'yes', 'on') and user is not None and user.is_staff
+
+    def _start_profiler(self, request):
+        if not self._profile_requested(request) and random.random() >= self.profile_sample_rate:
+            return None
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("pyinstrument is not installed; request profiling is unavailable")
+            return None
+        profiler = Profiler()
+        profiler.start()
+        return profiler
+
+    def _save_profile(self, profiler, request):
+        profiler.stop()
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{random.getrandbits(32):08x}"
+        (self.profile_dir / f"{profile_id}.html").write_text(profiler.output_html())
+        logger.info(f"Saved request profile {profile_id} for {request.method} {request.path}")
+        return profile_id
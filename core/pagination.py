@@ -0,0 +1,17 @@
+"""
+Pagination classes shared by the API viewsets.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the primary key.
+
+    Each page is a ``WHERE id > cursor ORDER BY id LIMIT n`` query, so the
+    cost of a page does not grow with its position and there is no COUNT(*).
+    """
+    ordering = 'id'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
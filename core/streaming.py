@@ -0,0 +1,122 @@
+"""
+Streaming file responses with HTTP Range support.
+
+Browsers request media with ``Range`` headers to seek and resume playback;
+Django's FileResponse always sends the whole file, so audio endpoints use
+``ranged_file_response`` instead. Content-addressed files pass their key as
+the ETag so repeat requests are answered with 304 Not Modified.
+"""
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
+
+RANGE_RE = re.compile(r'^\s*bytes=(\d*)-(\d*)\s*$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def read_chunks(path, start=0, length=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield ``length`` bytes of ``path`` from ``start`` (default: to the end) in ``chunk_size`` blocks."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining is None or remaining > 0:
+            data = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not data:
+                break
+            if remaining is not None:
+                remaining -= len(data)
+            yield data
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range ``Range`` header.
+
+    Returns:
+        ``(start, end)`` inclusive byte offsets, ``None`` when the header is
+        absent or not a single byte range (serve the whole file), or
+        ``(size, size)`` when the range is unsatisfiable.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return size, size
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return size, size
+    return start, end
+
+
+def etag_matches(request, etag):
+    """True if the request's ``If-None-Match`` covers ``etag``."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header or not etag:
+        return False
+    etags = parse_etags(header)
+    # Weak comparison, as required for If-None-Match
+    return '*' in etags or quote_etag(etag).removeprefix('W/') in (e.removeprefix('W/') for e in etags)
+
+
+def not_modified_response(etag):
+    """304 carrying the validator the client already holds."""
+    response = HttpResponseNotModified()
+    response['ETag'] = quote_etag(etag)
+    return response
+
+
+def ranged_file_response(request, path, content_type, etag=None):
+    """
+    Serve ``path`` as a streamed response honouring a single byte ``Range``.
+
+    Args:
+        request: The incoming request
+        path: File to serve
+        content_type: MIME type of the file
+        etag: Strong validator for the file's content, if known
+
+    Returns:
+        200 FileResponse, 206 partial content, 304 if the client's copy is
+        current, or 416 if the range is unsatisfiable
+    """
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+
+    size = os.path.getsize(path)
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and (not etag or if_range != quote_etag(etag)):
+        # The client's partial copy is stale: send the whole file
+        range_header = None
+    byte_range = parse_range(range_header, size)
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    elif byte_range[0] >= size:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            read_chunks(path, start, length), status=206, content_type=content_type
+        )
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = quote_etag(etag)
+    return response
@@ -0,0 +1,58 @@
+"""
+``{% fragment_cache %}``: cache a block of template output per accessibility profile.
+
+Usage::
+
+    {% load fragments %}
+    {% fragment_cache 'lesson_list' content_versions.lessons %}
+        ...
+    {% endfragment_cache %}
+
+The first argument names the fragment; the rest are values it varies on.
+The accessibility profile of the request is always part of the key.
+"""
+from django import template
+from django.core.cache import cache
+
+from core.fragments import fragment_cache_key, fragment_cache_timeout
+from core.instrumentation import record_cache
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = fragment_cache_timeout()
+        if not timeout:
+            return self.nodelist.render(context)
+
+        key = fragment_cache_key(
+            self.name.resolve(context),
+            context.get('accessibility_profile'),
+            [value.resolve(context) for value in self.vary_on],
+        )
+        value = cache.get(key)
+        record_cache('fragments', value is not None)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, timeout)
+        return value
+
+
+@register.tag('fragment_cache')
+def do_fragment_cache(parser, token):
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name.")
+    nodelist = parser.parse(('endfragment_cache',))
+    parser.delete_first_token()
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
@@ -1,3 +1,168 @@
-from django.test import TestCase
+import os
+import tempfile
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
+
+from .fragments import bump_content_version, content_version
+from .instrumentation import record_cache, timed
+from .metrics import CACHE_REQUESTS, metrics_view
+from .middleware import InstrumentationMiddleware
+from .streaming import parse_range, ranged_file_response
+
+
+class RangedFileResponseTests(SimpleTestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(bytes(range(100)))
+        self.addCleanup(os.remove, self.path)
+        self.factory = RequestFactory()
+
+    def test_parse_range(self):
+        self.assertIsNone(parse_range(None, 100))
+        self.assertEqual(parse_range('bytes=10-19', 100), (10, 19))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-5', 100), (95, 99))
+        self.assertEqual(parse_range('bytes=200-', 100), (100, 100))
+
+    def test_full_file_without_range(self):
+        response = ranged_file_response(self.factory.get('/'), self.path, 'audio/mpeg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(100)))
+
+    def test_partial_content(self):
+        request = self.factory.get('/', HTTP_RANGE='bytes=10-19')
+        response = ranged_file_response(request, self.path, 'audio/mpeg')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+
+    def test_unsatisfiable_range(self):
+        request = self.factory.get('/', HTTP_RANGE='bytes=500-')
+        response = ranged_file_response(request, self.path, 'audio/mpeg')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_etag_and_if_none_match(self):
+        response = ranged_file_response(self.factory.get('/'), self.path, 'audio/mpeg', etag='abc')
+        self.assertEqual(response['ETag'], '"abc"')
+
+        request = self.factory.get('/', HTTP_IF_NONE_MATCH='"abc"')
+        response = ranged_file_response(request, self.path, 'audio/mpeg', etag='abc')
+        self.assertEqual(response.status_code, 304)
+
+    def test_stale_if_range_sends_whole_file(self):
+        request = self.factory.get('/', HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"old"')
+        response = ranged_file_response(request, self.path, 'audio/mpeg', etag='abc')
+        self.assertEqual(response.status_code, 200)
+
+
+class InstrumentationMiddlewareTests(TestCase):
+    def view(self, request):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        with timed('vision'):
+            pass
+        record_cache('lesson_chunks', hit=True)
+        record_cache('lesson_chunks', hit=False)
+        return HttpResponse()
+
+    @override_settings(REQUEST_INSTRUMENTATION={'ENABLED': True, 'LOG_SAMPLE_RATE': 1.0})
+    def test_server_timing_and_sampled_log(self):
+        middleware = InstrumentationMiddleware(self.view)
+        with self.assertLogs('core.instrumentation', level='INFO') as logs:
+            response = middleware(RequestFactory().get('/lessons/'))
+
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="1 queries"', timing)
+        self.assertIn('vision;dur=', timing)
+        self.assertIn('cache;desc="hits=1 misses=1"', timing)
+        self.assertIn('"db_queries": 1', logs.output[0])
+
+    @override_settings(REQUEST_INSTRUMENTATION={'ENABLED': True})
+    def test_profile_header_must_be_truthy(self):
+        middleware = InstrumentationMiddleware(self.view)
+        for value, expected in [('1', True), ('True', True), ('on', True), ('0', False), ('false', False), ('', False)]:
+            request = RequestFactory().get('/', HTTP_X_PROFILE=value)
+            request.user = SimpleNamespace(is_staff=True)
+            self.assertIs(middleware._profile_requested(request), expected, value)
+        request.user = SimpleNamespace(is_staff=False)
+        request.META['HTTP_X_PROFILE'] = '1'
+        self.assertFalse(middleware._profile_requested(request))
+
+    @override_settings(REQUEST_INSTRUMENTATION={'ENABLED': False})
+    def test_disabled_middleware_is_removed(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            InstrumentationMiddleware(self.view)
+
+    def test_helpers_work_outside_a_request(self):
+        with timed('tts'):
+            record_cache('tts', hit=True)
+
+
+
+class MetricsViewTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_exposes_inference_and_cache_metrics(self):
+        hits = CACHE_REQUESTS.labels(cache='test', result='hit')
+        before = hits._value.get()
+        with timed('test_inference'):
+            record_cache('test', hit=True)
+        self.assertEqual(hits._value.get(), before + 1)
+
+        response = metrics_view(self.factory.get('/metrics/'))
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('smartlearn_inference_seconds_count{kind="test_inference"}', body)
+        self.assertIn('smartlearn_cache_requests_total{cache="test",result="hit"}', body)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(metrics_view(self.factory.get('/metrics/')).status_code, 403)
+        response = metrics_view(self.factory.get('/metrics/', HTTP_AUTHORIZATION='Bearer secret'))
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(FRAGMENT_CACHE_TIMEOUT=60,
+                   CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class FragmentCacheTests(SimpleTestCase):
+    template = Template("{% load fragments %}{% fragment_cache 'test' version %}{{ value }}{% endfragment_cache %}")
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, value, profile='a', version=1):
+        return self.template.render(Context({
+            'value': value, 'accessibility_profile': profile, 'version': version,
+        }))
+
+    def test_second_render_is_served_from_cache(self):
+        self.assertEqual(self.render('first'), 'first')
+        self.assertEqual(self.render('second'), 'first')
+
+    def test_key_varies_on_profile_and_arguments(self):
+        self.render('first')
+        self.assertEqual(self.render('second', profile='b'), 'second')
+        self.assertEqual(self.render('third', version=2), 'third')
+
+    @override_settings(FRAGMENT_CACHE_TIMEOUT=0)
+    def test_zero_timeout_disables_caching(self):
+        self.render('first')
+        self.assertEqual(self.render('second'), 'second')
+
+    def test_bumping_content_version_changes_it(self):
+        version = content_version('test')
+        self.assertEqual(content_version('test'), version)
+        bump_content_version('test')
+        self.assertNotEqual(content_version('test'), version)
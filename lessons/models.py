@@ -1,3 +1,6 @@
+import hashlib
+from datetime import timedelta
+
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
@@ -5,6 +8,8 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.urls import reverse
 from django.utils.text import slugify
 
+from .rendering import PARAGRAPH_SEPARATOR, chunk_size_for, split_chunks, variant_for, prerender_lesson
+
 # Subject choices
 SUBJECT_CHOICES = [
     ('english', 'English'),
@@ -78,6 +83,11 @@ class Lesson(models.Model):
     keywords = models.CharField(max_length=255, blank=True)
     is_published = models.BooleanField(default=False)
     
+    # Derived from content on save
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False,
+                                    help_text="SHA-256 of the content; versions rendered chunks")
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -96,34 +106,56 @@ class Lesson(models.Model):
             self.slug = slugify(f"{self.topic.title}-{self.title}")
         if self.is_published and not self.published_at:
             self.published_at = timezone.now()
+        self.word_count = len(self.content.split())
+        self.content_hash = hashlib.sha256(self.content.encode('utf-8')).hexdigest()
         super().save(*args, **kwargs)
+        prerender_lesson(self)
     
     def get_absolute_url(self):
         return reverse('lesson_detail', kwargs={'slug': self.slug})
     
+    # Columns needed to render a navigation link; never the content blobs
+    NAVIGATION_FIELDS = ('id', 'title', 'slug')
+    
+    # Large TEXT columns that list pages never display
+    LIST_DEFERRED_FIELDS = ('description', 'content', 'transcript')
+    
+    @classmethod
+    def listing(cls):
+        """Queryset for list pages: topic and summary joined in, content blobs deferred"""
+        return cls.objects.select_related('topic', 'summary').defer(*cls.LIST_DEFERRED_FIELDS)
+    
+    @property
+    def preview(self):
+        """Precomputed extractive summary; empty until it has been built"""
+        try:
+            return self.summary.text
+        except LessonSummary.DoesNotExist:
+            return ''
+    
+    def get_previous_lesson(self):
+        """Lesson before this one in id order (a single primary-key lookup)"""
+        return (Lesson.objects.filter(id__lt=self.id)
+                .order_by('-id').only(*self.NAVIGATION_FIELDS).first())
+    
+    def get_next_lesson(self):
+        """Lesson after this one in id order (a single primary-key lookup)"""
+        return (Lesson.objects.filter(id__gt=self.id)
+                .order_by('id').only(*self.NAVIGATION_FIELDS).first())
+    
     def get_chunks(self, user=None, chunk_size=3):
         """
         Return lesson content as chunks based on user preferences.
         For users with ADHD or dyslexia, use smaller chunks.
         """
-        if user and hasattr(user, 'learning_condition'):
-            if user.learning_condition == 'ADHD':
-                chunk_size = 2
-            elif user.learning_condition == 'DYSLEXIA':
-                chunk_size = 1
-        
-        paragraphs = self.content.split('\n\n')
-        chunks = ['\n\n'.join(paragraphs[i:i + chunk_size]) 
-                 for i in range(0, len(paragraphs), chunk_size)]
-        return chunks
+        return split_chunks(self.content, chunk_size_for(user, chunk_size))
     
     def get_accessible_content(self, user=None):
         """Return content formatted based on user's accessibility needs"""
         content = self.content
-        if user and hasattr(user, 'learning_condition'):
-            if user.learning_condition == 'DYSLEXIC':
-                # Add syllable breaks for dyslexic users
-                content = self._add_syllable_breaks(content)
+        if variant_for(user) == 'dyslexia':
+            # Add syllable breaks for dyslexic users
+            content = self._add_syllable_breaks(content)
         return content
     
     def _add_syllable_breaks(self, text):
@@ -137,8 +169,74 @@ class Lesson(models.Model):
         if user and hasattr(user, 'reading_speed'):
             words_per_minute = user.reading_speed
         
-        word_count = len(self.content.split())
-        return max(1, round(word_count / words_per_minute))
+        return max(1, round(self.word_count / words_per_minute))
+
+
+class LessonNarration(models.Model):
+    """Manifest of pre-rendered narration audio for a lesson, per learning condition"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='narrations')
+    learning_condition = models.CharField(max_length=20)
+    content_hash = models.CharField(max_length=64, help_text="SHA-256 of the narrated content")
+    voice = models.JSONField(default=dict, help_text="Voice settings used for every chunk")
+    chunks = models.JSONField(default=list, help_text="Per-chunk audio: index, key, file, duration, content_type")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('lesson', 'learning_condition')
+    
+    def __str__(self):
+        return f"Narration for {self.lesson.title} ({self.learning_condition}, {self.status})"
+    
+    def get_chunk(self, index):
+        """Return the manifest entry for chunk ``index`` or None"""
+        if 0 <= index < len(self.chunks):
+            return self.chunks[index]
+        return None
+
+
+class LessonTranslation(models.Model):
+    """Lesson translated paragraph by paragraph; translated pages render from the stored segments"""
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='translations')
+    language = models.CharField(max_length=10)
+    content_hash = models.CharField(max_length=64, help_text="SHA-256 of the translated source content")
+    title = models.CharField(max_length=200)
+    segments = models.JSONField(default=list, help_text="Translated paragraphs, in order")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('lesson', 'language')
+    
+    def __str__(self):
+        return f"{self.lesson.title} ({self.language})"
+    
+    @property
+    def content(self):
+        return PARAGRAPH_SEPARATOR.join(self.segments)
+
+
+class LessonSummary(models.Model):
+    """Extractive summary of a lesson, precomputed so list pages never run NLP"""
+    lesson = models.OneToOneField(Lesson, on_delete=models.CASCADE, related_name='summary')
+    content_hash = models.CharField(max_length=64, help_text="SHA-256 of the summarized content")
+    text = models.TextField()
+    method = models.CharField(max_length=20, default='textrank')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'Lesson summaries'
+    
+    def __str__(self):
+        return f"Summary of {self.lesson.title}"
 
 
 class LessonResource(models.Model):
@@ -205,6 +303,11 @@ class LessonProgress(models.Model):
         status = "Completed" if self.is_completed else "In Progress" if self.is_started else "Not Started"
         return f"{self.user.username} - {self.lesson.title} ({status} - {self.progress_percentage}%)"
     
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        # The stats snapshot taken at load time is stale; the next save reads the row
+        self.__dict__.pop('_stats_previous', None)
+    
     def update_progress(self, time_spent_seconds=0, increment_progress=0):
         """Update progress with time spent and optional progress increment"""
         self.time_spent += time_spent_seconds
@@ -226,3 +329,56 @@ class LessonProgress(models.Model):
         self.engagement_score = min(1.0, interactions * 0.1)  # Example calculation
         self.save()
         return self.engagement_score
+
+
+class LessonStats(models.Model):
+    """
+    Per-lesson aggregates over every learner's progress, kept current by the
+    progress signals and rebuilt nightly (see lessons.stats)
+    """
+    lesson = models.OneToOneField(Lesson, on_delete=models.CASCADE, related_name='stats')
+    
+    # Sums over the lesson's LessonProgress rows
+    enrollments = models.PositiveIntegerField(default=0)
+    completions = models.PositiveIntegerField(default=0)
+    total_time_spent = models.PositiveBigIntegerField(default=0)  # in seconds
+    progress_sum = models.FloatField(default=0.0)
+    quiz_score_sum = models.FloatField(default=0.0)
+    quiz_score_count = models.PositiveIntegerField(default=0)
+    
+    # Completions per day ({'YYYY-MM-DD': count}) over the trend window
+    daily_completions = models.JSONField(default=dict, blank=True)
+    
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'Lesson stats'
+    
+    def __str__(self):
+        return f"Stats for lesson {self.lesson_id}"
+    
+    @property
+    def completion_rate(self):
+        """Percentage of enrolled learners who completed the lesson"""
+        return self.completions / self.enrollments * 100 if self.enrollments else 0.0
+    
+    @property
+    def average_time_spent(self):
+        return self.total_time_spent / self.enrollments if self.enrollments else 0.0
+    
+    @property
+    def average_progress(self):
+        return self.progress_sum / self.enrollments if self.enrollments else 0.0
+    
+    @property
+    def average_quiz_score(self):
+        return self.quiz_score_sum / self.quiz_score_count if self.quiz_score_count else None
+    
+    def trend(self, days=7, today=None):
+        """Completions per day over the last ``days`` days, oldest first"""
+        today = today or timezone.localdate()
+        return [
+            self.daily_completions.get((today - timedelta(days=offset)).isoformat(), 0)
+            for offset in range(days - 1, -1, -1)
+        ]
@@ -0,0 +1,104 @@
+"""
+Lesson rendering cache.
+
+Lesson content is split into chunks and rendered to HTML once per
+(lesson version, chunk size, accessibility variant) and kept in the cache, so
+the lesson page is a cache read for every learning condition. Keys include the
+content hash, so editing a lesson never serves stale chunks and needs no
+explicit invalidation.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.utils.html import linebreaks
+
+from core.instrumentation import record_cache
+
+DEFAULT_CHUNK_SIZE = 3
+
+# Paragraphs per chunk for learning conditions that need smaller chunks
+CONDITION_CHUNK_SIZES = {
+    'ADHD': 2,
+    'DYSLEXIA': 1,
+}
+
+# Learning conditions whose content is transformed before rendering
+ACCESSIBILITY_VARIANTS = {
+    'DYSLEXIA': 'dyslexia',
+}
+
+RENDER_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Paragraphs are the unit of chunking and of translation
+PARAGRAPH_SEPARATOR = '\n\n'
+
+
+def chunk_size_for(user=None, default=DEFAULT_CHUNK_SIZE):
+    """Paragraphs per chunk for ``user``'s learning condition"""
+    return CONDITION_CHUNK_SIZES.get(getattr(user, 'learning_condition', None), default)
+
+
+def variant_for(user=None):
+    """Accessibility variant of the rendered content for ``user``"""
+    return ACCESSIBILITY_VARIANTS.get(getattr(user, 'learning_condition', None), 'default')
+
+
+def split_paragraphs(content):
+    return content.split(PARAGRAPH_SEPARATOR)
+
+
+def split_chunks(content, chunk_size):
+    """Group the paragraphs of ``content`` into chunks of ``chunk_size``"""
+    paragraphs = split_paragraphs(content)
+    return [PARAGRAPH_SEPARATOR.join(paragraphs[i:i + chunk_size])
+            for i in range(0, len(paragraphs), chunk_size)]
+
+
+def render_chunks(lesson, chunk_size, variant, translation=None):
+    """Render the lesson's (or its translation's) chunks to escaped paragraph HTML"""
+    content = translation.content if translation else lesson.content
+    # Syllable breaks are English-only; translated segments are rendered as stored
+    if variant == 'dyslexia' and translation is None:
+        content = lesson._add_syllable_breaks(content)
+    return [str(linebreaks(chunk, autoescape=True)) for chunk in split_chunks(content, chunk_size)]
+
+
+def cache_key(lesson, chunk_size, variant, translation=None):
+    key = f"lesson_chunks:{lesson.pk}:{lesson.content_hash[:16]}:{chunk_size}:{variant}"
+    if translation is None:
+        return key
+    # Segments can be re-translated or edited without the source content changing
+    digest = hashlib.sha256(translation.content.encode('utf-8')).hexdigest()[:16]
+    return f"{key}:{translation.language}:{digest}"
+
+
+def get_rendered_chunks(lesson, user=None, translation=None):
+    """
+    HTML chunks of ``lesson`` for ``user``, rendered on a cache miss only.
+    With a ``LessonTranslation`` of the current content, its stored
+    segments are rendered instead.
+    """
+    chunk_size = chunk_size_for(user)
+    variant = variant_for(user)
+    key = cache_key(lesson, chunk_size, variant, translation)
+
+    chunks = cache.get(key)
+    record_cache('lesson_chunks', hit=chunks is not None)
+    if chunks is None:
+        chunks = render_chunks(lesson, chunk_size, variant, translation)
+        cache.set(key, chunks, RENDER_CACHE_TIMEOUT)
+    return chunks
+
+
+def prerender_lesson(lesson):
+    """Render and cache the chunks of every learning condition (called on save)"""
+    variants = {
+        (chunk_size_for(), variant_for()),
+        *((size, ACCESSIBILITY_VARIANTS.get(condition, 'default'))
+          for condition, size in CONDITION_CHUNK_SIZES.items()),
+    }
+    cache.set_many(
+        {cache_key(lesson, size, variant): render_chunks(lesson, size, variant)
+         for size, variant in variants},
+        RENDER_CACHE_TIMEOUT
+    )
@@ -1,14 +1,30 @@
 from rest_framework import serializers
 from .models import Lesson, LessonProgress
 
+class LessonListSerializer(serializers.ModelSerializer):
+    """
+    Lightweight serializer for lesson listings.
+    Serializes summary fields only; never the content or transcript.
+    """
+    topic_title = serializers.CharField(source='topic.title', read_only=True)
+    preview = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Lesson
+        fields = ('id', 'title', 'slug', 'topic', 'topic_title', 'preview', 'difficulty',
+                  'duration', 'word_count', 'thumbnail', 'is_published')
+        read_only_fields = fields
+
 class LessonSerializer(serializers.ModelSerializer):
     """
     Serializer for the Lesson model.
-    Serializes fields: id, title, content, image, audio_file.
+    Serializes fields: id, title, topic, content, thumbnail, audio_file.
     """
+    topic_title = serializers.CharField(source='topic.title', read_only=True)
+
     class Meta:
         model = Lesson
-        fields = ('id', 'title', 'content', 'image', 'audio_file')
+        fields = ('id', 'title', 'topic', 'topic_title', 'content', 'thumbnail', 'audio_file')
 
 class LessonProgressSerializer(serializers.ModelSerializer):
     """
@@ -0,0 +1,69 @@
+"""
+Signals for the lessons app.
+"""
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from core.fragments import bump_content_version
+from .models import Lesson, LessonProgress, LessonSummary, Topic
+from .stats import PROGRESS_FIELDS, apply_progress_change, progress_snapshot
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_save, sender=LessonSummary)
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def invalidate_lesson_fragments(sender, instance, **kwargs):
+    """
+    Expire cached template fragments that list lessons.
+    """
+    bump_content_version('lessons')
+
+
+@receiver(post_init, sender=LessonProgress)
+def snapshot_loaded_progress(sender, instance, **kwargs):
+    """
+    Keep the progress values as loaded, so a save can update the stats
+    without reading the row back first.
+    """
+    if instance.pk is not None and not instance.get_deferred_fields().intersection(PROGRESS_FIELDS):
+        instance._stats_previous = progress_snapshot(instance)
+
+
+@receiver(pre_save, sender=LessonProgress)
+def remember_previous_progress(sender, instance, raw=False, **kwargs):
+    """
+    Keep the stored progress row so the stats update can apply the difference.
+
+    Rows loaded from the database carry their snapshot from ``post_init``;
+    only instances built with an explicit pk, or loaded without the stats
+    fields, are read back.
+    """
+    if raw or instance.pk is None:
+        instance._stats_previous = None
+    elif instance._state.adding or not hasattr(instance, '_stats_previous'):
+        instance._stats_previous = (
+            LessonProgress.objects.filter(pk=instance.pk).values(*PROGRESS_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=LessonProgress)
+def update_lesson_stats(sender, instance, raw=False, **kwargs):
+    """
+    Apply a progress save to its lesson's stats.
+    """
+    if raw:
+        return
+    current = progress_snapshot(instance)
+    apply_progress_change(getattr(instance, '_stats_previous', None), current)
+    # The next save of this instance diffs against what was just written
+    instance._stats_previous = current
+
+
+@receiver(post_delete, sender=LessonProgress)
+def remove_lesson_stats_contribution(sender, instance, **kwargs):
+    """
+    Take a deleted progress row out of its lesson's stats.
+    """
+    apply_progress_change(progress_snapshot(instance), None)
@@ -0,0 +1,207 @@
+"""
+Lesson statistics.
+
+``LessonStats`` holds per-lesson sums over all learners' progress
+(enrollments, completions, time spent, progress, quiz scores) and the daily
+completions of the trend window. Progress signals apply the change each save
+makes, so reading a lesson's stats never aggregates ``LessonProgress``; the
+nightly ``reconcile_lesson_stats`` task rebuilds every row from scratch to
+correct any drift (e.g. bulk updates, which skip signals).
+
+Readers go through ``get_lesson_stats``, which serves rows from the cache.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.fragments import content_version
+from core.instrumentation import record_cache
+from .models import Lesson, LessonProgress, LessonStats
+
+TREND_DAYS = 7
+
+STATS_CACHE_TIMEOUT = 60 * 60
+
+# LessonProgress fields a learner's contribution to the stats depends on
+PROGRESS_FIELDS = ('lesson_id', 'is_completed', 'completion_date', 'time_spent',
+                   'progress_percentage', 'quiz_score')
+
+COUNTERS = ('enrollments', 'completions', 'total_time_spent', 'progress_sum',
+            'quiz_score_sum', 'quiz_score_count')
+
+
+def cache_key(lesson_id):
+    return f'lesson_stats:{lesson_id}'
+
+
+def progress_snapshot(progress):
+    """The stats-relevant fields of a LessonProgress instance."""
+    return {field: getattr(progress, field) for field in PROGRESS_FIELDS}
+
+
+def contribution(snapshot):
+    """What one progress row adds to each counter of its lesson's stats."""
+    if snapshot is None:
+        return dict.fromkeys(COUNTERS, 0)
+    return {
+        'enrollments': 1,
+        'completions': int(snapshot['is_completed']),
+        'total_time_spent': snapshot['time_spent'] or 0,
+        'progress_sum': snapshot['progress_percentage'] or 0.0,
+        'quiz_score_sum': snapshot['quiz_score'] or 0.0,
+        'quiz_score_count': int(snapshot['quiz_score'] is not None),
+    }
+
+
+def _completion_day(snapshot):
+    if snapshot is None or not snapshot['is_completed']:
+        return None
+    completed = snapshot['completion_date']
+    return timezone.localdate(completed) if completed else timezone.localdate()
+
+
+def _trim(daily_completions, today=None):
+    """Drop days that fell out of the trend window."""
+    first = (today or timezone.localdate()) - timedelta(days=TREND_DAYS - 1)
+    return {day: count for day, count in daily_completions.items()
+            if count > 0 and day >= first.isoformat()}
+
+
+def apply_progress_change(old, new):
+    """
+    Update the stats of the lesson(s) a progress row moved between.
+
+    Args:
+        old: ``progress_snapshot`` before the change (None for a new row)
+        new: ``progress_snapshot`` after the change (None for a deleted row)
+    """
+    if old is not None and new is not None and old['lesson_id'] != new['lesson_id']:
+        apply_progress_change(old, None)
+        apply_progress_change(None, new)
+        return
+
+    lesson_id = (new or old)['lesson_id']
+    before, after = contribution(old), contribution(new)
+    deltas = {counter: after[counter] - before[counter] for counter in COUNTERS
+              if after[counter] != before[counter]}
+    old_day, new_day = _completion_day(old), _completion_day(new)
+    if not deltas and old_day == new_day:
+        return
+
+    with transaction.atomic():
+        updated = LessonStats.objects.filter(lesson_id=lesson_id).update(
+            **{counter: F(counter) + delta for counter, delta in deltas.items()},
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            # First progress on this lesson since the last rebuild: compute its row exactly.
+            # Deletions are skipped: the lesson itself may be being deleted.
+            if new is not None:
+                reconcile_lesson_stats([lesson_id])
+            return
+        if old_day != new_day:
+            stats = LessonStats.objects.select_for_update().only('daily_completions').get(lesson_id=lesson_id)
+            daily = dict(stats.daily_completions)
+            if old_day:
+                daily[old_day.isoformat()] = daily.get(old_day.isoformat(), 0) - 1
+            if new_day:
+                daily[new_day.isoformat()] = daily.get(new_day.isoformat(), 0) + 1
+            LessonStats.objects.filter(lesson_id=lesson_id).update(daily_completions=_trim(daily))
+    cache.delete(cache_key(lesson_id))
+
+
+def reconcile_lesson_stats(lesson_ids=None):
+    """
+    Rebuild stats rows from ``LessonProgress`` in two grouped queries.
+
+    Args:
+        lesson_ids: Lessons to rebuild (default: every lesson)
+
+    Returns:
+        int: Number of rows written
+    """
+    lessons = Lesson.objects.all()
+    progress = LessonProgress.objects.all()
+    if lesson_ids is not None:
+        lessons = lessons.filter(id__in=lesson_ids)
+        progress = progress.filter(lesson_id__in=lesson_ids)
+
+    totals = {
+        row['lesson_id']: row for row in
+        progress.values('lesson_id').annotate(
+            enrollments=Count('id'),
+            completions=Count('id', filter=Q(is_completed=True)),
+            total_time_spent=Sum('time_spent'),
+            progress_sum=Sum('progress_percentage'),
+            quiz_score_sum=Sum('quiz_score'),
+            quiz_score_count=Count('quiz_score'),
+        ).order_by()
+    }
+    today = timezone.localdate()
+    daily = {}
+    recent = (
+        progress
+        .filter(is_completed=True, completion_date__date__gte=today - timedelta(days=TREND_DAYS - 1))
+        .annotate(day=TruncDate('completion_date'))
+        .values('lesson_id', 'day').annotate(count=Count('id')).order_by()
+    )
+    for row in recent:
+        daily.setdefault(row['lesson_id'], {})[row['day'].isoformat()] = row['count']
+
+    now = timezone.now()
+    rows = []
+    for lesson_id in lessons.values_list('id', flat=True):
+        row = totals.get(lesson_id, {})
+        rows.append(LessonStats(
+            lesson_id=lesson_id,
+            **{counter: row.get(counter) or 0 for counter in COUNTERS},
+            daily_completions=daily.get(lesson_id, {}),
+            reconciled_at=now,
+        ))
+    LessonStats.objects.bulk_create(
+        rows, batch_size=500, update_conflicts=True, unique_fields=['lesson'],
+        update_fields=[*COUNTERS, 'daily_completions', 'reconciled_at', 'updated_at'],
+    )
+    cache.delete_many([cache_key(row.lesson_id) for row in rows])
+    return len(rows)
+
+
+def get_lesson_stats(lesson_ids):
+    """
+    Stats of the given lessons, from the cache where possible.
+
+    Lessons nobody has started get an empty (unsaved) ``LessonStats``.
+
+    Returns:
+        dict: lesson id -> ``LessonStats``
+    """
+    lesson_ids = list(lesson_ids)
+    keys = {cache_key(lesson_id): lesson_id for lesson_id in lesson_ids}
+    cached = cache.get_many(keys)
+    stats = {keys[key]: value for key, value in cached.items()}
+    missing = [lesson_id for lesson_id in lesson_ids if lesson_id not in stats]
+    for lesson_id in lesson_ids:
+        record_cache('lesson_stats', lesson_id in stats)
+
+    if missing:
+        fetched = {row.lesson_id: row for row in LessonStats.objects.filter(lesson_id__in=missing)}
+        for lesson_id in missing:
+            stats[lesson_id] = fetched.get(lesson_id) or LessonStats(lesson_id=lesson_id)
+        cache.set_many({cache_key(lesson_id): stats[lesson_id] for lesson_id in missing},
+                       STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def catalog_size():
+    """Number of lessons, cached until the lesson catalog changes."""
+    key = f'lesson_catalog_size:{content_version("lessons")}'
+    size = cache.get(key)
+    record_cache('lesson_catalog', size is not None)
+    if size is None:
+        size = Lesson.objects.count()
+        cache.set(key, size, STATS_CACHE_TIMEOUT)
+    return size
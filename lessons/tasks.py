@@ -0,0 +1,26 @@
+"""
+Celery tasks for the lessons app.
+"""
+import logging
+
+from celery import shared_task
+
+from .stats import reconcile_lesson_stats
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="reconcile_lesson_stats")
+def reconcile_lesson_stats_task() -> int:
+    """
+    Rebuild every lesson's stats from its progress rows, correcting any
+    drift in the incrementally maintained counters.
+    
+    Returns:
+        int: Number of lessons reconciled.
+    """
+    try:
+        return reconcile_lesson_stats()
+    except Exception as e:
+        logger.error(f"Error in reconcile_lesson_stats_task: {str(e)}", exc_info=True)
+        raise
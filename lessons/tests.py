@@ -1,6 +1,19 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
-from .models import Lesson, LessonProgress
+from ai.narration import build_lesson_narration, get_narration, mark_narration_ready, sweep_pending_narrations
+from ai.tts_service import OfflineEngine, VoiceSettings, tts_service
+from .models import Lesson, LessonProgress, LessonStats, Topic
+from . import rendering, views
+from .stats import get_lesson_stats, reconcile_lesson_stats
 
 class LessonTests(TestCase):
     def setUp(self):
@@ -16,4 +29,180 @@ class LessonTests(TestCase):
     def test_lesson_progress(self):
         progress = LessonProgress.objects.create(user=self.user, lesson=self.lesson, progress=50.0)
         self.assertEqual(progress.progress, 50.0)
-        self.assertEqual(str(progress), f"{self.user.username} - {self.lesson.title}")
\ No newline at end of file
+        self.assertEqual(str(progress), f"{self.user.username} - {self.lesson.title}")
+
+
+class LessonNavigationTests(TestCase):
+    def setUp(self):
+        topic = Topic.objects.create(title='Navigation')
+        self.lessons = [
+            Lesson.objects.create(title=f'Lesson {i}', topic=topic, content='Body') for i in range(3)
+        ]
+
+    def test_prev_next_navigation(self):
+        first, second, third = self.lessons
+        with self.assertNumQueries(2):
+            prev_lesson, next_lesson = second.get_previous_lesson(), second.get_next_lesson()
+        self.assertEqual((prev_lesson, next_lesson), (first, third))
+        self.assertIn('content', next_lesson.get_deferred_fields())
+        self.assertIsNone(third.get_next_lesson())
+
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class LessonRenderingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.topic = Topic.objects.create(title='Rendering')
+        self.lesson = Lesson.objects.create(
+            title='Rendered', topic=self.topic, content='One <b>two</b>.\n\nThree four.\n\nFive.'
+        )
+
+    def test_word_count_is_precomputed(self):
+        self.assertEqual(self.lesson.word_count, 5)
+        self.assertEqual(self.lesson.get_estimated_reading_time(), 1)
+
+    def test_chunks_are_rendered_on_save(self):
+        dyslexic = SimpleNamespace(learning_condition='DYSLEXIA')
+        with patch.object(rendering, 'render_chunks') as render:
+            chunks = rendering.get_rendered_chunks(self.lesson, dyslexic)
+        render.assert_not_called()
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[0], '<p>One &lt;b&gt;two&lt;/b&gt;.</p>')
+
+    def test_edited_content_gets_new_chunks(self):
+        self.lesson.content = 'Rewritten.'
+        self.lesson.save()
+        self.assertEqual(rendering.get_rendered_chunks(self.lesson), ['<p>Rewritten.</p>'])
+
+
+@override_settings(AI_TTS_ENGINE='offline')
+class LessonNarrationTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        topic = Topic.objects.create(title='Plants')
+        self.lesson = Lesson.objects.create(
+            title='Narrated Lesson', topic=topic, content='First part.\nSecond part.', is_published=True
+        )
+
+    def test_manifest_is_built_per_condition(self):
+        with patch.object(tts_service, '_engine', OfflineEngine()), \
+                patch.object(tts_service, '_cache_dir', None):
+            pending = build_lesson_narration(self.lesson)
+            self.assertTrue(pending)
+            self.assertEqual(
+                set(self.lesson.narrations.values_list('learning_condition', flat=True)),
+                {'NORMAL', 'ADHD', 'DYSLEXIA'}
+            )
+
+            for text, voice in pending:
+                tts_service.synthesize(text, VoiceSettings(**voice))
+            self.assertEqual(mark_narration_ready(self.lesson.pk), 3)
+
+            # Unchanged content does not queue any work
+            self.assertEqual(build_lesson_narration(self.lesson), [])
+
+    def test_stale_pending_narration_is_failed_and_rebuilt(self):
+        with patch.object(tts_service, '_engine', OfflineEngine()), \
+                patch.object(tts_service, '_cache_dir', None):
+            pending = build_lesson_narration(self.lesson)
+            # A chunk never rendered: nothing settles until the sweep
+            self.assertEqual(sweep_pending_narrations(), 0)
+            self.assertEqual(sweep_pending_narrations(max_age=timedelta(0)), 3)
+            self.assertEqual(set(self.lesson.narrations.values_list('status', flat=True)), {'failed'})
+
+            self.assertEqual(build_lesson_narration(self.lesson), pending)
+            self.assertEqual(set(self.lesson.narrations.values_list('status', flat=True)), {'pending'})
+
+    def test_chunk_is_revalidated_against_its_content_key(self):
+        user = get_user_model().objects.create_user(username='listener', password='testpass')
+        factory = RequestFactory()
+        with patch.object(tts_service, '_engine', OfflineEngine()), \
+                patch.object(tts_service, '_cache_dir', None):
+            for text, voice in build_lesson_narration(self.lesson):
+                tts_service.synthesize(text, VoiceSettings(**voice))
+            mark_narration_ready(self.lesson.pk)
+            key = get_narration(self.lesson, user).chunks[0]['key']
+
+            request = factory.get('/')
+            request.user = user
+            response = views.lesson_narration_chunk(request, self.lesson.pk, 0)
+            request = factory.get('/', HTTP_IF_NONE_MATCH=f'"{key}"')
+            request.user = user
+            not_modified = views.lesson_narration_chunk(request, self.lesson.pk, 0)
+
+        self.assertEqual(response['ETag'], f'"{key}"')
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertEqual(not_modified.status_code, 304)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class LessonStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f'stats{i}', email=f'stats{i}@example.com', password='testpass')
+            for i in range(3)
+        ]
+        topic = Topic.objects.create(title='Stats')
+        self.lesson = Lesson.objects.create(title='Counted', topic=topic, content='Body')
+
+    def assertStatsMatchReconciled(self):
+        incremental = LessonStats.objects.values().get(lesson=self.lesson)
+        reconcile_lesson_stats()
+        rebuilt = LessonStats.objects.values().get(lesson=self.lesson)
+        for field in ('enrollments', 'completions', 'total_time_spent', 'progress_sum',
+                      'quiz_score_sum', 'quiz_score_count', 'daily_completions'):
+            self.assertEqual(incremental[field], rebuilt[field], field)
+
+    def test_progress_events_update_stats(self):
+        first = LessonProgress.objects.create(user=self.users[0], lesson=self.lesson, time_spent=60)
+        LessonProgress.objects.create(user=self.users[1], lesson=self.lesson, time_spent=120, quiz_score=80.0)
+        first.update_progress(time_spent_seconds=60, increment_progress=100)
+
+        stats = get_lesson_stats([self.lesson.id])[self.lesson.id]
+        self.assertEqual((stats.enrollments, stats.completions), (2, 1))
+        self.assertEqual(stats.completion_rate, 50.0)
+        self.assertEqual(stats.average_time_spent, 120.0)
+        self.assertEqual(stats.average_quiz_score, 80.0)
+        self.assertEqual(stats.trend(), [0, 0, 0, 0, 0, 0, 1])
+        self.assertStatsMatchReconciled()
+
+        first.delete()
+        self.assertEqual(get_lesson_stats([self.lesson.id])[self.lesson.id].enrollments, 1)
+        self.assertStatsMatchReconciled()
+
+    def test_saving_loaded_progress_does_not_read_it_back(self):
+        created = LessonProgress.objects.create(user=self.users[0], lesson=self.lesson, time_spent=60)
+        progress = LessonProgress.objects.get(pk=created.pk)
+        with CaptureQueriesContext(connection) as queries:
+            progress.update_progress(time_spent_seconds=30, increment_progress=40)
+        reads = [q['sql'] for q in queries if q['sql'].startswith('SELECT') and 'lessons_lessonprogress' in q['sql']]
+        self.assertEqual(reads, [])
+
+        # Later saves and a refresh still diff against what is stored
+        progress.update_progress(time_spent_seconds=30, increment_progress=60)
+        LessonProgress.objects.get(pk=progress.pk).update_progress(time_spent_seconds=400)
+        progress.refresh_from_db()
+        progress.update_progress(time_spent_seconds=10)
+        self.assertStatsMatchReconciled()
+
+    def test_stats_are_served_from_cache(self):
+        LessonProgress.objects.create(user=self.users[0], lesson=self.lesson, progress_percentage=40)
+        get_lesson_stats([self.lesson.id])
+        with self.assertNumQueries(0):
+            stats = get_lesson_stats([self.lesson.id])
+        self.assertEqual(stats[self.lesson.id].average_progress, 40.0)
+
+    def test_reconcile_corrects_drift(self):
+        LessonProgress.objects.create(user=self.users[0], lesson=self.lesson)
+        # Bulk updates skip signals
+        LessonProgress.objects.update(is_completed=True, progress_percentage=100)
+        reconcile_lesson_stats()
+        stats = get_lesson_stats([self.lesson.id])[self.lesson.id]
+        self.assertEqual((stats.completions, stats.average_progress), (1, 100.0))
@@ -23,6 +23,8 @@ lesson_patterns = [
     path('<int:pk>/bookmark/', views.BookmarkToggleView.as_view(), name='lesson_bookmark'),
     path('<int:pk>/note/', views.NoteCreateView.as_view(), name='lesson_note_create'),
     path('<int:pk>/download/', views.LessonDownloadView.as_view(), name='lesson_download'),
+    path('<int:pk>/narration/', views.lesson_narration, name='lesson_narration'),
+    path('<int:pk>/narration/<int:index>/', views.lesson_narration_chunk, name='lesson_narration_chunk'),
     path('<int:pk>/print/', views.LessonPrintView.as_view(), name='lesson_print'),
     path('<int:pk>/rate/', views.LessonRateView.as_view(), name='lesson_rate'),
     path('<int:pk>/share/', views.LessonShareView.as_view(), name='lesson_share'),
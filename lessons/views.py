@@ -1,9 +1,15 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse, Http404
+from django.urls import reverse
 from rest_framework import viewsets
+from ai.narration import get_narration, chunk_audio_path
+from ai.translation.lessons import get_lesson_translation
+from core.pagination import IdCursorPagination
+from core.streaming import ranged_file_response
 from .models import Lesson, LessonProgress
-from .serializers import LessonSerializer, LessonProgressSerializer
+from .rendering import get_rendered_chunks
+from .serializers import LessonSerializer, LessonListSerializer, LessonProgressSerializer
 
 
 @login_required
@@ -11,7 +17,7 @@ def lesson_list(request):
     """
     Display a list of all lessons.
     """
-    lessons = Lesson.objects.all()
+    lessons = Lesson.listing()
     return render(request, 'lessons/lesson_list.html', {'lessons': lessons})
 
 
@@ -19,26 +25,77 @@ def lesson_list(request):
 def lesson_detail(request, pk):
     """
     Display a specific lesson with content chunks and navigation.
+    ``?lang=<code>`` shows the stored translation, if one has been built.
     """
     lesson = get_object_or_404(Lesson, pk=pk)
     progress, _ = LessonProgress.objects.get_or_create(user=request.user, lesson=lesson)
-    chunks = lesson.get_chunks(request.user)
+    translation = get_lesson_translation(lesson, request.GET.get('lang'))
+    chunks = get_rendered_chunks(lesson, request.user, translation)
 
-    # Navigation logic
-    lessons = list(Lesson.objects.order_by('id'))
-    current_index = next((i for i, l in enumerate(lessons) if l.id == lesson.id), None)
-    prev_lesson = lessons[current_index - 1] if current_index > 0 else None
-    next_lesson = lessons[current_index + 1] if current_index is not None and current_index + 1 < len(lessons) else None
+    # Navigation logic: keyset lookups on the primary key index
+    prev_lesson = lesson.get_previous_lesson()
+    next_lesson = lesson.get_next_lesson()
+
+    # Pre-rendered narration matching this user's chunking, if the lesson has been published
+    # (narration is of the original text, so not offered with a translation)
+    narration = None if translation else get_narration(lesson, request.user)
 
     return render(request, 'lessons/lesson_detail.html', {
         'lesson': lesson,
         'progress': progress,
         'chunks': chunks,
+        'translation': translation,
+        'narration': narration if narration and len(narration.chunks) == len(chunks) else None,
         'prev_lesson': prev_lesson,
         'next_lesson': next_lesson,
     })
 
 
+@login_required
+def lesson_narration(request, pk):
+    """
+    Return the narration manifest for the user's learning condition:
+    one streamable audio URL per lesson chunk.
+    """
+    lesson = get_object_or_404(Lesson, pk=pk, is_published=True)
+    narration = get_narration(lesson, request.user)
+    if narration is None:
+        raise Http404("Narration not available")
+
+    return JsonResponse({
+        'lesson_id': lesson.pk,
+        'status': narration.status,
+        'voice': narration.voice,
+        'chunks': [
+            {
+                'index': chunk['index'],
+                'duration': chunk['duration'],
+                'content_type': chunk['content_type'],
+                'url': reverse('lesson_narration_chunk', args=[lesson.pk, chunk['index']]),
+            }
+            for chunk in narration.chunks
+        ],
+    })
+
+
+@login_required
+def lesson_narration_chunk(request, pk, index):
+    """
+    Stream one pre-rendered narration chunk with HTTP Range support.
+    """
+    lesson = get_object_or_404(Lesson, pk=pk, is_published=True)
+    narration = get_narration(lesson, request.user)
+    path = chunk_audio_path(lesson, narration, index) if narration else None
+    if path is None:
+        raise Http404("Narration chunk not available")
+
+    chunk = narration.chunks[index]
+    response = ranged_file_response(request, path, chunk['content_type'], etag=chunk['key'])
+    # The URL is per index, not per content: revalidate so an edited lesson is never served stale
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 @login_required
 def lesson_download(request, pk):
     """
@@ -56,8 +113,19 @@ class LessonViewSet(viewsets.ModelViewSet):
     """
     API endpoint for CRUD operations on lessons.
     """
-    queryset = Lesson.objects.all()
+    queryset = Lesson.objects.select_related('topic')
     serializer_class = LessonSerializer
+    pagination_class = IdCursorPagination
+
+    def get_queryset(self):
+        if self.action == 'list':
+            return Lesson.listing()
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return LessonListSerializer
+        return super().get_serializer_class()
 
 
 class LessonProgressViewSet(viewsets.ModelViewSet):
@@ -66,3 +134,4 @@ class LessonProgressViewSet(viewsets.ModelViewSet):
     """
     queryset = LessonProgress.objects.all()
     serializer_class = LessonProgressSerializer
+    pagination_class = IdCursorPagination
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PathsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'paths'
+    
+    def ready(self):
+        # Import and register signals
+        from . import signals  # noqa
@@ -0,0 +1,18 @@
+"""
+Signals for the paths app.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.fragments import bump_content_version
+from .models import LearningPath
+
+
+@receiver(post_save, sender=LearningPath)
+@receiver(post_delete, sender=LearningPath)
+@receiver(m2m_changed, sender=LearningPath.lessons.through)
+def invalidate_path_fragments(sender, instance, **kwargs):
+    """
+    Expire cached template fragments that show learning paths.
+    """
+    bump_content_version('paths')
@@ -0,0 +1,162 @@
+"""
+factory_boy factories for seeding test and benchmark data.
+"""
+import factory
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from factory.django import DjangoModelFactory
+from faker import Faker
+
+from ai.models import AdaptiveLearningProfile
+from assessments.models import Answer, Assessment, AssessmentAttempt, Question, UserResponse
+from chatbot.models import ChatbotKnowledgeBase, ChatMessage, ChatSession, LearningPreference
+from lessons.models import Lesson, LessonProgress, Topic
+
+LEARNING_CONDITIONS = ['NORMAL', 'ADHD', 'DYSLEXIA']
+
+fake = Faker()
+
+
+class UserFactory(DjangoModelFactory):
+    class Meta:
+        model = get_user_model()
+        django_get_or_create = ('username',)
+
+    username = factory.Sequence(lambda n: f'learner{n}')
+    email = factory.LazyAttribute(lambda o: f'{o.username}@example.com')
+    name = factory.Faker('name')
+    class_level = factory.Iterator(['5', '6', '7', '8'])
+    learning_condition = factory.Iterator(LEARNING_CONDITIONS)
+    # Hashing is the slowest part of creating thousands of users; seeded users
+    # authenticate with force_authenticate / force_login instead
+    password = '!'
+
+
+class TopicFactory(DjangoModelFactory):
+    class Meta:
+        model = Topic
+
+    title = factory.Sequence(lambda n: f'Topic {n}')
+    order = factory.Sequence(lambda n: n)
+
+
+class LessonFactory(DjangoModelFactory):
+    class Meta:
+        model = Lesson
+
+    title = factory.Sequence(lambda n: f'Lesson {n}')
+    topic = factory.SubFactory(TopicFactory)
+    description = factory.Faker('paragraph')
+    # A dozen paragraphs, so chunking produces several chunks per learning condition
+    content = factory.LazyFunction(lambda: '\n\n'.join(fake.paragraphs(nb=12)))
+    transcript = factory.Faker('paragraph', nb_sentences=20)
+    difficulty = factory.Iterator(['beginner', 'intermediate', 'advanced'])
+    is_published = True
+
+
+class LessonProgressFactory(DjangoModelFactory):
+    class Meta:
+        model = LessonProgress
+
+    user = factory.SubFactory(UserFactory)
+    lesson = factory.SubFactory(LessonFactory)
+    is_started = True
+    is_completed = factory.Faker('boolean', chance_of_getting_true=60)
+    progress_percentage = factory.Faker('pyfloat', min_value=0, max_value=100)
+    time_spent = factory.Faker('pyint', min_value=60, max_value=3600)
+    quiz_score = factory.Faker('pyfloat', min_value=0, max_value=100)
+    engagement_score = factory.Faker('pyfloat', min_value=0, max_value=1)
+
+
+class AssessmentFactory(DjangoModelFactory):
+    class Meta:
+        model = Assessment
+
+    title = factory.Sequence(lambda n: f'Assessment {n}')
+    description = factory.Faker('paragraph')
+    instructions = factory.Faker('paragraph', nb_sentences=10)
+
+
+class QuestionFactory(DjangoModelFactory):
+    class Meta:
+        model = Question
+
+    assessment = factory.SubFactory(AssessmentFactory)
+    question_text = factory.Faker('sentence')
+    difficulty = factory.Iterator(['easy', 'medium', 'hard'])
+    order = factory.Sequence(lambda n: n)
+
+
+class AnswerFactory(DjangoModelFactory):
+    class Meta:
+        model = Answer
+
+    question = factory.SubFactory(QuestionFactory)
+    answer_text = factory.Faker('sentence')
+    is_correct = factory.Iterator([True, False, False, False])
+
+
+class UserResponseFactory(DjangoModelFactory):
+    class Meta:
+        model = UserResponse
+
+    user = factory.SubFactory(UserFactory)
+    question = factory.SubFactory(QuestionFactory)
+    assessment = factory.SelfAttribute('question.assessment')
+    is_correct = factory.Faker('boolean')
+    points_earned = factory.LazyAttribute(lambda o: 1.0 if o.is_correct else 0.0)
+    time_taken = factory.Faker('pyint', min_value=5, max_value=120)
+
+
+class AssessmentAttemptFactory(DjangoModelFactory):
+    class Meta:
+        model = AssessmentAttempt
+
+    user = factory.SubFactory(UserFactory)
+    assessment = factory.SubFactory(AssessmentFactory)
+    end_time = factory.LazyFunction(timezone.now)
+    score = factory.Faker('pyfloat', min_value=0, max_value=100)
+    is_completed = True
+    is_passed = factory.LazyAttribute(lambda o: o.score >= 70)
+
+
+class AdaptiveLearningProfileFactory(DjangoModelFactory):
+    class Meta:
+        model = AdaptiveLearningProfile
+
+    user = factory.SubFactory(UserFactory)
+    learning_style = factory.Iterator(['visual', 'auditory', 'reading_writing', 'kinesthetic'])
+
+
+class LearningPreferenceFactory(DjangoModelFactory):
+    class Meta:
+        model = LearningPreference
+
+    user = factory.SubFactory(UserFactory)
+    learning_condition = factory.SelfAttribute('user.learning_condition')
+
+
+class ChatSessionFactory(DjangoModelFactory):
+    class Meta:
+        model = ChatSession
+
+    user = factory.SubFactory(UserFactory)
+    title = factory.Faker('sentence', nb_words=4)
+
+
+class ChatMessageFactory(DjangoModelFactory):
+    class Meta:
+        model = ChatMessage
+
+    session = factory.SubFactory(ChatSessionFactory)
+    role = factory.Iterator(['user', 'assistant'])
+    content = factory.Faker('paragraph')
+
+
+class ChatbotKnowledgeBaseFactory(DjangoModelFactory):
+    class Meta:
+        model = ChatbotKnowledgeBase
+
+    title = factory.Sequence(lambda n: f'Knowledge {n}')
+    content = factory.Faker('paragraph', nb_sentences=6)
+    tags = factory.LazyFunction(lambda: ['reading', 'focus'])
@@ -0,0 +1,219 @@
+"""
+Fixtures for the performance regression suite.
+
+The suite seeds one synthetic dataset per session (``PERF_USERS`` learners
+with lesson progress, assessment attempts and responses) and measures each
+hot endpoint for query count, p50/p95 latency and peak memory. Results are
+compared with ``baselines.json``; a regression fails the test.
+
+The benchmarks only run when selected with ``-m slow``; a plain ``pytest``
+run deselects them, so the seeded rows never reach the rest of the suite.
+Run::
+
+    pytest tests/perf -m slow
+    PERF_UPDATE_BASELINES=1 pytest tests/perf -m slow   # re-record baselines
+
+Latency also lands in pytest-benchmark's storage, so
+``--benchmark-autosave`` / ``--benchmark-compare-fail=mean:20%`` work as usual.
+"""
+import json
+import os
+import random
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_databases, teardown_databases
+
+PERF_USERS = int(os.environ.get('PERF_USERS', 2000))
+PERF_LESSONS = int(os.environ.get('PERF_LESSONS', 200))
+PERF_PROGRESS_PER_USER = int(os.environ.get('PERF_PROGRESS_PER_USER', 15))
+PERF_ASSESSMENTS = int(os.environ.get('PERF_ASSESSMENTS', 20))
+PERF_QUESTIONS = int(os.environ.get('PERF_QUESTIONS', 10))
+PERF_ROUNDS = int(os.environ.get('PERF_ROUNDS', 20))
+PERF_SEED = int(os.environ.get('PERF_SEED', 1234))
+
+# Allowed growth over the baseline before a run fails; query counts are exact.
+# The absolute slack keeps millisecond-scale endpoints from failing on jitter.
+LATENCY_TOLERANCE = float(os.environ.get('PERF_LATENCY_TOLERANCE', 0.5))
+LATENCY_SLACK_MS = float(os.environ.get('PERF_LATENCY_SLACK_MS', 2.0))
+MEMORY_TOLERANCE = float(os.environ.get('PERF_MEMORY_TOLERANCE', 0.25))
+MEMORY_SLACK_KB = int(os.environ.get('PERF_MEMORY_SLACK_KB', 64))
+UPDATE_BASELINES = os.environ.get('PERF_UPDATE_BASELINES') == '1'
+
+BASELINES_PATH = Path(__file__).with_name('baselines.json')
+BATCH_SIZE = 1000
+
+
+def seed_dataset():
+    """Populate the test database with the synthetic benchmark dataset."""
+    from factory.random import reseed_random
+
+    from tests import factories
+    from accessibility.models import AccessibilitySettings, ADHDSettings, DyslexiaSettings
+    from ai.models import AdaptiveLearningProfile
+    from assessments.models import AssessmentAttempt, UserResponse
+    from chatbot.models import LearningPreference
+    from lessons.models import Lesson, LessonProgress
+    from lessons.stats import reconcile_lesson_stats
+
+    rng = random.Random(PERF_SEED)
+    reseed_random(PERF_SEED)
+    factories.fake.seed_instance(PERF_SEED)
+
+    User = factories.UserFactory._meta.model
+    users = User.objects.bulk_create(factories.UserFactory.build_batch(PERF_USERS), batch_size=BATCH_SIZE)
+
+    topics = factories.TopicFactory.create_batch(max(1, PERF_LESSONS // 10))
+    # Saved unpublished and published in bulk, so seeding does not queue narration renders
+    lessons = [factories.LessonFactory(topic=rng.choice(topics), is_published=False) for _ in range(PERF_LESSONS)]
+    Lesson.objects.update(is_published=True)
+
+    assessments = factories.AssessmentFactory.create_batch(PERF_ASSESSMENTS, created_by=users[0])
+    questions = {}
+    for assessment in assessments:
+        questions[assessment.pk] = factories.QuestionFactory.create_batch(PERF_QUESTIONS, assessment=assessment)
+        for question in questions[assessment.pk]:
+            factories.AnswerFactory.create_batch(4, question=question)
+
+    progress, attempts, responses, profiles, preferences = [], [], [], [], []
+    for user in users:
+        for lesson in rng.sample(lessons, min(PERF_PROGRESS_PER_USER, len(lessons))):
+            progress.append(factories.LessonProgressFactory.build(user=user, lesson=lesson))
+        for assessment in rng.sample(assessments, min(2, len(assessments))):
+            attempts.append(factories.AssessmentAttemptFactory.build(user=user, assessment=assessment))
+        if rng.random() < 0.25:
+            for question in questions[rng.choice(assessments).pk]:
+                responses.append(factories.UserResponseFactory.build(user=user, question=question))
+        profiles.append(factories.AdaptiveLearningProfileFactory.build(user=user))
+        preferences.append(factories.LearningPreferenceFactory.build(user=user))
+
+    LessonProgress.objects.bulk_create(progress, batch_size=BATCH_SIZE)
+    # bulk_create skips the progress signals that keep the stats rows current
+    reconcile_lesson_stats()
+    AssessmentAttempt.objects.bulk_create(attempts, batch_size=BATCH_SIZE)
+    UserResponse.objects.bulk_create(responses, batch_size=BATCH_SIZE)
+    AdaptiveLearningProfile.objects.bulk_create(profiles, batch_size=BATCH_SIZE)
+    LearningPreference.objects.bulk_create(preferences, batch_size=BATCH_SIZE)
+    # bulk_create skips the signal that gives every user their settings rows
+    for model in (AccessibilitySettings, DyslexiaSettings, ADHDSettings):
+        model.objects.bulk_create([model(user=user) for user in users], batch_size=BATCH_SIZE)
+
+    factories.ChatbotKnowledgeBaseFactory.create_batch(200, target_conditions=factories.LEARNING_CONDITIONS)
+    session = factories.ChatSessionFactory(user=users[0])
+    factories.ChatMessageFactory.create_batch(50, session=session)
+
+
+def pytest_collection_modifyitems(config, items):
+    """Deselect the benchmarks unless the run asked for ``-m slow``."""
+    if 'slow' in (config.getoption('markexpr') or ''):
+        return
+    perf_dir = Path(__file__).parent
+    selected, deselected = [], []
+    for item in items:
+        (deselected if perf_dir in item.path.parents else selected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_test_environment, django_db_blocker):
+    """Create the test database once and seed it for every benchmark."""
+    with django_db_blocker.unblock():
+        db_cfg = setup_databases(verbosity=0, interactive=False)
+        seed_dataset()
+    yield
+    with django_db_blocker.unblock():
+        teardown_databases(db_cfg, verbosity=0)
+
+
+@pytest.fixture
+def perf_user(db):
+    """The learner every benchmark runs as (has progress, attempts and chat history)."""
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.get(username='learner0')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, int(round(pct / 100 * len(values))) - 1)
+    return values[index]
+
+
+class Baselines:
+    """Stored per-benchmark metrics and the regression check against them."""
+
+    def __init__(self, path):
+        self.path = path
+        self.data = json.loads(path.read_text()) if path.exists() else {}
+        self.recorded = {}
+
+    def check(self, name, metrics):
+        self.recorded[name] = metrics
+        baseline = self.data.get(name)
+        if UPDATE_BASELINES:
+            return
+        if baseline is None:
+            warnings.warn(f"No performance baseline for {name}; run with PERF_UPDATE_BASELINES=1")
+            return
+
+        failures = []
+        if metrics['queries'] > baseline['queries']:
+            failures.append(f"queries {metrics['queries']} > {baseline['queries']}")
+        if metrics['peak_kb'] > max(baseline['peak_kb'] * (1 + MEMORY_TOLERANCE),
+                                    baseline['peak_kb'] + MEMORY_SLACK_KB):
+            failures.append(f"peak memory {metrics['peak_kb']} KB > {baseline['peak_kb']} KB")
+        if 'p95_ms' in metrics and metrics['p95_ms'] > max(baseline['p95_ms'] * (1 + LATENCY_TOLERANCE),
+                                                           baseline['p95_ms'] + LATENCY_SLACK_MS):
+            failures.append(f"p95 {metrics['p95_ms']:.2f} ms > {baseline['p95_ms']:.2f} ms")
+        if failures:
+            pytest.fail(f"Performance regression in {name}: " + '; '.join(failures))
+
+    def save(self):
+        data = {**self.data, **self.recorded}
+        self.path.write_text(json.dumps(data, indent=2, sort_keys=True) + '\n')
+
+
+@pytest.fixture(scope='session')
+def perf_baselines():
+    baselines = Baselines(BASELINES_PATH)
+    yield baselines
+    if UPDATE_BASELINES and baselines.recorded:
+        baselines.save()
+
+
+@pytest.fixture
+def perf(benchmark, request, perf_baselines):
+    """
+    Measure ``func``: query count and peak memory of one call, then latency
+    over ``PERF_ROUNDS`` benchmark rounds, checked against the baseline.
+    """
+    def measure(func, name=None):
+        name = name or request.node.name
+
+        with CaptureQueriesContext(connection) as queries:
+            result = func()
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        metrics = {'queries': len(queries), 'peak_kb': peak // 1024}
+        if not benchmark.disabled:
+            benchmark.pedantic(func, rounds=PERF_ROUNDS, iterations=1)
+            timings = sorted(benchmark.stats.stats.data)
+            metrics['p50_ms'] = round(percentile(timings, 50) * 1000, 3)
+            metrics['p95_ms'] = round(percentile(timings, 95) * 1000, 3)
+        benchmark.extra_info.update(metrics)
+
+        perf_baselines.check(name, metrics)
+        return result
+
+    return measure
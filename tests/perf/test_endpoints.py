@@ -0,0 +1,97 @@
+"""
+Latency, query-count and memory benchmarks for the hot endpoints.
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ai.views import AssessmentView, LearningAnalyticsView, LearningPathView, LessonRecommendationView
+from chatbot.views import ChatMessageViewSet
+from lessons.models import LessonProgress
+from lessons.views import lesson_detail
+
+pytestmark = [pytest.mark.slow, pytest.mark.django_db]
+
+factory = APIRequestFactory()
+
+# Endpoints that answer 500 on this dataset are skipped, with no baseline, until
+# the views are fixed: measuring the error path would only enshrine it.
+broken_profile_fields = pytest.mark.skip(
+    reason="reads score fields AdaptiveLearningProfile lacks and Topic.name, which does not exist (500)"
+)
+
+
+def api_get(view, user, path='/', **kwargs):
+    def call():
+        request = factory.get(path)
+        force_authenticate(request, user=user)
+        response = view(request, **kwargs)
+        response.render()
+        return response
+    return call
+
+
+@broken_profile_fields
+def test_learning_path(perf, perf_user):
+    response = perf(api_get(LearningPathView.as_view(), perf_user))
+    assert response.status_code == 200
+
+
+@pytest.mark.skip(reason="filters LessonProgress on updated_at/time_spent_seconds, which do not exist (500)")
+def test_learning_analytics(perf, perf_user):
+    response = perf(api_get(LearningAnalyticsView.as_view(), perf_user))
+    assert response.status_code == 200
+
+
+@broken_profile_fields
+def test_lesson_recommendations(perf, perf_user):
+    response = perf(api_get(LessonRecommendationView.as_view(), perf_user, '/?limit=10'))
+    assert response.status_code == 200
+
+
+@pytest.mark.skip(reason="AssessmentView reads fields the assessment models do not have "
+                         "(completed_at, started_at, next_assessment, ...); no baseline until it is fixed")
+def test_assessment(perf, perf_user):
+    response = perf(api_get(AssessmentView.as_view(), perf_user))
+    assert response.status_code == 200
+
+
+def test_lesson_detail(perf, perf_user, settings):
+    settings.ROOT_URLCONF = 'tests.perf.urls'
+    # A lesson the learner has already started, so every dataset size measures
+    # the same return-visit path rather than a first-visit progress insert
+    lesson = LessonProgress.objects.filter(user=perf_user).order_by('lesson_id').first().lesson
+
+    def call():
+        request = factory.get(f'/lessons/{lesson.pk}/')
+        request.user = perf_user
+        request.session = {}
+        return lesson_detail(request, pk=lesson.pk)
+
+    response = perf(call)
+    assert response.status_code == 200
+
+
+@pytest.mark.skip(reason="knowledge lookup uses a JSON contains filter SQLite lacks; "
+                         "only the error fallback would be measured")
+def test_chatbot_message(perf, perf_user, settings):
+    settings.OPENAI_API_KEY = 'test'
+    completion = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="Let's break this into small steps."))]
+    )
+
+    # Only the model call is replaced; sessions, history and knowledge lookups hit the database
+    with patch('chatbot.services.OpenAI') as client:
+        client.return_value.chat.completions.create.return_value = completion
+
+        def call():
+            request = factory.post('/', {'message': 'How do I focus on reading practice?'}, format='json')
+            force_authenticate(request, user=perf_user)
+            response = ChatMessageViewSet.as_view({'post': 'create'})(request)
+            response.render()
+            return response
+
+        response = perf(call)
+    assert response.status_code == 200
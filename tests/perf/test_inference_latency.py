@@ -0,0 +1,57 @@
+"""
+Single-row latency of the exported engagement model against Keras.
+
+Reports microseconds per prediction for ``Model.predict``, a direct Keras
+call and ONNX Runtime (also as JUnit properties), and fails if ONNX Runtime
+is not faster than both::
+
+    pytest tests/perf/test_inference_latency.py -m slow -s
+"""
+import os
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip('tensorflow')
+pytest.importorskip('tf2onnx')
+pytest.importorskip('onnxruntime')
+
+from ai.inference import KerasModel, OnnxModel, export_keras_model
+from ai.tests.test_inference import keras_model
+
+pytestmark = [pytest.mark.slow]
+
+INFERENCE_ROUNDS = int(os.environ.get('PERF_INFERENCE_ROUNDS', 200))
+
+
+@pytest.fixture(scope='module')
+def model_paths(tmp_path_factory):
+    keras_path = tmp_path_factory.mktemp('models') / 'engagement_model.h5'
+    keras_model(keras_path)
+    return keras_path, export_keras_model(keras_path)
+
+
+def microseconds_per_call(predict, row, rounds=INFERENCE_ROUNDS):
+    predict(row)  # warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        predict(row)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def test_onnx_runtime_outpaces_keras(model_paths, record_property):
+    keras_path, onnx_path = model_paths
+    keras, onnx = KerasModel(keras_path), OnnxModel(onnx_path)
+    row = np.random.default_rng(0).normal(size=(1, 6)).astype(np.float32)
+
+    results = {
+        'keras_predict': microseconds_per_call(lambda x: keras.model.predict(x, verbose=0), row, rounds=20),
+        'keras_call': microseconds_per_call(keras.predict, row),
+        'onnx': microseconds_per_call(onnx.predict, row),
+    }
+    for name, micros in results.items():
+        record_property(f'{name}_us_per_row', round(micros, 1))
+        print(f'{name:>14}: {micros:10.1f} us/row')
+
+    assert results['onnx'] < results['keras_call'] < results['keras_predict']
@@ -0,0 +1,65 @@
+"""
+Throughput of the task-specific spaCy pipelines against the full model.
+
+Reports docs/sec for each pipeline (also as JUnit properties) and fails if
+a lean pipeline is not faster than the full model it replaces::
+
+    pytest tests/perf/test_nlp_throughput.py -m slow -s
+"""
+import os
+import time
+
+import pytest
+
+pytest.importorskip('spacy')
+
+from ai.text_pipelines import full_pipeline, sentence_pipeline, tokenizer_pipeline
+from tests.factories import fake
+
+pytestmark = [pytest.mark.slow, pytest.mark.nlp]
+
+NLP_DOCS = int(os.environ.get('PERF_NLP_DOCS', 500))
+NLP_PROCESSES = int(os.environ.get('PERF_NLP_PROCESSES', 2))
+
+
+@pytest.fixture(scope='module')
+def texts():
+    fake.seed_instance(1234)
+    return [fake.paragraph(nb_sentences=6) for _ in range(NLP_DOCS)]
+
+
+@pytest.fixture(scope='module')
+def full_model():
+    try:
+        return full_pipeline()
+    except OSError:
+        pytest.skip('spaCy model is not installed')
+
+
+def docs_per_second(nlp, texts, n_process=1):
+    start = time.perf_counter()
+    for _ in nlp.pipe(texts, batch_size=256, n_process=n_process):
+        pass
+    return len(texts) / (time.perf_counter() - start)
+
+
+def time_one(nlp, text):
+    start = time.perf_counter()
+    nlp(text)
+    return time.perf_counter() - start
+
+
+def test_lean_pipelines_outpace_full_model(texts, full_model, record_property):
+    results = {
+        'full': docs_per_second(full_model, texts),
+        'full_per_text': len(texts) / sum(time_one(full_model, text) for text in texts),
+        'tokenizer': docs_per_second(tokenizer_pipeline(), texts),
+        'senter': docs_per_second(sentence_pipeline(), texts),
+        f'senter_{NLP_PROCESSES}_processes': docs_per_second(sentence_pipeline(), texts, NLP_PROCESSES),
+    }
+    for name, rate in results.items():
+        record_property(f'{name}_docs_per_sec', round(rate))
+        print(f'{name:>24}: {rate:10.0f} docs/sec')
+
+    assert results['tokenizer'] > results['full']
+    assert results['senter'] > results['full']
@@ -0,0 +1,31 @@
+"""
+URLconf for the benchmark suite.
+
+Exposes only the routes reversed while rendering the benchmarked pages, so
+the suite does not depend on every view referenced by the app URLconfs.
+"""
+from django.http import HttpResponse
+from django.urls import include, path, re_path
+
+from lessons import views as lesson_views
+
+
+def placeholder(request, *args, **kwargs):
+    return HttpResponse()
+
+
+accessibility_patterns = [
+    path('settings/', placeholder, name='settings'),
+    path('settings/batch/', placeholder, name='batch_update_settings'),
+    re_path(r'^css/(?P<digest>[0-9a-f]{16})\.css$', placeholder, name='stylesheet'),
+]
+
+urlpatterns = [
+    path('lessons/<int:pk>/', lesson_views.lesson_detail, name='lesson_detail'),
+    path('lessons/<int:pk>/download/', placeholder, name='lesson_download'),
+    path('lessons/<int:pk>/narration/<int:index>/', lesson_views.lesson_narration_chunk,
+         name='lesson_narration_chunk'),
+    path('login/', placeholder, name='login'),
+    path('logout/', placeholder, name='logout'),
+    path('accessibility/', include((accessibility_patterns, 'accessibility'), namespace='accessibility')),
+]
@@ -0,0 +1,72 @@
+"""
+Query-count regression tests for list endpoints.
+
+Each endpoint must issue a fixed number of queries regardless of how many
+rows it returns, and list queries must not select the large TEXT columns.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from assessments.models import Assessment
+from assessments.views import AssessmentViewSet
+from lessons.models import Lesson, Topic
+from lessons.views import LessonViewSet
+
+
+class ListQueryCountTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = get_user_model().objects.create_user(username='reader', password='pass')
+
+    def create_lessons(self, count):
+        topic = Topic.objects.create(title=f'Topic {Topic.objects.count()}')
+        for i in range(count):
+            Lesson.objects.create(title=f'Lesson {i}', topic=topic, content='Paragraph. ' * 200)
+
+    def create_assessments(self, count):
+        start = Assessment.objects.count()
+        for i in range(start, start + count):
+            Assessment.objects.create(title=f'Assessment {i}', created_by=self.user,
+                                      instructions='Read carefully. ' * 100)
+
+    def list(self, viewset):
+        request = self.factory.get('/')
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = viewset.as_view({'get': 'list'})(request)
+            response.render()
+        self.assertEqual(response.status_code, 200)
+        return response, queries
+
+    def test_lesson_list_query_count_is_constant(self):
+        self.create_lessons(3)
+        small, small_queries = self.list(LessonViewSet)
+        self.create_lessons(30)
+        large, large_queries = self.list(LessonViewSet)
+
+        self.assertEqual(len(small_queries), 1)
+        self.assertEqual(len(large_queries), 1)
+        self.assertEqual(len(large.data['results']), 20)
+        self.assertIsNotNone(large.data['next'])
+        self.assertNotIn('"content"', large_queries[0]['sql'])
+        self.assertNotIn('"transcript"', large_queries[0]['sql'])
+
+    def test_lesson_listing_joins_topic(self):
+        self.create_lessons(5)
+        with self.assertNumQueries(1):
+            titles = [lesson.topic.title for lesson in Lesson.listing()]
+        self.assertEqual(len(titles), 5)
+
+    def test_assessment_list_query_count_is_constant(self):
+        self.create_assessments(3)
+        _, small_queries = self.list(AssessmentViewSet)
+        self.create_assessments(30)
+        large, large_queries = self.list(AssessmentViewSet)
+
+        self.assertEqual(len(small_queries), len(large_queries))
+        self.assertEqual(len(large_queries), 1)
+        self.assertEqual(large.data['results'][0]['created_by'], str(self.user))
+        self.assertNotIn('"instructions"', large_queries[0]['sql'])